@@ -9,7 +9,13 @@ from alembic import context
 
 # Import the Base and models to make metadata available
 from database.config import Base
-from database.models import Chat, Message, ToolCall  # noqa: F401
+from database.models import (  # noqa: F401
+    Chat,
+    Message,
+    ResponseCache,
+    SemanticCache,
+    ToolCall,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
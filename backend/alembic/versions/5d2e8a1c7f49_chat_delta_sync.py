@@ -0,0 +1,57 @@
+"""Chat versions, message sequence numbers and idempotency keys
+
+Revision ID: 5d2e8a1c7f49
+Revises: 8e4b2c6f1d37
+Create Date: 2026-10-17 15:02:11.804336
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e8a1c7f49'
+down_revision: Union[str, None] = '8e4b2c6f1d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Existing messages are numbered in the order they were written. A whole turn
+# was saved in one transaction, so its messages share "createdAt"; ties are
+# broken by ctid, the order the rows were physically written in. The old save
+# path wrote (and on every save rewrote) a chat's messages one at a time in
+# the client's list order. Ordering ties by id would shuffle each turn.
+BACKFILL_SEQ = '''
+    UPDATE "Message" AS m SET seq = numbered.seq
+    FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY "chatId" ORDER BY "createdAt", ctid
+        ) - 1 AS seq
+        FROM "Message"
+    ) AS numbered
+    WHERE m.id = numbered.id
+'''
+
+
+def upgrade() -> None:
+    op.add_column('Chat', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('Message', sa.Column('seq', sa.Integer(), nullable=True))
+    op.execute(BACKFILL_SEQ)
+    op.alter_column('Message', 'seq', nullable=False)
+    op.create_table('IdempotencyKey',
+    sa.Column('userId', sa.String(length=255), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('response', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('userId', 'key')
+    )
+    op.create_index(op.f('ix_IdempotencyKey_createdAt'), 'IdempotencyKey', ['createdAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_IdempotencyKey_createdAt'), table_name='IdempotencyKey')
+    op.drop_table('IdempotencyKey')
+    op.drop_column('Message', 'seq')
+    op.drop_column('Chat', 'version')
@@ -0,0 +1,36 @@
+"""Indexes for per-user chat pages, message order and tool call lookups
+
+Revision ID: 9a7c3e5b2d18
+Revises: 5d2e8a1c7f49
+Create Date: 2026-10-17 17:21:45.290611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7c3e5b2d18'
+down_revision: Union[str, None] = '5d2e8a1c7f49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so writes to the chat tables are not blocked; that
+    # cannot run inside the migration's transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_Chat_userId_updatedAt', 'Chat', ['userId', sa.text('"updatedAt" DESC')], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_Message_chatId_seq', 'Message', ['chatId', 'seq'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_ToolCall_messageId', 'ToolCall', ['messageId'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        # The leading column of the new Chat index covers every lookup it served
+        op.drop_index('ix_Chat_userId', table_name='Chat', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_Chat_userId', 'Chat', ['userId'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_ToolCall_messageId', table_name='ToolCall', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_Message_chatId_seq', table_name='Message', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_Chat_userId_updatedAt', table_name='Chat', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,38 @@
+"""Fixed-size semantic cache embeddings with an HNSW index
+
+Revision ID: b7d3f1a9c5e2
+Revises: f3a9c6e1b7d4
+Create Date: 2026-10-17 23:02:51.174630
+
+The embedding column is given the SEMANTIC_CACHE_DIMENSIONS of the configured
+embedding model, which the HNSW index needs. Cached answers of any other size
+cannot be served anyway and are dropped. Embeddings are stored inline from now
+on so that the planner prefers the index to sorting the whole table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import pgvector.sqlalchemy
+
+from database.models import SEMANTIC_CACHE_DIMENSIONS
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3f1a9c5e2'
+down_revision: Union[str, None] = 'f3a9c6e1b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(f'DELETE FROM "SemanticCache" WHERE vector_dims(embedding) <> {SEMANTIC_CACHE_DIMENSIONS}')
+    op.alter_column('SemanticCache', 'embedding', type_=pgvector.sqlalchemy.vector.VECTOR(SEMANTIC_CACHE_DIMENSIONS), existing_type=pgvector.sqlalchemy.vector.VECTOR(), existing_nullable=False)
+    op.execute('ALTER TABLE "SemanticCache" ALTER COLUMN embedding SET STORAGE PLAIN')
+    with op.get_context().autocommit_block():
+        op.create_index('ix_SemanticCache_embedding', 'SemanticCache', ['embedding'], unique=False, postgresql_using='hnsw', postgresql_ops={'embedding': 'vector_cosine_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_SemanticCache_embedding', table_name='SemanticCache', postgresql_concurrently=True, if_exists=True)
+    op.execute('ALTER TABLE "SemanticCache" ALTER COLUMN embedding SET STORAGE EXTERNAL')
+    op.alter_column('SemanticCache', 'embedding', type_=pgvector.sqlalchemy.vector.VECTOR(), existing_type=pgvector.sqlalchemy.vector.VECTOR(SEMANTIC_CACHE_DIMENSIONS), existing_nullable=False)
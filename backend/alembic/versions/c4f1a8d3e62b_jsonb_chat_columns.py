@@ -0,0 +1,121 @@
+"""Store message kwargs and tool call args as JSONB
+
+Revision ID: c4f1a8d3e62b
+Revises: 9a7c3e5b2d18
+Create Date: 2026-10-17 18:44:09.113572
+
+Runs online: each column gets a JSONB twin that a trigger keeps current
+while existing rows are copied in small committed batches, then the twin
+replaces the original in one short transaction.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f1a8d3e62b'
+down_revision: Union[str, None] = '9a7c3e5b2d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows copied per committed batch
+BATCH_SIZE = int(os.getenv("JSONB_BACKFILL_BATCH_SIZE", "5000"))
+
+# (table, column, nullable)
+COLUMNS = [
+    ('Message', 'additional_kwargs', True),
+    ('ToolCall', 'args', False),
+]
+
+
+def add_twin(table: str, column: str) -> None:
+    twin = f'{column}_jsonb'
+    op.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS {twin} JSONB')
+    op.execute(f'''
+        CREATE OR REPLACE FUNCTION "{table}_{twin}_sync"() RETURNS trigger AS $$
+        BEGIN
+            NEW.{twin} := NEW.{column}::jsonb;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    ''')
+    op.execute(f'DROP TRIGGER IF EXISTS "{table}_{twin}_sync" ON "{table}"')
+    op.execute(f'''
+        CREATE TRIGGER "{table}_{twin}_sync" BEFORE INSERT OR UPDATE OF {column}
+        ON "{table}" FOR EACH ROW EXECUTE FUNCTION "{table}_{twin}_sync"()
+    ''')
+
+
+def backfill(table: str, column: str) -> None:
+    # Walks the primary key so every batch is an index range, not a rescan.
+    # The cursor is the batch's last id in Postgres' own order; text ids
+    # collate differently from Python strings.
+    bind = op.get_bind()
+    after = None
+    while True:
+        where = 'WHERE id > :after' if after is not None else ''
+        after = bind.execute(sa.text(f'''
+            WITH batch AS (
+                SELECT id FROM "{table}" {where} ORDER BY id LIMIT :size
+            ), updated AS (
+                UPDATE "{table}" AS t SET {column}_jsonb = t.{column}::jsonb
+                FROM batch WHERE t.id = batch.id
+            )
+            SELECT id FROM batch ORDER BY id DESC LIMIT 1
+        '''), {'after': after, 'size': BATCH_SIZE}).scalar()
+        if after is None:
+            return
+
+
+def check_not_null(table: str, column: str) -> None:
+    # Run outside a transaction: adding the CHECK as NOT VALID holds its
+    # ACCESS EXCLUSIVE lock only for a moment, and the validation scan then
+    # runs in its own transaction under a lock that lets writes through
+    twin = f'{column}_jsonb'
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_{twin}_not_null" CHECK ({twin} IS NOT NULL) NOT VALID')
+    op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{table}_{twin}_not_null"')
+
+
+def swap(table: str, column: str, nullable: bool) -> None:
+    twin = f'{column}_jsonb'
+    if not nullable:
+        # The validated CHECK lets SET NOT NULL skip its full-table scan
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN {twin} SET NOT NULL')
+        op.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT "{table}_{twin}_not_null"')
+    op.execute(f'DROP TRIGGER "{table}_{twin}_sync" ON "{table}"')
+    op.execute(f'DROP FUNCTION "{table}_{twin}_sync"()')
+    op.execute(f'ALTER TABLE "{table}" DROP COLUMN {column}')
+    op.execute(f'ALTER TABLE "{table}" RENAME COLUMN {twin} TO {column}')
+
+
+def upgrade() -> None:
+    # Fail fast instead of queueing writers behind a blocked ACCESS EXCLUSIVE
+    op.execute("SET lock_timeout = '5s'")
+    for table, column, _ in COLUMNS:
+        add_twin(table, column)
+
+    with op.get_context().autocommit_block():
+        for table, column, _ in COLUMNS:
+            backfill(table, column)
+        for table, column, nullable in COLUMNS:
+            if not nullable:
+                check_not_null(table, column)
+
+    for table, column, nullable in COLUMNS:
+        swap(table, column, nullable)
+    op.execute('RESET lock_timeout')
+
+    # Containment lookups such as additional_kwargs @> '{"run_id": ...}'
+    with op.get_context().autocommit_block():
+        op.create_index('ix_Message_additional_kwargs', 'Message', ['additional_kwargs'], unique=False, postgresql_using='gin', postgresql_ops={'additional_kwargs': 'jsonb_path_ops'}, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_ToolCall_args', 'ToolCall', ['args'], unique=False, postgresql_using='gin', postgresql_ops={'args': 'jsonb_path_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_ToolCall_args', table_name='ToolCall', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_Message_additional_kwargs', table_name='Message', postgresql_concurrently=True, if_exists=True)
+    op.alter_column('ToolCall', 'args', type_=sa.JSON(), postgresql_using='args::json')
+    op.alter_column('Message', 'additional_kwargs', type_=sa.JSON(), postgresql_using='additional_kwargs::json')
@@ -0,0 +1,33 @@
+"""Full-text search over message content
+
+Revision ID: e8b5d2f7a391
+Revises: c4f1a8d3e62b
+Create Date: 2026-10-17 20:05:37.648120
+
+Adding a stored generated column rewrites the Message table under an
+ACCESS EXCLUSIVE lock, so run this in a maintenance window on large
+deployments. The GIN index is then built concurrently.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b5d2f7a391'
+down_revision: Union[str, None] = 'c4f1a8d3e62b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('Message', sa.Column('content_tsv', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', content)", persisted=True), nullable=False))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_Message_content_tsv', 'Message', ['content_tsv'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_Message_content_tsv', table_name='Message', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('Message', 'content_tsv')
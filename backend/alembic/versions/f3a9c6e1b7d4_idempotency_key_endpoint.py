@@ -0,0 +1,33 @@
+"""Scope idempotency keys to the endpoint they were sent to
+
+Revision ID: f3a9c6e1b7d4
+Revises: e8b5d2f7a391
+Create Date: 2026-10-17 22:14:08.531920
+
+Stored keys have no endpoint to move into the new primary key and expire
+within a day anyway, so they are dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c6e1b7d4'
+down_revision: Union[str, None] = 'e8b5d2f7a391'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('DELETE FROM "IdempotencyKey"')
+    op.add_column('IdempotencyKey', sa.Column('endpoint', sa.String(length=255), nullable=False))
+    op.drop_constraint('IdempotencyKey_pkey', 'IdempotencyKey', type_='primary')
+    op.create_primary_key('IdempotencyKey_pkey', 'IdempotencyKey', ['userId', 'endpoint', 'key'])
+
+
+def downgrade() -> None:
+    op.execute('DELETE FROM "IdempotencyKey"')
+    op.drop_constraint('IdempotencyKey_pkey', 'IdempotencyKey', type_='primary')
+    op.create_primary_key('IdempotencyKey_pkey', 'IdempotencyKey', ['userId', 'key'])
+    op.drop_column('IdempotencyKey', 'endpoint')
@@ -1,9 +1,13 @@
 """Authentication helpers for extracting user information from JWT tokens."""
 
+import os
 from typing import Any
 
 from fastapi import HTTPException, status
 
+# Realm role that grants access to other users' data, e.g. full chat exports
+ADMIN_ROLE = os.getenv("ADMIN_ROLE", "ai-foundry-admin")
+
 
 def get_user_email(token_payload: dict[str, Any]) -> str:
     """Extract user email from JWT token payload.
@@ -30,3 +34,16 @@ def get_user_email(token_payload: dict[str, Any]) -> str:
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No email found in token",
     )
+
+
+def is_admin(token_payload: dict[str, Any]) -> bool:
+    """Check whether the token carries the admin realm role.
+
+    Args:
+        token_payload: Decoded JWT payload from Keycloak
+
+    Returns:
+        True if ADMIN_ROLE is among the token's realm roles
+    """
+    realm_access = token_payload.get("realm_access") or {}
+    return ADMIN_ROLE in realm_access.get("roles", [])
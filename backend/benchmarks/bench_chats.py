@@ -0,0 +1,146 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Compare the two ways GET /chats?full=true can build a user's chat dump.
+
+"orm" loads Chat/Message/ToolCall objects and encodes a ChatsResponse, "sql"
+streams JSON assembled by Postgres. Each case runs in a fresh process so the
+peak RSS growth it reports belongs to that case alone. Needs the DB_*
+variables of a database migrated to head; the seeded users are removed again.
+
+Usage: python -m backend.benchmarks.bench_chats [--sizes N ...] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy import delete
+
+from backend.common.encoder import encode
+from backend.database.config import get_engine, get_session_maker
+from backend.database.models import Chat
+from backend.models.chat_schemas import ChatsInput
+from backend.routes.chats import get_chats_impl, save_chats_impl, stream_chats_json
+
+MESSAGES_PER_CHAT = 50
+
+
+def build_chats(messages: int) -> ChatsInput:
+    chats: dict[str, dict[str, Any]] = {}
+    for n in range(messages):
+        if n % MESSAGES_PER_CHAT == 0:
+            chat = chats[str(uuid.uuid4())] = {"title": f"Chat {n}", "messages": []}
+        message: dict[str, Any] = {
+            "id": str(uuid.uuid4()),
+            "type": "human" if n % 2 == 0 else "ai",
+            "content": "Lorem ipsum dolor sit amet, consectetur adipiscing. " * 8,
+            "additional_kwargs": {"run_id": str(uuid.uuid4())},
+        }
+        if n % 4 == 1:
+            message["tool_calls"] = [
+                {"id": str(uuid.uuid4()), "name": "search", "args": {"query": "q"}}
+            ]
+        chat["messages"].append(message)
+    return ChatsInput.model_validate({"chats": chats})
+
+
+async def orm_dump(user: str) -> int:
+    async with get_session_maker()() as db:
+        return len(encode(await get_chats_impl(db, user)))
+
+
+async def sql_dump(user: str) -> int:
+    async with get_session_maker()() as db:
+        size = 0
+        async for chunk in stream_chats_json(db, user):
+            size += len(chunk)
+        return size
+
+
+VARIANTS = {"orm": orm_dump, "sql": sql_dump}
+
+
+def measure(
+    variant: str, user: str, repeat: int, results: "multiprocessing.Queue"
+) -> None:
+    async def timed() -> None:
+        # The first run warms the pool; RSS growth is measured after it
+        await VARIANTS[variant](user)
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        best = float("inf")
+        size = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            size = await VARIANTS[variant](user)
+            best = min(best, time.perf_counter() - start)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        results.put((best, size, peak - baseline))
+
+    asyncio.run(timed())
+
+
+async def seed(sizes: list[int]) -> dict[int, str]:
+    users = {}
+    for size in sizes:
+        users[size] = f"bench-{uuid.uuid4()}@example.com"
+        async with get_session_maker()() as db:
+            await save_chats_impl(build_chats(size), db, users[size])
+    # Pooled connections belong to this event loop
+    await get_engine().dispose()
+    return users
+
+
+async def cleanup(users: list[str]) -> None:
+    async with get_session_maker()() as db:
+        await db.execute(delete(Chat).where(Chat.userId.in_(users)))
+        await db.commit()
+    await get_engine().dispose()
+
+
+def run(sizes: list[int], repeat: int) -> None:
+    users = asyncio.run(seed(sizes))
+    context = multiprocessing.get_context("spawn")
+    try:
+        print(
+            f"{'messages':>9}{'variant':>9}{'ms':>10}{'bytes':>12}{'peak RSS KB':>14}"
+        )
+        for size, user in users.items():
+            for variant in VARIANTS:
+                results = context.Queue()
+                process = context.Process(
+                    target=measure, args=(variant, user, repeat, results)
+                )
+                process.start()
+                seconds, body, rss = results.get()
+                process.join()
+                print(
+                    f"{size:>9}{variant:>9}{seconds * 1000:>10.1f}{body:>12}{rss:>14}"
+                )
+    finally:
+        asyncio.run(cleanup(list(users.values())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
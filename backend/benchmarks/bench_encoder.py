@@ -0,0 +1,70 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compare the stream event encoder with json.dumps(default=custom_default).
+
+Usage: python -m backend.benchmarks.bench_encoder [--repeat N]
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Callable
+
+from backend.benchmarks.streams import STREAMS
+from backend.common.encoder import encode_event
+from backend.common.projection import project_event
+from backend.common.serialization import custom_default
+
+
+def json_encoder(event: Any) -> bytes:
+    # StreamingResponse encodes str chunks to UTF-8, so include that cost
+    return (json.dumps(event, default=custom_default) + "\n").encode()
+
+
+ENCODERS: dict[str, Callable[[Any], bytes]] = {
+    "json+custom_default": json_encoder,
+    "encode_event": encode_event,
+}
+
+
+def run(repeat: int) -> None:
+    print(f"{'stream':<18}{'schema':<9}{'encoder':<21}{'us/event':>10}{'bytes':>10}")
+    for stream_name, build in STREAMS.items():
+        legacy = build()
+        compact = [e for e in map(project_event, legacy) if e is not None]
+        for schema, events in (("legacy", legacy), ("compact", compact)):
+            for encoder_name, encoder in ENCODERS.items():
+                size = sum(len(encoder(event)) for event in events)
+                seconds = min(
+                    timeit.repeat(
+                        lambda encoder=encoder, events=events: [
+                            encoder(event) for event in events
+                        ],
+                        number=1,
+                        repeat=repeat,
+                    )
+                )
+                per_event = seconds / len(events) * 1e6
+                print(
+                    f"{stream_name:<18}{schema:<9}{encoder_name:<21}"
+                    f"{per_event:>10.2f}{size:>10}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    run(parser.parse_args().repeat)
@@ -0,0 +1,89 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the per-token overhead of the two stream engines on every pattern.
+
+Each pattern runs against a fake model that streams tokens with no latency, so
+the time per token is the cost of the graph, the callbacks and the event
+filtering alone.
+
+Usage: python -m backend.benchmarks.bench_stream_engine [--tokens N] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable
+
+from langchain_core.messages import HumanMessage
+
+from backend.benchmarks.patterns import PATTERNS, load_pattern
+from backend.common.graph_events import stream_graph_events
+
+EVENTS = {
+    "on_tool_start",
+    "on_tool_end",
+    "on_retriever_start",
+    "on_retriever_end",
+    "on_chat_model_stream",
+}
+
+
+async def events_engine(chain: Any, input_data: Any) -> AsyncIterator[dict]:
+    async for event in chain.astream_events(
+        input_data, version="v2", include_tags=["include"]
+    ):
+        if event["event"] in EVENTS:
+            yield event
+
+
+ENGINES: dict[str, Callable[[Any, Any], AsyncIterator[dict]]] = {
+    "events": events_engine,
+    "graph": stream_graph_events,
+}
+
+
+async def measure(engine: Callable, chain: Any, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        input_data = {"messages": [HumanMessage("What is the status of invoice_001?")]}
+        start = time.perf_counter()
+        count = 0
+        async for event in engine(chain, input_data):
+            if event["event"] == "on_chat_model_stream":
+                count += 1
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+async def run(tokens: int, repeat: int) -> None:
+    print(f"{'pattern':<18}{'engine':<9}{'tokens':>8}{'ms/run':>10}{'us/token':>10}")
+    for name in PATTERNS:
+        chain = load_pattern(name, tokens=tokens).chain
+        for engine_name, engine in ENGINES.items():
+            seconds, count = await measure(engine, chain, repeat)
+            print(
+                f"{name:<18}{engine_name:<9}{count:>8}"
+                f"{seconds * 1e3:>10.2f}{seconds / max(count, 1) * 1e6:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.tokens, args.repeat))
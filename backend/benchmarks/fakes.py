@@ -0,0 +1,144 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline stand-ins for the model gateway and vector store used by the patterns."""
+
+import json
+import uuid
+from typing import Any, Iterator, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableLambda
+
+from backend.benchmarks.streams import WORDS
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """
+    Streams ``tokens`` words per answer with no network latency.
+
+    Once tools are bound, a conversation ending in a human message gets a
+    single call to ``tool_name`` with ``tool_args`` instead of an answer.
+    """
+
+    tokens: int = 100
+    tool_name: Optional[str] = None
+    tool_args: dict[str, Any] = {}
+    tools_bound: bool = False
+    structured_output: dict[str, Any] = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming-chat-model"
+
+    def _wants_tool_call(self, messages: list[BaseMessage]) -> bool:
+        return (
+            self.tools_bound
+            and self.tool_name is not None
+            and bool(messages)
+            and messages[-1].type == "human"
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message: Any = AIMessageChunk(content="")
+        for chunk in self._stream(messages, stop, None, **kwargs):
+            message = message + chunk.message
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(**message.model_dump()))]
+        )
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self._wants_tool_call(messages):
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": self.tool_name,
+                            "args": json.dumps(self.tool_args),
+                            "id": f"call_{uuid.uuid4().hex[:24]}",
+                            "index": 0,
+                        }
+                    ],
+                )
+            )
+            if run_manager:
+                run_manager.on_llm_new_token("", chunk=chunk)
+            yield chunk
+            return
+
+        for i in range(self.tokens):
+            token = WORDS[i % len(WORDS)] + " "
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeStreamingChatModel":
+        return self.model_copy(update={"tools_bound": True})
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Any:
+        return RunnableLambda(lambda _: schema(**self.structured_output))
+
+
+class FakeRetriever(BaseRetriever):
+    """Returns ``k`` fixed documents for any query."""
+
+    k: int = 5
+
+    def _get_relevant_documents(self, query: str, **kwargs: Any) -> list[Document]:
+        return fake_documents(self.k)
+
+
+class FakeVectorStore:
+    """The subset of PGVector the patterns call."""
+
+    def similarity_search(self, query: str, k: int = 5) -> list[Document]:
+        return fake_documents(k)
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 5
+    ) -> list[tuple[Document, float]]:
+        return [(doc, 0.1) for doc in fake_documents(k)]
+
+    def as_retriever(self, **kwargs: Any) -> FakeRetriever:
+        return FakeRetriever()
+
+
+def fake_documents(k: int) -> list[Document]:
+    return [
+        Document(
+            id=f"doc-{i}",
+            page_content=" ".join(WORDS) * 4,
+            metadata={"source": f"bill-{i}.pdf", "title": f"House Bill {100 + i}"},
+        )
+        for i in range(k)
+    ]
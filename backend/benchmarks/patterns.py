@@ -0,0 +1,80 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Load the patterns in backend/patterns with their gateway and store faked."""
+
+import importlib
+import os
+from types import ModuleType
+from typing import Any
+
+from backend.benchmarks.fakes import (
+    FakeRetriever,
+    FakeStreamingChatModel,
+    FakeVectorStore,
+)
+
+PATTERN_ENV = {
+    "MODEL_GATEWAY_MODEL_ID": "fake-model",
+    "EMBEDDING_MODEL_ID": "fake-embeddings",
+    "OPENAI_API_KEY": "fake-key",
+    "TAVILY_API_KEY": "fake-key",
+    "DB_USER": "fake",
+    "DB_PASSWORD": "fake",
+    "DB_HOST": "localhost",
+    "DB_NAME": "fake",
+    "COLLECTION_NAME": "fake",
+}
+
+PATTERNS = ["invoice_agent", "basic_rag_qa", "advanced_rag_qa", "agentic_rag"]
+
+
+def load_pattern(name: str, tokens: int = 100) -> ModuleType:
+    """Import a pattern module and replace its model and vector store with fakes."""
+    for key, value in PATTERN_ENV.items():
+        os.environ.setdefault(key, value)
+    module = importlib.import_module(f"backend.patterns.{name}.chain")
+
+    if name == "invoice_agent":
+        module.llm = FakeStreamingChatModel(
+            tokens=tokens,
+            tool_name="fetch_invoice_info",
+            tool_args={"invoice_id": "invoice_001"},
+        ).bind_tools(module.tools)
+    elif name == "basic_rag_qa":
+        module.llm = FakeStreamingChatModel(tokens=tokens)
+        module.vector_store = FakeVectorStore()
+    elif name == "advanced_rag_qa":
+        module.llm = FakeStreamingChatModel(
+            tokens=tokens,
+            tool_name="retrieve_documents",
+            tool_args={"query": "budget"},
+        )
+        module.vector_store = FakeVectorStore()
+    elif name == "agentic_rag":
+
+        def chat_model(**kwargs: Any) -> FakeStreamingChatModel:
+            return FakeStreamingChatModel(
+                tokens=tokens,
+                tool_name="retrieve_tennessee_documents",
+                tool_args={"query": "budget"},
+                structured_output={"binary_score": "yes"},
+            )
+
+        module.ChatOpenAI = chat_model
+        module.retriever = FakeRetriever()
+    else:
+        raise ValueError(f"Unknown pattern: {name}")
+
+    return module
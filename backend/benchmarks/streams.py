@@ -0,0 +1,129 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Event streams shaped like the ones the patterns emit through astream_events v2.
+
+Each stream mirrors the events, metadata and payload sizes captured from a
+typical invoice_agent and advanced_rag_qa answer so that benchmarks run
+without a model gateway or vector store.
+"""
+
+import uuid
+from typing import Any
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+WORDS = (
+    "The Tennessee General Assembly passed the appropriations bill after the "
+    "finance committee reviewed the amended budget for the next fiscal year "
+).split()
+
+
+def _base(event: str, name: str, run_id: str, node: str) -> dict[str, Any]:
+    return {
+        "event": event,
+        "name": name,
+        "run_id": run_id,
+        "tags": ["include"],
+        "metadata": {
+            "langgraph_step": 2,
+            "langgraph_node": node,
+            "langgraph_triggers": ["branch:to:" + node],
+            "langgraph_path": ["__pregel_pull", node],
+            "langgraph_checkpoint_ns": f"{node}:{uuid.uuid4()}",
+            "checkpoint_ns": f"{node}:{uuid.uuid4()}",
+            "ls_provider": "openai",
+            "ls_model_name": "gpt-4o-mini",
+            "ls_model_type": "chat",
+            "ls_temperature": 0.0,
+        },
+        "parent_ids": [str(uuid.uuid4()), str(uuid.uuid4())],
+    }
+
+
+def token_events(count: int, node: str = "agent") -> list[dict[str, Any]]:
+    """Return ``count`` chat model token events from one model run."""
+    run_id = str(uuid.uuid4())
+    message_id = f"run-{uuid.uuid4()}"
+    events = []
+    for i in range(count):
+        event = _base("on_chat_model_stream", "ChatOpenAI", run_id, node)
+        event["data"] = {
+            "chunk": AIMessageChunk(content=WORDS[i % len(WORDS)] + " ", id=message_id)
+        }
+        events.append(event)
+    return events
+
+
+def invoice_agent_stream() -> list[dict[str, Any]]:
+    """A tool call to fetch_invoice_info followed by a 150 token answer."""
+    run_id = str(uuid.uuid4())
+    tool_input = {"invoice_id": "invoice_001"}
+    start = _base("on_tool_start", "fetch_invoice_info", run_id, "tools")
+    start["data"] = {"input": tool_input}
+    end = _base("on_tool_end", "fetch_invoice_info", run_id, "tools")
+    end["data"] = {
+        "input": tool_input,
+        "output": ToolMessage(
+            content='{"supplier": "ABC Corp", "amount": 1500, '
+            '"date": "2023-10-01", "status": "Paid"}',
+            name="fetch_invoice_info",
+            tool_call_id=f"call_{uuid.uuid4().hex[:24]}",
+        ),
+    }
+    return [start, end] + token_events(150)
+
+
+def advanced_rag_qa_stream() -> list[dict[str, Any]]:
+    """A retrieval of five ~1 KB documents followed by a 400 token answer."""
+    run_id = str(uuid.uuid4())
+    tool_input = {"query": "appropriations bill budget"}
+    docs = [
+        Document(
+            id=str(uuid.uuid4()),
+            page_content=" ".join(WORDS) * 8,
+            metadata={
+                "source": f"/data/legislation/bill-{i}.pdf",
+                "title": f"House Bill {100 + i}",
+                "page": i,
+                "total_pages": 42,
+                "producer": "Microsoft Word",
+                "creationdate": "2024-02-01T10:00:00+00:00",
+            },
+        )
+        for i in range(5)
+    ]
+    start = _base("on_tool_start", "retrieve_documents", run_id, "tools")
+    start["data"] = {"input": tool_input}
+    end = _base("on_tool_end", "retrieve_documents", run_id, "tools")
+    end["data"] = {
+        "input": tool_input,
+        "output": ToolMessage(
+            content="\n\n".join(
+                f"Source: {doc.metadata}\nContent: {doc.page_content}" for doc in docs
+            ),
+            name="retrieve_documents",
+            tool_call_id=f"call_{uuid.uuid4().hex[:24]}",
+            artifact=docs,
+        ),
+    }
+    return [start, end] + token_events(400, node="call_model")
+
+
+STREAMS = {
+    "invoice_agent": invoice_agent_stream,
+    "advanced_rag_qa": advanced_rag_qa_stream,
+}
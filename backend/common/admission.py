@@ -0,0 +1,159 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Admission control for concurrent chain runs."""
+
+import asyncio
+from collections import deque
+from typing import Any
+
+
+class AdmissionRejected(Exception):
+    """The run was not admitted; retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionSlot:
+    """The ``count`` slots taken by :meth:`AdmissionController.acquire`."""
+
+    def __init__(
+        self, controller: "AdmissionController", user: str, count: int = 1
+    ) -> None:
+        self.controller = controller
+        self.user = user
+        self.count = count
+        self.released = False
+
+    def release(self) -> None:
+        """Give the slots back; releasing them again is a no-op."""
+        if not self.released:
+            self.released = True
+            for _ in range(self.count):
+                self.controller.release(self.user)
+
+
+class AdmissionController:
+    """
+    Bounds concurrent runs globally and per user.
+
+    A user already holding ``max_per_user`` slots, queued ones included, is
+    rejected right away. Otherwise the run takes one of ``max_in_flight``
+    slots, or waits for one in a FIFO queue of at most ``max_queue`` entries
+    for up to ``queue_timeout`` seconds. A full queue is rejected right away.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 32,
+        max_per_user: int = 4,
+        max_queue: int = 64,
+        queue_timeout: float = 10,
+        retry_after: float = 2,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.rejected = 0
+        self._users: dict[str, int] = {}
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "max_in_flight": self.max_in_flight,
+        }
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(reason, self.retry_after)
+
+    async def acquire(self, user: str, count: int = 1) -> AdmissionSlot:
+        """
+        Take a slot for ``user``, raising :class:`AdmissionRejected` if refused.
+
+        With ``count`` above one, e.g. for the concurrency of a batch, up to
+        ``count - 1`` more slots are taken as long as they are free right away;
+        the returned slot's ``count`` says how many were taken.
+        """
+        if self._users.get(user, 0) >= self.max_per_user:
+            raise self._reject("Too many concurrent requests for this user")
+
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+        else:
+            if self.queued >= self.max_queue:
+                raise self._reject("Server is at capacity")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._users[user] = self._users.get(user, 0) + 1
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                self._drop_user(user)
+                if waiter.done() and not waiter.cancelled():
+                    # Handed a slot just as the wait ended; pass it on
+                    self._release_slot()
+                else:
+                    waiter.cancel()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._reject("Timed out waiting for capacity") from None
+                raise
+            self._drop_user(user)
+
+        self._users[user] = self._users.get(user, 0) + 1
+        slot = AdmissionSlot(self, user)
+        while (
+            slot.count < count
+            and self._users[user] < self.max_per_user
+            and self.in_flight < self.max_in_flight
+            and not self.queued
+        ):
+            self.in_flight += 1
+            self._users[user] += 1
+            slot.count += 1
+        return slot
+
+    def release(self, user: str) -> None:
+        """Give back the slot taken by :meth:`acquire` for ``user``."""
+        self._drop_user(user)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes directly to the next waiter
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _drop_user(self, user: str) -> None:
+        count = self._users.get(user, 0) - 1
+        if count > 0:
+            self._users[user] = count
+        else:
+            self._users.pop(user, None)
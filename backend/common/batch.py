@@ -0,0 +1,357 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Batch invocation of a chain over many conversations.
+
+Items run with at most ``max_concurrency`` in flight and their results are
+yielded as each one finishes, so a batch only ever holds the items that are
+running. A failing or timed out item fails its own result, not the batch.
+
+Batch jobs spool their JSONL input and output to disk and run in background
+tasks, so clients can submit large batches and read the results later.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, AsyncIterable, Iterable, Optional, Union
+
+from langchain_core.messages import AIMessage
+from pydantic import ValidationError
+
+from backend.common.encoder import encode_event
+from backend.models.requests import ConversationInputWrapper
+
+logger = logging.getLogger("batch")
+
+# Directory the JSONL input and output of batch jobs are spooled to
+BATCH_JOB_DIR = os.getenv("BATCH_JOB_DIR") or tempfile.gettempdir()
+
+BatchItems = Union[Iterable[Any], AsyncIterable[Any]]
+
+
+class BatchInputTooLarge(Exception):
+    """A spooled batch body went over its size limit."""
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Batch input is limited to {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def batch_output(input_data: dict[str, Any], output: Any) -> Any:
+    """Reduce a chain output to the messages the run added and its answer."""
+    if not isinstance(output, dict) or "messages" not in output:
+        return output
+    messages = output["messages"][len(input_data.get("messages") or []) :]
+    answer = None
+    if messages and isinstance(messages[-1], AIMessage):
+        answer = messages[-1].text
+    return {"answer": answer, "messages": messages}
+
+
+async def invoke_item(
+    chain: Any,
+    index: int,
+    input_data: dict[str, Any],
+    timeout: Optional[float] = None,
+    metadata: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """Invoke ``chain`` on one item and return its result, timing included."""
+    started = time.monotonic()
+    config = {"metadata": {**(metadata or {}), "batch_index": index}}
+    result: dict[str, Any] = {"index": index}
+    try:
+        output = await asyncio.wait_for(chain.ainvoke(input_data, config), timeout)
+    except asyncio.TimeoutError:
+        result.update(status="error", error=f"Timed out after {timeout} s")
+    except Exception as e:
+        logger.warning(f"Batch item {index} failed: {e}")
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    else:
+        result.update(status="ok", output=batch_output(input_data, output))
+    result["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return result
+
+
+async def _aiter(items: BatchItems) -> AsyncGenerator[Any, None]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def run_batch(
+    chain: Any,
+    items: BatchItems,
+    max_concurrency: int = 8,
+    timeout: Optional[float] = None,
+    metadata: Optional[dict[str, Any]] = None,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """
+    Run ``chain`` over ``items`` and yield each result as soon as it finishes.
+
+    Items are chain inputs, numbered from 0 in the order they are read; an
+    exception in place of an input (e.g. a line that failed to parse) is
+    reported as that item's error. Results carry the item ``index``, a
+    ``status`` of "ok" or "error", the ``output`` or ``error`` and the
+    item's ``elapsed_ms``. Unfinished items are cancelled if the consumer
+    stops early.
+    """
+    pending: set[asyncio.Task] = set()
+    index = 0
+    try:
+        async for item in _aiter(items):
+            if isinstance(item, Exception):
+                yield {
+                    "index": index,
+                    "status": "error",
+                    "error": str(item),
+                    "elapsed_ms": 0.0,
+                }
+                index += 1
+                continue
+            while len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+            pending.add(
+                asyncio.create_task(invoke_item(chain, index, item, timeout, metadata))
+            )
+            index += 1
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def read_jsonl_inputs(path: str) -> Iterable[Union[dict[str, Any], Exception]]:
+    """Parse a JSONL file of ``ConversationInputWrapper`` lines into chain inputs."""
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                wrapper = ConversationInputWrapper.model_validate_json(line)
+            except ValidationError as e:
+                yield ValueError(f"Invalid input on line {number}: {e}")
+            else:
+                yield wrapper.input_data.model_dump()
+
+
+class BatchJob:
+    """A JSONL batch running in the background, with results spooled to disk."""
+
+    def __init__(
+        self, job_id: str, owner: Optional[str], chain_name: str, input_path: str
+    ) -> None:
+        self.job_id = job_id
+        self.owner = owner
+        self.chain_name = chain_name
+        self.input_path = input_path
+        fd, self.results_path = tempfile.mkstemp(
+            prefix=f"batch-{job_id}-", suffix=".out.jsonl", dir=BATCH_JOB_DIR
+        )
+        os.close(fd)
+        self.status = "running"
+        self.completed = 0
+        self.failed = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "chain": self.chain_name,
+            "status": self.status,
+            "completed": self.completed,
+            "failed": self.failed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def read_results(self) -> AsyncGenerator[bytes, None]:
+        """Yield the result lines written so far, then follow the job to its end."""
+        with open(self.results_path, "rb") as f:
+            while True:
+                changed = self._changed
+                line = f.readline()
+                if line.endswith(b"\n"):
+                    yield line
+                    continue
+                # A partial line is re-read once the writer has finished it
+                f.seek(-len(line), os.SEEK_CUR)
+                if self.done:
+                    return
+                await changed.wait()
+
+    def remove_files(self) -> None:
+        for path in (self.input_path, self.results_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class BatchJobRegistry:
+    """
+    Batch jobs started on this process.
+
+    At most ``max_running`` jobs run at once. Finished jobs and their files are
+    kept for ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float = 3600, max_running: int = 4) -> None:
+        self.ttl = ttl
+        self.max_running = max_running
+        self._jobs: OrderedDict[str, BatchJob] = OrderedDict()
+
+    @property
+    def running(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.done)
+
+    async def spool(
+        self, chunks: AsyncIterable[bytes], max_bytes: Optional[int] = None
+    ) -> str:
+        """
+        Write an uploaded JSONL body to a file and return its path.
+
+        Raises :class:`BatchInputTooLarge`, leaving no file behind, once the
+        body goes over ``max_bytes``.
+        """
+        fd, path = tempfile.mkstemp(
+            prefix="batch-", suffix=".in.jsonl", dir=BATCH_JOB_DIR
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                size = 0
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise BatchInputTooLarge(max_bytes)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path
+
+    def start(
+        self,
+        chain: Any,
+        chain_name: str,
+        input_path: str,
+        owner: Optional[str] = None,
+        max_concurrency: int = 8,
+        timeout: Optional[float] = None,
+    ) -> BatchJob:
+        """Run the spooled inputs at ``input_path`` through ``chain``."""
+        self._expire()
+        job = BatchJob(str(uuid.uuid4()), owner, chain_name, input_path)
+        self._jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, chain, max_concurrency, timeout))
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job: BatchJob) -> None:
+        """Cancel a job if it is running and delete it with its files."""
+        if job.task is not None and not job.done:
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+        self._jobs.pop(job.job_id, None)
+        job.remove_files()
+
+    async def aclose(self) -> None:
+        for job in list(self._jobs.values()):
+            await self.cancel(job)
+
+    async def _run(
+        self,
+        job: BatchJob,
+        chain: Any,
+        max_concurrency: int,
+        timeout: Optional[float],
+    ) -> None:
+        results = run_batch(
+            chain,
+            read_jsonl_inputs(job.input_path),
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+            metadata={"batch_id": job.job_id},
+        )
+        try:
+            with open(job.results_path, "ab") as f:
+                async for result in results:
+                    f.write(encode_event(result))
+                    f.flush()
+                    job.completed += 1
+                    if result["status"] == "error":
+                        job.failed += 1
+                    job._notify()
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Batch job {job.job_id} failed: {e}")
+            job.finish("failed", str(e))
+        else:
+            logger.info(
+                f"Batch job {job.job_id} finished: {job.completed} items, "
+                f"{job.failed} failed"
+            )
+            job.finish("succeeded")
+        finally:
+            await results.aclose()
+
+    def _expire(self) -> None:
+        deadline = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < deadline:
+                del self._jobs[job_id]
+                job.remove_files()
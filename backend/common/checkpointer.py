@@ -0,0 +1,121 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Postgres checkpointer for conversation state kept on the server.
+
+A graph run with the checkpointer loads the state saved for its thread at the
+start of a turn and saves it after every step, so clients only send the new
+messages of a turn. The connection pool is opened and the checkpoint tables
+are created on first use.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from backend.database.config import get_database_url
+
+logger = logging.getLogger("checkpointer")
+
+CHECKPOINT_POOL_MAX_SIZE = int(os.getenv("CHECKPOINT_POOL_MAX_SIZE", "10"))
+
+_pool: Optional[AsyncConnectionPool] = None
+_checkpointer: Optional[AsyncPostgresSaver] = None
+_lock = asyncio.Lock()
+
+
+def checkpoint_conninfo() -> str:
+    """The application database URL in the form psycopg expects."""
+    return get_database_url().replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def get_checkpointer() -> AsyncPostgresSaver:
+    """Return the shared checkpointer, connecting and setting it up on first use."""
+    global _pool, _checkpointer
+    if _checkpointer is not None:
+        return _checkpointer
+    async with _lock:
+        if _checkpointer is None:
+            pool = AsyncConnectionPool(
+                checkpoint_conninfo(),
+                max_size=CHECKPOINT_POOL_MAX_SIZE,
+                open=False,
+                kwargs={
+                    "autocommit": True,
+                    "prepare_threshold": 0,
+                    "row_factory": dict_row,
+                },
+            )
+            await pool.open()
+            checkpointer = AsyncPostgresSaver(pool)
+            try:
+                await checkpointer.setup()
+            except Exception:
+                await pool.close()
+                raise
+            _pool, _checkpointer = pool, checkpointer
+            logger.info("Conversation checkpointer ready")
+    return _checkpointer
+
+
+async def aclose_checkpointer() -> None:
+    global _pool, _checkpointer
+    if _pool is not None:
+        await _pool.close()
+    _pool, _checkpointer = None, None
+
+
+def unanswered_tool_calls(messages: list[BaseMessage]) -> list[ToolMessage]:
+    """
+    Tool results for the tool calls a saved conversation left unanswered.
+
+    A turn cancelled while a tool was running leaves a tool call without its
+    result in the thread, which the model gateway rejects on the next turn.
+    """
+    answered = {m.tool_call_id for m in messages if isinstance(m, ToolMessage)}
+    return [
+        ToolMessage(
+            content="The tool call was cancelled.",
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+        )
+        for message in messages
+        if isinstance(message, AIMessage)
+        for tool_call in message.tool_calls
+        if tool_call["id"] not in answered
+    ]
+
+
+async def thread_input(
+    chain: Any, config: RunnableConfig, input_data: dict[str, Any]
+) -> dict[str, Any]:
+    """Add results for unanswered tool calls of the thread ahead of the turn."""
+    state = await chain.aget_state(config)
+    repairs = unanswered_tool_calls(state.values.get("messages") or [])
+    if not repairs:
+        return input_data
+    logger.info(
+        f"Closing {len(repairs)} unanswered tool calls in thread "
+        f"{config['configurable']['thread_id']}"
+    )
+    return {**input_data, "messages": [*repairs, *input_data.get("messages", [])]}
@@ -0,0 +1,73 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Connection pools and HTTP clients shared by every hosted pattern.
+
+Patterns call these factories instead of creating their own engines and
+clients, so a process hosting several patterns keeps one warm pool per
+database and one keep-alive pool to the model gateway.
+"""
+
+import os
+from typing import Any, Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+GATEWAY_MAX_CONNECTIONS = int(os.getenv("GATEWAY_MAX_CONNECTIONS", "100"))
+GATEWAY_MAX_KEEPALIVE = int(os.getenv("GATEWAY_MAX_KEEPALIVE", "20"))
+
+_engines: dict[str, AsyncEngine] = {}
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_async_engine(url: str) -> AsyncEngine:
+    """Return the engine for ``url``, creating it on first use."""
+    engine = _engines.get(url)
+    if engine is None:
+        engine = _engines[url] = create_async_engine(url, pool_pre_ping=True)
+    return engine
+
+
+def gateway_clients() -> dict[str, Any]:
+    """
+    Keyword arguments that make ChatOpenAI and OpenAIEmbeddings share one
+    connection pool to the model gateway.
+    """
+    global _http_client, _http_async_client
+    limits = httpx.Limits(
+        max_connections=GATEWAY_MAX_CONNECTIONS,
+        max_keepalive_connections=GATEWAY_MAX_KEEPALIVE,
+    )
+    if _http_client is None:
+        _http_client = httpx.Client(limits=limits)
+    if _http_async_client is None:
+        _http_async_client = httpx.AsyncClient(limits=limits)
+    return {"http_client": _http_client, "http_async_client": _http_async_client}
+
+
+async def aclose_clients() -> None:
+    """Close the shared clients and dispose of the engine pools."""
+    global _http_client, _http_async_client
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+    if _http_async_client is not None:
+        await _http_async_client.aclose()
+        _http_async_client = None
+    for engine in _engines.values():
+        await engine.dispose()
+    _engines.clear()
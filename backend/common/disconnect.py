@@ -0,0 +1,74 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cancellation of streamed chain runs when the client goes away."""
+
+import asyncio
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable
+
+
+class ClientDisconnected(Exception):
+    """Raised in place of the next event once the client has disconnected."""
+
+
+async def cancel_on_disconnect(
+    events: AsyncIterator[Any],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    poll_interval: float = 0.25,
+) -> AsyncGenerator[Any, None]:
+    """
+    Relay ``events`` until ``is_disconnected`` reports the client has gone.
+
+    The connection is polled in a background task. A disconnect detected while
+    the next event is being produced cancels that wait, so the cancellation
+    reaches the in-flight graph run and its model and retrieval calls; one
+    detected while an event is being sent stops the stream before the next
+    event is requested. Either way ``events`` is closed and
+    :class:`ClientDisconnected` is raised.
+    """
+    task = asyncio.current_task()
+    waiting = False
+    disconnected = False
+
+    async def watch() -> None:
+        nonlocal disconnected
+        while not await is_disconnected():
+            await asyncio.sleep(poll_interval)
+        disconnected = True
+        if waiting and task is not None:
+            task.cancel()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        while not disconnected:
+            waiting = True
+            try:
+                event = await anext(events)
+            except StopAsyncIteration:
+                return
+            finally:
+                waiting = False
+            yield event
+    except asyncio.CancelledError:
+        # Only swallow the cancellation this generator requested itself
+        if not disconnected or task is None or task.cancelling() != 1:
+            raise
+        task.uncancel()
+    finally:
+        watcher.cancel()
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    raise ClientDisconnected()
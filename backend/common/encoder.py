@@ -0,0 +1,104 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Fast JSON encoding for streamed events and API responses.
+
+UUIDs, datetimes and dataclasses are handled natively by orjson. LangChain
+messages and documents are dumped shallowly through a per-type dispatch table
+instead of a full ``model_dump()``, and other pydantic models are embedded as
+pre-serialized JSON fragments.
+"""
+
+from typing import Any, Callable
+
+import orjson
+from fastapi.responses import JSONResponse
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessageChunk, BaseMessage, ToolMessage
+from pydantic import BaseModel
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _shallow_dump(obj: BaseModel) -> dict[str, Any]:
+    # Nested values are handed back to orjson, which calls default() again only
+    # for the ones it cannot encode itself.
+    return {name: getattr(obj, name) for name in type(obj).model_fields}
+
+
+def _dump_document(doc: Document) -> dict[str, Any]:
+    return {
+        "id": doc.id,
+        "metadata": doc.metadata,
+        "page_content": doc.page_content,
+        "type": "Document",
+    }
+
+
+def _dump_model(obj: BaseModel) -> Any:
+    try:
+        return orjson.Fragment(obj.model_dump_json())
+    except Exception:
+        return obj.model_dump()
+
+
+_ENCODERS: dict[type, Callable[[Any], Any]] = {
+    AIMessageChunk: _shallow_dump,
+    ToolMessage: _shallow_dump,
+    Document: _dump_document,
+}
+
+# Base classes with a dedicated encoder, checked in order for unseen types
+_BASE_ENCODERS: tuple[tuple[type, Callable[[Any], Any]], ...] = (
+    (BaseMessage, _shallow_dump),
+    (Document, _dump_document),
+    (BaseModel, _dump_model),
+)
+
+
+def encoder_default(obj: Any) -> Any:
+    """
+    Convert objects orjson cannot encode natively, dispatching on their type.
+
+    Unknown types fall back to ``str()`` like ``custom_default``.
+    """
+    encoder = _ENCODERS.get(type(obj))
+    if encoder is None:
+        encoder = str
+        for base, base_encoder in _BASE_ENCODERS:
+            if isinstance(obj, base):
+                encoder = base_encoder
+                break
+        _ENCODERS[type(obj)] = encoder
+    return encoder(obj)
+
+
+def encode(obj: Any) -> bytes:
+    """Serialize ``obj`` to JSON bytes."""
+    return orjson.dumps(obj, default=encoder_default, option=_OPTIONS)
+
+
+def encode_event(event: Any) -> bytes:
+    """Serialize a stream event to a single newline-terminated JSON line."""
+    return orjson.dumps(
+        event, default=encoder_default, option=_OPTIONS | orjson.OPT_APPEND_NEWLINE
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with :func:`encode`."""
+
+    def render(self, content: Any) -> bytes:
+        return encode(content)
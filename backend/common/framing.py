@@ -0,0 +1,115 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Coalescing of consecutive token events into larger stream frames."""
+
+import asyncio
+import time
+from typing import Any, AsyncGenerator, AsyncIterator, Optional
+
+
+def token_text(event: dict[str, Any]) -> Optional[str]:
+    """Return the text delta of a token event, or None if it cannot be merged."""
+    if event.get("event") != "on_chat_model_stream":
+        return None
+    chunk = event.get("data", {}).get("chunk")
+    content = chunk.get("content") if isinstance(chunk, dict) else None
+    if content is None:
+        content = getattr(chunk, "content", None)
+    if isinstance(content, str) and content:
+        return content
+    return None
+
+
+def _token_frame(first: dict[str, Any], parts: list[str]) -> dict[str, Any]:
+    return {
+        "event": "on_chat_model_stream",
+        "name": first.get("name"),
+        "run_id": first.get("run_id"),
+        "data": {"chunk": {"type": "AIMessageChunk", "content": "".join(parts)}},
+    }
+
+
+_END = object()
+
+
+async def _pump(
+    events: AsyncIterator[dict[str, Any]], queue: "asyncio.Queue[Any]"
+) -> None:
+    try:
+        async for event in events:
+            await queue.put(event)
+    except Exception as e:
+        await queue.put(e)
+    await queue.put(_END)
+
+
+async def coalesce_token_events(
+    events: AsyncIterator[dict[str, Any]],
+    window: float = 0.03,
+    max_bytes: int = 4096,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """
+    Merge consecutive token deltas from the same model run into single frames.
+
+    A frame is flushed once ``window`` seconds have passed since its first
+    token, once it holds ``max_bytes`` of text, or as soon as any other event
+    arrives, so tool and retriever events keep their position in the stream.
+    """
+    # The source is drained by a single task so it always runs in one context
+    queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=64)
+    producer = asyncio.create_task(_pump(events, queue))
+    first: Optional[dict[str, Any]] = None
+    parts: list[str] = []
+    size = 0
+    started = 0.0
+
+    try:
+        while True:
+            if first is None:
+                item = await queue.get()
+            else:
+                # Wait for the next event only as long as the open frame allows
+                remaining = window - (time.monotonic() - started)
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(remaining, 0))
+                except asyncio.TimeoutError:
+                    yield _token_frame(first, parts)
+                    first, parts, size = None, [], 0
+                    continue
+
+            text = token_text(item) if isinstance(item, dict) else None
+            if first is not None and (
+                text is None or item.get("run_id") != first.get("run_id")
+            ):
+                yield _token_frame(first, parts)
+                first, parts, size = None, [], 0
+
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if text is None:
+                yield item
+                continue
+
+            if first is None:
+                first, started = item, time.monotonic()
+            parts.append(text)
+            size += len(text.encode())
+            if size >= max_bytes:
+                yield _token_frame(first, parts)
+                first, parts, size = None, [], 0
+    finally:
+        producer.cancel()
@@ -0,0 +1,126 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Stream events from a compiled LangGraph graph using its native stream modes.
+
+``astream_events`` builds an event for every runnable in the graph through the
+callback machinery and leaves the filtering to the caller. This module instead
+asks the graph for ``messages``, ``updates`` and ``custom`` output only and
+translates it into the same tool, retriever and token events.
+"""
+
+from typing import Any, AsyncIterator, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.prebuilt import ToolNode
+
+STREAM_MODES = ["messages", "updates", "custom"]
+
+# Events a node may emit itself through the custom stream writer
+CUSTOM_EVENTS = {"on_retriever_start", "on_retriever_end"}
+
+
+def _tags(runnable: Any) -> list[str]:
+    config = getattr(runnable, "config", None) or {}
+    return config.get("tags") or []
+
+
+def _unwrap(runnable: Any) -> Any:
+    while hasattr(runnable, "bound"):
+        runnable = runnable.bound
+    return runnable
+
+
+def tool_events_visible(chain: Any, tag: str) -> bool:
+    """
+    Return whether tool events should be streamed for ``chain``.
+
+    Mirrors ``include_tags`` filtering: tool runs inherit the tags of the graph
+    and of the node that executes them.
+    """
+    if tag in _tags(chain):
+        return True
+    return any(
+        tag in _tags(spec.runnable) and isinstance(_unwrap(spec.runnable), ToolNode)
+        for spec in chain.builder.nodes.values()
+    )
+
+
+def _update_messages(update: Any) -> list[Any]:
+    if not isinstance(update, dict):
+        return []
+    messages = update.get("messages")
+    if messages is None:
+        return []
+    if isinstance(messages, (list, tuple)):
+        return list(messages)
+    return [messages]
+
+
+async def stream_graph_events(
+    chain: Any,
+    input_data: Any,
+    tag: str = "include",
+    config: Optional[RunnableConfig] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Stream tool, retriever and token events for runs tagged with ``tag``.
+
+    Events use the ``event``/``name``/``run_id``/``data`` layout of
+    ``astream_events`` v2. Tool starts are taken from the tool calls of the
+    model message that triggers them and tool ends from the resulting tool
+    messages, both keyed by the tool call id.
+    """
+    show_tools = tool_events_visible(chain, tag)
+
+    async for mode, chunk in chain.astream(
+        input_data, config, stream_mode=STREAM_MODES
+    ):
+        if mode == "messages":
+            message, metadata = chunk
+            # Completed messages are also replayed here; only stream deltas
+            if isinstance(message, AIMessageChunk) and tag in metadata.get("tags", []):
+                yield {
+                    "event": "on_chat_model_stream",
+                    "name": metadata.get("langgraph_node"),
+                    "run_id": message.id,
+                    "data": {"chunk": message},
+                }
+
+        elif mode == "updates":
+            if not show_tools or not isinstance(chunk, dict):
+                continue
+            for update in chunk.values():
+                for message in _update_messages(update):
+                    if isinstance(message, AIMessage):
+                        for tool_call in message.tool_calls:
+                            yield {
+                                "event": "on_tool_start",
+                                "name": tool_call["name"],
+                                "run_id": tool_call["id"],
+                                "data": {"input": tool_call["args"]},
+                            }
+                    elif isinstance(message, ToolMessage):
+                        yield {
+                            "event": "on_tool_end",
+                            "name": message.name,
+                            "run_id": message.tool_call_id,
+                            "data": {"output": message},
+                        }
+
+        elif mode == "custom":
+            if isinstance(chunk, dict) and chunk.get("event") in CUSTOM_EVENTS:
+                yield chunk
@@ -0,0 +1,212 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Token-budgeted conversation history for the patterns.
+
+Before calling the model, a pattern passes its conversation through a
+``HistoryManager``. The most recent turns that fit in the pattern's token
+budget are kept as they are, and older turns are folded into a rolling summary
+that is cached by the turns it covers, so each turn only summarizes the turns
+that newly fell out of the budget. History is cut at human messages only, so a
+tool message always stays with the AI message that called it.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Sequence
+
+from langchain_core.messages import (
+    AnyMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    get_buffer_string,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+logger = logging.getLogger("history")
+
+HISTORY_SUMMARY_ENABLED = os.getenv("HISTORY_SUMMARY_ENABLED", "true").lower() == "true"
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "512"))
+HISTORY_SUMMARY_CACHE_SIZE = int(os.getenv("HISTORY_SUMMARY_CACHE_SIZE", "1024"))
+
+SUMMARY_PROMPT = """Summarize the conversation below for an assistant that will \
+continue it. Keep the facts, names, numbers and decisions the assistant may \
+need and drop small talk. Use at most {max_words} words.
+
+{previous}Conversation:
+{conversation}"""
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+TokenCounter = Callable[[Sequence[BaseMessage]], int]
+
+
+def history_budget(pattern: str, default: int) -> int:
+    """
+    Token budget of a pattern's history: ``HISTORY_MAX_TOKENS_<PATTERN>``, then
+    ``HISTORY_MAX_TOKENS``, then ``default``. A budget of 0 keeps all history.
+    """
+    value = os.getenv(f"HISTORY_MAX_TOKENS_{pattern.upper()}") or os.getenv(
+        "HISTORY_MAX_TOKENS"
+    )
+    return int(value) if value else default
+
+
+def split_turns(messages: Sequence[AnyMessage]) -> list[list[AnyMessage]]:
+    """Split a conversation into turns, each starting at a human message."""
+    turns: list[list[AnyMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _unwrap(model: Any) -> Any:
+    # Models bound to tools or config keep the chat model in ``bound``
+    while hasattr(model, "bound"):
+        model = model.bound
+    return model
+
+
+class HistoryManager:
+    """
+    Keeps a pattern's history within ``max_tokens`` tokens of the model.
+
+    ``token_counter`` defaults to the model's own tokenizer, falling back to an
+    approximate count for models that do not provide one.
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        max_tokens: int,
+        summarize: bool = HISTORY_SUMMARY_ENABLED,
+        summary_max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS,
+        cache_size: int = HISTORY_SUMMARY_CACHE_SIZE,
+        token_counter: Optional[TokenCounter] = None,
+    ) -> None:
+        self.pattern = pattern
+        self.max_tokens = max_tokens
+        self.summarize = summarize
+        self.summary_max_tokens = summary_max_tokens
+        self.cache_size = cache_size
+        self.token_counter = token_counter
+        self._summaries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._exact_counting: dict[type, bool] = {}
+
+    def fit(self, messages: Sequence[AnyMessage], model: Any) -> list[AnyMessage]:
+        """
+        Return the history to send to ``model``: a summary of the older turns,
+        if any were left out, followed by the recent turns within the budget.
+        The current turn is always kept whole. The budget covers the history
+        only; whatever a pattern adds around it, such as retrieved context,
+        comes on top.
+        """
+        messages = list(messages)
+        if self.max_tokens <= 0:
+            return messages
+        # Short conversations are well within budget by any tokenizer
+        if count_tokens_approximately(messages) * 2 <= self.max_tokens:
+            return messages
+
+        model = _unwrap(model)
+        turns = split_turns(messages)
+        counts = [self.count_tokens(turn, model) for turn in turns]
+        if sum(counts) <= self.max_tokens:
+            return messages
+
+        budget = self.max_tokens
+        if self.summarize:
+            budget -= self.summary_max_tokens
+        kept = 1
+        used = counts[-1]
+        while kept < len(turns) and used + counts[-kept - 1] <= budget:
+            used += counts[-kept - 1]
+            kept += 1
+
+        older, recent = turns[:-kept], turns[-kept:]
+        history = [message for turn in recent for message in turn]
+        logger.info(
+            f"{self.pattern}: keeping {len(recent)} of {len(turns)} turns "
+            f"({used} of {sum(counts)} tokens)"
+        )
+        if not older or not self.summarize:
+            return history
+        summary = self.summary(older, model)
+        return [SystemMessage(content=SUMMARY_PREFIX + summary), *history]
+
+    def count_tokens(self, messages: Sequence[BaseMessage], model: Any) -> int:
+        if self.token_counter is not None:
+            return self.token_counter(messages)
+        if self._exact_counting.get(type(model), True):
+            try:
+                return model.get_num_tokens_from_messages(list(messages))
+            except Exception as e:
+                logger.warning(
+                    f"Counting tokens approximately for {type(model).__name__}: {e}"
+                )
+                self._exact_counting[type(model)] = False
+        return count_tokens_approximately(messages)
+
+    def summary(self, turns: list[list[AnyMessage]], model: Any) -> str:
+        """
+        Summarize ``turns``, extending the longest cached summary of their
+        leading turns instead of starting over.
+        """
+        keys = []
+        digest = hashlib.sha256(self.pattern.encode())
+        for turn in turns:
+            digest.update(get_buffer_string(turn).encode())
+            digest.update(b"\0")
+            keys.append(digest.hexdigest())
+
+        previous = None
+        start = 0
+        with self._lock:
+            for index in range(len(keys) - 1, -1, -1):
+                if keys[index] in self._summaries:
+                    self._summaries.move_to_end(keys[index])
+                    previous = self._summaries[keys[index]]
+                    start = index + 1
+                    break
+        if start == len(turns):
+            return previous or ""
+
+        conversation = [message for turn in turns[start:] for message in turn]
+        prompt = SUMMARY_PROMPT.format(
+            max_words=int(self.summary_max_tokens * 0.75),
+            previous=f"Summary so far:\n{previous}\n\n" if previous else "",
+            conversation=get_buffer_string(conversation),
+        )
+        # Run without the node's callbacks so the summary is not streamed
+        response = model.invoke(
+            [HumanMessage(content=prompt)],
+            {"callbacks": [], "run_name": "summarize_history"},
+        )
+        summary = str(response.content)
+
+        with self._lock:
+            self._summaries[keys[-1]] = summary
+            while len(self._summaries) > self.cache_size:
+                self._summaries.popitem(last=False)
+        return summary
@@ -0,0 +1,183 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Async JWKS key manager for verifying Keycloak-issued tokens."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+import httpx
+import jwt
+from fastapi import HTTPException
+
+logger = logging.getLogger("jwks")
+
+
+class JWKSKeyManager:
+    """
+    Caches the realm signing keys by ``kid`` and refreshes them without
+    blocking the event loop.
+
+    Concurrent misses share a single in-flight fetch, keys are refreshed in
+    the background once they are within ``refresh_ahead`` seconds of ``ttl``,
+    and the last good key set keeps being served for up to ``max_stale``
+    seconds if Keycloak is slow or unavailable.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl: float = 300,
+        refresh_ahead: float = 60,
+        max_stale: float = 3600,
+        min_refresh_interval: float = 10,
+        timeout: float = 5,
+        verify_tls: bool = True,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.max_stale = max_stale
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self.verify_tls = verify_tls
+        self._client = client
+        self._keys: dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._refresh_task: Optional[asyncio.Task[None]] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                verify=self.verify_tls,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Cancel any pending refresh and close the pooled HTTP client."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def clear(self) -> None:
+        """Drop all cached keys."""
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._refresh_task = None
+
+    async def _fetch(self) -> None:
+        self._last_attempt = time.monotonic()
+        logger.debug(f"Fetching JWKS from {self.jwks_url}")
+        response = await self._get_client().get(self.jwks_url)
+        response.raise_for_status()
+
+        keys: dict[str, Any] = {}
+        for jwk in response.json().get("keys", []):
+            # Keycloak also publishes encryption keys in the same set
+            if jwk.get("use", "sig") != "sig":
+                continue
+            try:
+                key = jwt.PyJWK(jwk)
+            except jwt.PyJWTError as e:
+                logger.debug(f"Skipping unusable JWK {jwk.get('kid')}: {str(e)}")
+                continue
+            keys[key.key_id or ""] = key.key
+
+        if not keys:
+            raise ValueError("JWKS did not contain any usable signing keys")
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        logger.info(f"Successfully retrieved {len(keys)} signing key(s)")
+
+    def _refresh(self) -> asyncio.Task[None]:
+        """Return the in-flight refresh, starting one if none is running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+            self._refresh_task.add_done_callback(self._log_refresh_failure)
+        return self._refresh_task
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task[None]) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to refresh JWKS: {str(task.exception())}")
+
+    async def _await_refresh(self) -> None:
+        # Shield the shared fetch so a cancelled request does not abort it for
+        # every other request waiting on the same refresh.
+        await asyncio.shield(self._refresh())
+
+    async def get_key(self, kid: Optional[str]) -> Any:
+        """
+        Return the public key for ``kid``, fetching the key set when needed.
+
+        Raises:
+            jwt.InvalidTokenError: If the key set does not contain ``kid``
+            HTTPException: If no key set younger than ``max_stale`` could be
+                retrieved
+        """
+        now = time.monotonic()
+        age = now - self._fetched_at
+
+        if not self._keys or age >= self.max_stale:
+            try:
+                await self._await_refresh()
+            except Exception as e:
+                # Past max_stale a key may have been revoked or rotated out, so
+                # the old set is no longer trusted
+                if self._keys:
+                    logger.error("JWKS is older than max_stale and refresh failed")
+                raise HTTPException(
+                    status_code=500, detail=f"Failed to fetch public key: {str(e)}"
+                )
+        elif (
+            age > self.ttl - self.refresh_ahead
+            and now - self._last_attempt >= self.min_refresh_interval
+        ):
+            # Refresh in the background and keep serving the cached keys
+            self._refresh()
+
+        key = self._lookup(kid)
+        if key is not None:
+            return key
+
+        # An unknown kid usually means Keycloak rotated its keys; refetch once,
+        # but rate limit so bogus kids cannot hammer Keycloak.
+        if time.monotonic() - self._last_attempt >= self.min_refresh_interval:
+            try:
+                await self._await_refresh()
+            except Exception:
+                pass
+            key = self._lookup(kid)
+            if key is not None:
+                return key
+
+        raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+
+    def _lookup(self, kid: Optional[str]) -> Any:
+        if kid is None:
+            # Tokens without a kid can only be matched against a single key
+            if len(self._keys) == 1:
+                return next(iter(self._keys.values()))
+            return None
+        return self._keys.get(kid)
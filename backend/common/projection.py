@@ -0,0 +1,116 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Projection of LangChain stream events onto the compact streaming schema."""
+
+from typing import Any, Optional
+
+from langchain_core.documents import Document
+from langchain_core.messages import ToolMessage
+
+from backend.common.framing import token_text
+from backend.models.responses import (
+    CompactChunk,
+    CompactChunkData,
+    CompactEndEvent,
+    CompactInputData,
+    CompactOutput,
+    CompactOutputData,
+    CompactStartEvent,
+    CompactTokenEvent,
+    SourceRef,
+)
+
+
+def source_ref(doc: Document) -> SourceRef:
+    """Reduce a document to the id and title a client renders."""
+    metadata = doc.metadata or {}
+    return SourceRef(
+        id=doc.id or metadata.get("id"),
+        title=metadata.get("title") or metadata.get("source"),
+    )
+
+
+def _documents(value: Any) -> Optional[list[Document]]:
+    if isinstance(value, (list, tuple)):
+        docs = [item for item in value if isinstance(item, Document)]
+        if docs:
+            return docs
+        # Tools returning (content, documents) tuples
+        for item in value:
+            nested = _documents(item) if isinstance(item, (list, tuple)) else None
+            if nested:
+                return nested
+    return None
+
+
+def project_output(output: Any) -> CompactOutput:
+    """Project a tool or retriever output, replacing documents with references."""
+    if isinstance(output, ToolMessage):
+        docs = _documents(output.artifact)
+        if docs is not None:
+            return CompactOutput(sources=[source_ref(doc) for doc in docs])
+        return CompactOutput(content=output.content)
+
+    docs = _documents(output)
+    if docs is not None:
+        return CompactOutput(sources=[source_ref(doc) for doc in docs])
+    if isinstance(output, Document):
+        return CompactOutput(sources=[source_ref(output)])
+    if output is None or isinstance(output, (str, int, float, bool, dict, list)):
+        return CompactOutput(content=output)
+    return CompactOutput(content=str(output))
+
+
+def project_event(event: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """
+    Project a LangChain ``astream_events`` v2 event onto the compact schema.
+
+    Only the fields clients render are kept: token text, tool name and
+    arguments, and source ids and titles. Returns None for events that carry
+    nothing to render, such as tool-call-only model chunks.
+    """
+    kind = event.get("event")
+    data = event.get("data") or {}
+    run_id = event.get("run_id")
+    run_id = str(run_id) if run_id is not None else None
+
+    if kind == "on_chat_model_stream":
+        text = token_text(event)
+        if text is None:
+            return None
+        projected: Any = CompactTokenEvent(
+            run_id=run_id, data=CompactChunkData(chunk=CompactChunk(content=text))
+        )
+    elif kind in ("on_tool_start", "on_retriever_start"):
+        tool_input = data.get("input")
+        projected = CompactStartEvent(
+            event=kind,
+            name=event.get("name"),
+            run_id=run_id,
+            data=CompactInputData(
+                input=tool_input if isinstance(tool_input, dict) else {}
+            ),
+        )
+    elif kind in ("on_tool_end", "on_retriever_end"):
+        projected = CompactEndEvent(
+            event=kind,
+            name=event.get("name"),
+            run_id=run_id,
+            data=CompactOutputData(output=project_output(data.get("output"))),
+        )
+    else:
+        return event
+
+    return projected.model_dump(exclude_none=True)
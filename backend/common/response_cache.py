@@ -0,0 +1,159 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Exact-match cache of /stream_events responses.
+
+A response is cached as the list of events it streamed, keyed by a digest of
+the normalized conversation and everything else that determines the answer:
+the chain, its collection, the deployed revision and the stream format.
+"""
+
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+import orjson
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.database.config import get_session_maker
+from backend.database.models import ResponseCache as ResponseCacheRow
+
+CachedEvents = list[dict[str, Any]]
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        # Whitespace differences do not change the question
+        return " ".join(content.split())
+    return content
+
+
+def normalize_messages(messages: list[Any]) -> list[dict[str, Any]]:
+    """
+    Reduce messages to the fields that affect the answer.
+
+    Ids, tool call ids and provider metadata differ between otherwise identical
+    conversations and are dropped.
+    """
+    normalized = []
+    for message in messages:
+        if not isinstance(message, dict):
+            message = message.model_dump()
+        entry: dict[str, Any] = {
+            "type": message.get("type"),
+            "content": _normalize_content(message.get("content")),
+        }
+        if message.get("name"):
+            entry["name"] = message["name"]
+        if message.get("tool_calls"):
+            entry["tool_calls"] = [
+                {"name": call.get("name"), "args": call.get("args")}
+                for call in message["tool_calls"]
+            ]
+        normalized.append(entry)
+    return normalized
+
+
+def response_cache_key(messages: list[Any], **scope: Optional[str]) -> str:
+    """Return a SHA-256 hex digest of the normalized conversation and ``scope``."""
+    payload = {"messages": normalize_messages(messages), **scope}
+    return hashlib.sha256(
+        orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+    ).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Storage backend for cached responses."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedEvents]:
+        """Return the events cached under ``key``, or None if absent or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, events: CachedEvents, ttl: float) -> None:
+        """Cache ``events`` under ``key`` for ``ttl`` seconds."""
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Per-process LRU cache holding up to ``max_entries`` responses."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, CachedEvents]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[CachedEvents]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, events = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return events
+
+    async def set(self, key: str, events: CachedEvents, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, events)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class PostgresResponseCache(ResponseCache):
+    """Cache shared across replicas through the ResponseCache table."""
+
+    def __init__(
+        self,
+        session_maker: Callable[
+            [], async_sessionmaker[AsyncSession]
+        ] = get_session_maker,
+    ) -> None:
+        self._session_maker = session_maker
+
+    async def get(self, key: str) -> Optional[CachedEvents]:
+        async with self._session_maker()() as session:
+            result = await session.execute(
+                select(ResponseCacheRow.events).where(
+                    ResponseCacheRow.key == key,
+                    ResponseCacheRow.expiresAt > datetime.now(timezone.utc),
+                )
+            )
+            return result.scalar_one_or_none()
+
+    async def set(self, key: str, events: CachedEvents, ttl: float) -> None:
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=ttl)
+        stmt = insert(ResponseCacheRow).values(
+            key=key, events=events, expiresAt=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResponseCacheRow.key],
+            set_={"events": stmt.excluded.events, "expiresAt": expires_at},
+        )
+        async with self._session_maker()() as session:
+            await session.execute(stmt)
+            # Writes are rare next to a full chain run, so purge expired rows here
+            await session.execute(
+                delete(ResponseCacheRow).where(ResponseCacheRow.expiresAt <= now)
+            )
+            await session.commit()
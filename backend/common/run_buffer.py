@@ -0,0 +1,218 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-run replay buffers for resumable event streams.
+
+Each streamed run is driven by a background task that appends its encoded
+event lines to a bounded ring buffer. Clients read from the buffer and can
+reconnect with the sequence number of the last line they received to resume
+the stream, including attaching to a run that is still generating. Lines are
+numbered from 0 in the order the run produced them.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import AsyncGenerator, AsyncIterator, Optional, Union
+
+logger = logging.getLogger("run_buffer")
+
+Line = Union[bytes, str]
+
+
+class ReplayGap(Exception):
+    """The lines after the requested sequence number are no longer buffered."""
+
+
+class RunBuffer:
+    """Ring buffer of the encoded event lines of one run."""
+
+    def __init__(self, run_id: str, owner: Optional[str], max_bytes: int) -> None:
+        self.run_id = run_id
+        self.owner = owner
+        self.max_bytes = max_bytes
+        self.lines: deque[Line] = deque()
+        self.first_seq = 0
+        self.next_seq = 0
+        self.size = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.detached: Optional[asyncio.TimerHandle] = None
+        self._changed = asyncio.Event()
+
+    def append(self, line: Line) -> int:
+        """Append a line, dropping the oldest lines beyond ``max_bytes``."""
+        seq = self.next_seq
+        self.lines.append(line)
+        self.next_seq += 1
+        self.size += len(line)
+        while self.size > self.max_bytes and len(self.lines) > 1:
+            self.drop_oldest()
+        self._notify()
+        return seq
+
+    def drop_oldest(self) -> int:
+        """Drop the oldest buffered line and return the bytes freed."""
+        freed = len(self.lines.popleft())
+        self.first_seq += 1
+        self.size -= freed
+        return freed
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake every waiting reader; later readers wait on a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def read(self, after: int = -1) -> AsyncGenerator[Line, None]:
+        """
+        Yield the lines after sequence number ``after``, then follow the run
+        until it finishes. Raises :class:`ReplayGap` if some of those lines were
+        already dropped, and re-raises the error the run failed with, if any.
+        """
+        seq = after + 1
+        while True:
+            while seq < self.next_seq:
+                if seq < self.first_seq:
+                    raise ReplayGap(
+                        f"Run {self.run_id} only buffers lines from {self.first_seq}"
+                    )
+                line = self.lines[seq - self.first_seq]
+                seq += 1
+                yield line
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class RunRegistry:
+    """
+    Buffers of the runs started on this process.
+
+    Finished runs are kept for ``ttl`` seconds. Buffered lines of all runs are
+    capped at ``max_bytes``, evicting the least recently started finished runs
+    first. A run with no readers left is cancelled after ``grace`` seconds
+    unless a client reattaches.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        grace: float = 30,
+        run_max_bytes: int = 1 << 20,
+        max_bytes: int = 64 << 20,
+    ) -> None:
+        self.ttl = ttl
+        self.grace = grace
+        self.run_max_bytes = run_max_bytes
+        self.max_bytes = max_bytes
+        self._runs: OrderedDict[str, RunBuffer] = OrderedDict()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def start(
+        self, run_id: str, lines: AsyncIterator[Line], owner: Optional[str] = None
+    ) -> RunBuffer:
+        """Drive ``lines`` in a background task, buffering them under ``run_id``."""
+        self._expire()
+        buffer = RunBuffer(run_id, owner, self.run_max_bytes)
+        self._runs[run_id] = buffer
+        buffer.task = asyncio.create_task(self._produce(buffer, lines))
+        return buffer
+
+    def get(self, run_id: str) -> Optional[RunBuffer]:
+        self._expire()
+        return self._runs.get(run_id)
+
+    async def subscribe(
+        self, buffer: RunBuffer, after: int = -1
+    ) -> AsyncGenerator[Line, None]:
+        """Read ``buffer`` as :meth:`RunBuffer.read`, tracking attached readers."""
+        buffer.subscribers += 1
+        if buffer.detached is not None:
+            buffer.detached.cancel()
+            buffer.detached = None
+        try:
+            async for line in buffer.read(after):
+                yield line
+        finally:
+            buffer.subscribers -= 1
+            if buffer.subscribers == 0 and not buffer.done:
+                buffer.detached = asyncio.get_running_loop().call_later(
+                    self.grace, self._cancel_detached, buffer
+                )
+
+    async def aclose(self) -> None:
+        """Cancel all running runs and drop every buffer."""
+        tasks = [b.task for b in self._runs.values() if b.task and not b.done]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runs.clear()
+        self.size = 0
+
+    def _cancel_detached(self, buffer: RunBuffer) -> None:
+        buffer.detached = None
+        if buffer.subscribers == 0 and not buffer.done and buffer.task is not None:
+            logger.info(f"Cancelling run {buffer.run_id}: no client reattached")
+            buffer.task.cancel("client_disconnected")
+
+    async def _produce(self, buffer: RunBuffer, lines: AsyncIterator[Line]) -> None:
+        try:
+            async for line in lines:
+                before = buffer.size
+                buffer.append(line)
+                self.size += buffer.size - before
+                if self.size > self.max_bytes:
+                    self._evict(buffer)
+        except asyncio.CancelledError:
+            buffer.finish()
+        except Exception as e:
+            logger.error(f"Run {buffer.run_id} failed: {e}")
+            buffer.finish(e)
+        else:
+            buffer.finish()
+
+    def _remove(self, run_id: str) -> None:
+        self.size -= self._runs.pop(run_id).size
+
+    def _evict(self, current: RunBuffer) -> None:
+        for run_id, buffer in list(self._runs.items()):
+            if self.size <= self.max_bytes:
+                return
+            if buffer.done and buffer.subscribers == 0:
+                self._remove(run_id)
+        # Only running runs are left, so shorten the one that is growing
+        while self.size > self.max_bytes and len(current.lines) > 1:
+            self.size -= current.drop_oldest()
+
+    def _expire(self) -> None:
+        deadline = time.monotonic() - self.ttl
+        for run_id, buffer in list(self._runs.items()):
+            if buffer.finished_at is not None and buffer.finished_at < deadline:
+                self._remove(run_id)
@@ -0,0 +1,237 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Semantic answer cache for the RAG patterns, backed by pgvector.
+
+The question of a conversation's first turn is embedded with the pattern's
+embeddings and compared against earlier questions asked of the same chain,
+collection and embedding model. If the closest one is similar enough, its
+final answer is served without running the graph. Follow-up turns always run
+the graph: "tell me more" means something different in every conversation.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from langchain_core.embeddings import Embeddings
+from opentelemetry import metrics
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.database.config import get_session_maker
+from backend.database.models import SEMANTIC_CACHE_DIMENSIONS
+from backend.database.models import SemanticCache as SemanticCacheRow
+
+logger = logging.getLogger("semantic_cache")
+
+meter = metrics.get_meter("ai-foundry.semantic_cache")
+lookup_counter = meter.create_counter(
+    "semantic_cache.lookups", description="Semantic cache lookups by result"
+)
+
+
+def single_turn_question(messages: list[Any]) -> Optional[str]:
+    """
+    Return the question of a conversation that has no earlier turns, if it is
+    plain text, and None for follow-ups.
+    """
+    turns = []
+    for message in messages:
+        if not isinstance(message, dict):
+            message = message.model_dump()
+        if message.get("type") in ("human", "ai"):
+            turns.append(message)
+    if len(turns) != 1 or turns[0].get("type") != "human":
+        return None
+    content = turns[0].get("content")
+    if isinstance(content, str) and content.strip():
+        return content.strip()
+    return None
+
+
+class SemanticAnswerCache:
+    """
+    Answers cached per chain, collection and embedding model.
+
+    An answer is served when the cosine similarity of its question to the new
+    one is at least ``threshold``; the closest question is found through the
+    HNSW index, so lookups are approximate. Entries expire ``ttl`` seconds
+    after they were stored, and each scope keeps at most ``max_entries``
+    answers, evicting the least recently served first. Expired and evicted
+    entries are deleted in the background at most every ``evict_interval``
+    seconds, so a scope may briefly hold more.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        chain: str,
+        collection: str,
+        model: str,
+        threshold: float = 0.95,
+        ttl: float = 86400,
+        max_entries: int = 10000,
+        evict_interval: float = 60,
+        session_maker: Callable[
+            [], async_sessionmaker[AsyncSession]
+        ] = get_session_maker,
+    ) -> None:
+        self.embeddings = embeddings
+        self.chain = chain
+        self.collection = collection
+        self.model = model
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+        self.hits = 0
+        self.misses = 0
+        self._session_maker = session_maker
+        self._evicted_at = 0.0
+        self._evict_task: Optional[asyncio.Task] = None
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _scope(self) -> list[Any]:
+        return [
+            SemanticCacheRow.chain == self.chain,
+            SemanticCacheRow.collection == self.collection,
+            SemanticCacheRow.embeddingModel == self.model,
+        ]
+
+    def _record(self, result: str) -> None:
+        if result == "hit":
+            self.hits += 1
+        else:
+            self.misses += 1
+        lookup_counter.add(1, {"result": result, "chain": self.chain})
+
+    async def embed(self, question: str) -> list[float]:
+        vector = await self.embeddings.aembed_query(question)
+        if len(vector) != SEMANTIC_CACHE_DIMENSIONS:
+            raise ValueError(
+                f"{self.model} embeddings have {len(vector)} dimensions, "
+                f"SEMANTIC_CACHE_DIMENSIONS is {SEMANTIC_CACHE_DIMENSIONS}"
+            )
+        return vector
+
+    async def lookup(self, vector: list[float]) -> Optional[str]:
+        """Return the answer to the most similar cached question above threshold."""
+        now = datetime.now(timezone.utc)
+        distance = SemanticCacheRow.embedding.cosine_distance(vector)
+        async with self._session_maker()() as session:
+            result = await session.execute(
+                select(SemanticCacheRow.id, SemanticCacheRow.answer, distance)
+                .where(*self._scope(), SemanticCacheRow.expiresAt > now)
+                .order_by(distance)
+                .limit(1)
+            )
+            row = result.first()
+            if row is None or 1 - row[2] < self.threshold:
+                self._record("miss")
+                return None
+
+            await session.execute(
+                update(SemanticCacheRow)
+                .where(SemanticCacheRow.id == row[0])
+                .values(lastHitAt=now, hits=SemanticCacheRow.hits + 1)
+            )
+            await session.commit()
+        self._record("hit")
+        logger.debug(f"Semantic cache hit with similarity {1 - row[2]:.3f}")
+        return row[1]
+
+    async def store(self, question: str, vector: list[float], answer: str) -> None:
+        """Store an answer, starting an eviction if one is due."""
+        now = datetime.now(timezone.utc)
+        async with self._session_maker()() as session:
+            session.add(
+                SemanticCacheRow(
+                    chain=self.chain,
+                    collection=self.collection,
+                    embeddingModel=self.model,
+                    question=question,
+                    embedding=vector,
+                    answer=answer,
+                    lastHitAt=now,
+                    expiresAt=now + timedelta(seconds=self.ttl),
+                )
+            )
+            await session.commit()
+        if time.monotonic() - self._evicted_at >= self.evict_interval and (
+            self._evict_task is None or self._evict_task.done()
+        ):
+            self._evicted_at = time.monotonic()
+            self._evict_task = asyncio.create_task(self._evict_in_background())
+
+    async def evict(self) -> None:
+        """Drop expired entries and the least recently served over ``max_entries``."""
+        now = datetime.now(timezone.utc)
+        async with self._session_maker()() as session:
+            await session.execute(
+                delete(SemanticCacheRow).where(
+                    *self._scope(), SemanticCacheRow.expiresAt <= now
+                )
+            )
+            keep = (
+                select(SemanticCacheRow.id)
+                .where(*self._scope())
+                .order_by(SemanticCacheRow.lastHitAt.desc())
+                .limit(self.max_entries)
+            )
+            await session.execute(
+                delete(SemanticCacheRow).where(
+                    *self._scope(), SemanticCacheRow.id.not_in(keep)
+                )
+            )
+            await session.commit()
+
+    async def _evict_in_background(self) -> None:
+        try:
+            await self.evict()
+        except Exception as e:
+            logger.warning(f"Semantic cache eviction failed: {e}")
+
+    async def aclose(self) -> None:
+        if self._evict_task is not None:
+            self._evict_task.cancel()
+            await asyncio.gather(self._evict_task, return_exceptions=True)
+
+    async def invalidate(self) -> int:
+        """Drop every answer for this collection, e.g. after it was re-ingested."""
+        async with self._session_maker()() as session:
+            result = await session.execute(
+                delete(SemanticCacheRow).where(
+                    SemanticCacheRow.collection == self.collection
+                )
+            )
+            await session.commit()
+        return result.rowcount
+
+    async def size(self) -> int:
+        async with self._session_maker()() as session:
+            result = await session.execute(
+                select(func.count()).select_from(SemanticCacheRow).where(*self._scope())
+            )
+            return result.scalar_one()
@@ -1,15 +1,37 @@
 """SQLAlchemy models matching the existing Prisma schema."""
 
+import os
 import uuid
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    DDL,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSON, JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .config import Base
 
+# Text search configuration of Message.content_tsv; queries must use the same
+SEARCH_CONFIG = "english"
+
+# Dimensions of the embedding model the semantic cache is used with; the HNSW
+# index on SemanticCache.embedding needs a fixed size. Embeddings are stored
+# inline, which fits up to about 1900 dimensions
+SEMANTIC_CACHE_DIMENSIONS = int(os.getenv("SEMANTIC_CACHE_DIMENSIONS", "1536"))
+
 
 class Chat(Base):
     """Chat model matching Prisma schema."""
@@ -22,7 +44,7 @@ class Chat(Base):
         default=lambda: str(uuid.uuid4()),
     )
     title: Mapped[str] = mapped_column(String(255))
-    userId: Mapped[str] = mapped_column(String(255), index=True)
+    userId: Mapped[str] = mapped_column(String(255))
     createdAt: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -32,12 +54,20 @@ class Chat(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+    # Bumped by every write that changes the chat or its messages
+    version: Mapped[int] = mapped_column(Integer, server_default="0")
 
     messages: Mapped[list["Message"]] = relationship(
         "Message",
         back_populates="chat",
         cascade="all, delete-orphan",
         lazy="selectin",
+        order_by="Message.seq",
+    )
+
+    __table_args__ = (
+        # Serves both the per-user lookups and the sidebar's newest-first pages
+        Index("ix_Chat_userId_updatedAt", "userId", text('"updatedAt" DESC')),
     )
 
 
@@ -53,15 +83,23 @@ class Message(Base):
     )
     type: Mapped[str] = mapped_column(String(50))
     content: Mapped[str] = mapped_column(Text)
+    # Kept by Postgres for full-text search; never loaded with the message
+    content_tsv: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', content)", persisted=True),
+        deferred=True,
+    )
     name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     tool_call_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     additional_kwargs: Mapped[Optional[dict[str, Any]]] = mapped_column(
-        JSON, nullable=True
+        JSONB, nullable=True
     )
     chatId: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
         ForeignKey("Chat.id", ondelete="CASCADE"),
     )
+    # Position of the message in its chat
+    seq: Mapped[int] = mapped_column(Integer)
     createdAt: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -78,6 +116,19 @@ class Message(Base):
         back_populates="message",
         cascade="all, delete-orphan",
         lazy="selectin",
+        order_by="(ToolCall.createdAt, ToolCall.id)",
+    )
+
+    __table_args__ = (
+        Index("ix_Message_chatId_seq", "chatId", "seq"),
+        Index("ix_Message_content_tsv", "content_tsv", postgresql_using="gin"),
+        # Containment lookups, e.g. additional_kwargs @> '{"run_id": ...}'
+        Index(
+            "ix_Message_additional_kwargs",
+            "additional_kwargs",
+            postgresql_using="gin",
+            postgresql_ops={"additional_kwargs": "jsonb_path_ops"},
+        ),
     )
 
 
@@ -88,7 +139,7 @@ class ToolCall(Base):
 
     id: Mapped[str] = mapped_column(String(255), primary_key=True)
     name: Mapped[str] = mapped_column(String(255))
-    args: Mapped[dict[str, Any]] = mapped_column(JSON)
+    args: Mapped[dict[str, Any]] = mapped_column(JSONB)
     messageId: Mapped[str] = mapped_column(
         UUID(as_uuid=False),
         ForeignKey("Message.id", ondelete="CASCADE"),
@@ -104,3 +155,97 @@ class ToolCall(Base):
     )
 
     message: Mapped["Message"] = relationship("Message", back_populates="tool_calls")
+
+    __table_args__ = (
+        Index("ix_ToolCall_messageId", "messageId"),
+        Index(
+            "ix_ToolCall_args",
+            "args",
+            postgresql_using="gin",
+            postgresql_ops={"args": "jsonb_path_ops"},
+        ),
+    )
+
+
+class ChatListVersion(Base):
+    """Version of a user's chat listing, bumped by every chat write and delete."""
+
+    __tablename__ = "ChatListVersion"
+
+    userId: Mapped[str] = mapped_column(String(255), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, server_default="0")
+
+
+class IdempotencyKey(Base):
+    """Response of a chat write, replayed when the request is retried."""
+
+    __tablename__ = "IdempotencyKey"
+
+    userId: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # Method and path the key was sent to, e.g. "PATCH /chats/<id>"
+    endpoint: Mapped[str] = mapped_column(String(255), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    response: Mapped[Optional[dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    createdAt: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        index=True,
+    )
+
+
+class ResponseCache(Base):
+    """Cached event stream of a /stream_events response."""
+
+    __tablename__ = "ResponseCache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    events: Mapped[list[dict[str, Any]]] = mapped_column(JSON)
+    createdAt: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    expiresAt: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
+class SemanticCache(Base):
+    """Answer cached for a question, looked up by embedding similarity."""
+
+    __tablename__ = "SemanticCache"
+
+    id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+    )
+    chain: Mapped[str] = mapped_column(String(100))
+    collection: Mapped[str] = mapped_column(String(255))
+    embeddingModel: Mapped[str] = mapped_column(String(255))
+    question: Mapped[str] = mapped_column(Text)
+    embedding: Mapped[list[float]] = mapped_column(Vector(SEMANTIC_CACHE_DIMENSIONS))
+    answer: Mapped[str] = mapped_column(Text)
+    hits: Mapped[int] = mapped_column(Integer, server_default="0")
+    createdAt: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    lastHitAt: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    expiresAt: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("ix_SemanticCache_scope", "chain", "collection", "embeddingModel"),
+        Index(
+            "ix_SemanticCache_embedding",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
+
+
+# Out-of-line (TOASTed) vectors make a scan of the table look cheap to the
+# planner, which then sorts every row by distance instead of using the index
+event.listen(
+    SemanticCache.__table__,
+    "after_create",
+    DDL('ALTER TABLE "SemanticCache" ALTER COLUMN embedding SET STORAGE PLAIN'),
+)
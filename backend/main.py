@@ -14,22 +14,32 @@
 
 import logging
 import os
-import time
-from typing import Any, Optional, TypedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
 
 import jwt
-import requests
 from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
+from .common.checkpointer import aclose_checkpointer
+from .common.clients import aclose_clients
+from .common.jwks import JWKSKeyManager
+from .common.token_cache import VerifiedTokenCache
+from .routes.batch import batch_jobs
+from .routes.batch import router as batch_router
+from .routes.chat_export import router as chat_export_router
+from .routes.chat_search import router as chat_search_router
 from .routes.chat_title import router as chat_title_router
 from .routes.chats import router as chats_router
 from .routes.chats import set_verify_token_dependency
 from .routes.config import router as config_router
 from .routes.events import router as events_router
+from .routes.events import run_registry, semantic_caches
 from .routes.feedback import router as feedback_router
+from .routes.metrics import router as metrics_router
+from .routes.stream_socket import router as stream_socket_router
 from .telemetry import setup_telemetry
 
 # DISABLE_AUTH can be utilized to disable authentication for testing purposes
@@ -62,6 +72,15 @@ FRONTEND_KEYCLOAK_CLIENT_ID = os.getenv(
     "FRONTEND_KEYCLOAK_CLIENT_ID", "ai-foundry-chat-app"
 )
 
+# JWKS cache configuration (seconds)
+JWKS_CACHE_TTL = float(os.getenv("JWKS_CACHE_TTL", "300"))
+JWKS_REFRESH_AHEAD = float(os.getenv("JWKS_REFRESH_AHEAD", "60"))
+JWKS_MAX_STALE = float(os.getenv("JWKS_MAX_STALE", "3600"))
+
+# Verified token cache configuration
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+
 # CORS configuration (comma-separated)
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000").split(
     ","
@@ -75,6 +94,8 @@ logger.info(f"  KEYCLOAK_URL: {KEYCLOAK_URL}")
 logger.info(f"  ISSUER_URL: {ISSUER_URL}")
 logger.info(f"  KEYCLOAK_REALM: {KEYCLOAK_REALM}")
 logger.info(f"  FRONTEND_KEYCLOAK_CLIENT_ID: {FRONTEND_KEYCLOAK_CLIENT_ID}")
+logger.info(f"  JWKS_CACHE_TTL: {JWKS_CACHE_TTL}")
+logger.info(f"  TOKEN_CACHE_SIZE: {TOKEN_CACHE_SIZE}")
 logger.info(f"  CORS_ALLOWED_ORIGINS: {CORS_ALLOWED_ORIGINS}")
 
 # Initialize FastAPI security
@@ -83,65 +104,33 @@ if not DISABLE_AUTH:
         tokenUrl=f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/token"
     )
 
-    # Define type for public key cache
-
-    class PublicKeyCache(TypedDict):
-        key: Optional[str]
-        timestamp: float
-        ttl: int
-
-    # Cache for public key to avoid repeated requests
-    _public_key_cache: PublicKeyCache = {
-        "key": None,
-        "timestamp": 0.0,
-        "ttl": 300,  # 5 minutes cache
-    }
-
-    def get_public_key() -> str:
-        current_time = time.time()
-        if (
-            _public_key_cache["key"] is not None
-            and current_time - _public_key_cache["timestamp"] < _public_key_cache["ttl"]
-        ):
-            logger.debug("Using cached public key")
-            return _public_key_cache["key"]
+    # Signing keys are fetched from the realm JWKS endpoint and cached by kid
+    jwks_manager = JWKSKeyManager(
+        f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/protocol/openid-connect/certs",
+        ttl=JWKS_CACHE_TTL,
+        refresh_ahead=JWKS_REFRESH_AHEAD,
+        max_stale=JWKS_MAX_STALE,
+        verify_tls=not DISABLE_TLS_VERIFY,
+    )
 
-        try:
-            url = f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}"
-            logger.debug(f"Fetching public key from {url}")
-            response = requests.get(url, verify=not DISABLE_TLS_VERIFY)
-            response.raise_for_status()
-            key = response.json()["public_key"]
-            public_key = f"-----BEGIN PUBLIC KEY-----\n{key}\n-----END PUBLIC KEY-----"
-
-            _public_key_cache.update(
-                {
-                    "key": public_key,
-                    "timestamp": current_time,
-                    "ttl": _public_key_cache["ttl"],
-                }
-            )
-            logger.info("Successfully retrieved new public key")
-            return public_key
+    # Verified payloads are cached until the token expires
+    token_cache = VerifiedTokenCache(max_size=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
 
-        except Exception as e:
-            logger.error(f"Failed to fetch public key: {str(e)}")
-            raise HTTPException(
-                status_code=500, detail=f"Failed to fetch public key: {str(e)}"
-            )
+    async def get_public_key(kid: Optional[str]) -> Any:
+        """Return the realm signing key matching the token's kid."""
+        return await jwks_manager.get_key(kid)
 
     async def verify_token_raw(token: str) -> dict[str, Any]:
         """Verify token without FastAPI Depends - for use in routes that need payload."""
-        try:
-            # First decode without verification to inspect claims
-            unverified = jwt.decode(token, options={"verify_signature": False})
-            logger.debug("Token claims:")
-            logger.debug(f"  aud: {unverified.get('aud')}")
-            logger.debug(f"  azp: {unverified.get('azp')}")
-            logger.debug(f"  iss: {unverified.get('iss')}")
-            logger.debug(f"  sub: {unverified.get('sub')}")
+        # Repeat requests with an already verified token skip decoding entirely
+        cached = token_cache.get(token)
+        if cached is not None:
+            logger.debug("Using cached token payload")
+            return cached
 
-            public_key = get_public_key()
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            public_key = await get_public_key(kid)
             logger.debug("Verifying token with public key")
 
             payload = jwt.decode(
@@ -166,9 +155,15 @@ if not DISABLE_AUTH:
                 logger.error(f"Invalid azp: {payload.get('azp')}")
                 raise HTTPException(status_code=401, detail="Invalid token")
 
+            logger.debug("Token claims:")
+            logger.debug(f"  aud: {payload.get('aud')}")
+            logger.debug(f"  azp: {payload.get('azp')}")
+            logger.debug(f"  iss: {payload.get('iss')}")
+            logger.debug(f"  sub: {payload.get('sub')}")
             logger.info(
                 f"Successfully verified token for user: {payload.get('preferred_username')}"
             )
+            token_cache.put(token, payload)
             return payload
 
         except ExpiredSignatureError:
@@ -201,10 +196,24 @@ if not DISABLE_AUTH:
     set_verify_token_dependency(verify_token_raw)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    await run_registry.aclose()
+    await batch_jobs.aclose()
+    for semantic_cache in semantic_caches.values():
+        await semantic_cache.aclose()
+    await aclose_clients()
+    await aclose_checkpointer()
+    if not DISABLE_AUTH:
+        await jwks_manager.aclose()
+
+
 app = FastAPI(
     title="AI Foundry Sandbox",
     description="Sandbox for AI Foundry services.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -212,9 +221,29 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type", "Accept"],
-    expose_headers=["Authorization", "Content-Type"],
+    allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=[
+        "Authorization",
+        "Content-Type",
+        "Accept",
+        "X-Stream-Framing",
+        "X-Stream-Schema",
+        "Last-Event-ID",
+        "If-Match",
+        "If-None-Match",
+        "Idempotency-Key",
+    ],
+    expose_headers=[
+        "Authorization",
+        "Content-Type",
+        "X-Stream-Framing",
+        "X-Stream-Schema",
+        "X-Run-Id",
+        "X-Chain",
+        "Retry-After",
+        "ETag",
+        "X-Export-Until",
+    ],
 )
 
 # Initialize telemetry
@@ -223,19 +252,29 @@ if not DISABLE_TELEMETRY:
 
 # Include route modules with or without authentication
 # These routes use the standard dependency pattern
-routes = [events_router, feedback_router, chat_title_router]
+routes = [events_router, batch_router, feedback_router, chat_title_router]
 for route in routes:
     if not DISABLE_AUTH:
         app.include_router(route, dependencies=[Depends(verify_token)])
     else:
         app.include_router(route)
 
-# Chats routes handle their own auth internally (to access token payload)
+# Chats routes handle their own auth internally (to access token payload).
+# Export and search are registered first so their paths are not taken for a
+# chat id.
+app.include_router(chat_export_router)
+app.include_router(chat_search_router)
 app.include_router(chats_router)
 
+# The stream socket authenticates once per connection
+app.include_router(stream_socket_router)
+
 # Config route doesn't require authentication
 app.include_router(config_router)
 
+# Metrics route is scraped by the autoscaler without a token
+app.include_router(metrics_router)
+
 # Static file serving for frontend (when SERVE_FRONTEND is enabled)
 SERVE_FRONTEND = os.getenv("SERVE_FRONTEND", "false").lower() == "true"
 STATIC_FILES_DIR = os.getenv("STATIC_FILES_DIR", "./static")
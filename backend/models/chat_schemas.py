@@ -1,5 +1,6 @@
 """Pydantic schemas for chat persistence endpoints."""
 
+from datetime import datetime
 from typing import Any, Optional
 
 from pydantic import BaseModel, Field
@@ -26,6 +27,7 @@ class MessageSchema(BaseModel):
     tool_call_id: Optional[str] = None
     additional_kwargs: Optional[dict[str, Any]] = None
     tool_calls: list[ToolCallSchema] = Field(default_factory=list)
+    seq: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -42,11 +44,28 @@ class ChatSchema(BaseModel):
 
 
 class ChatsResponse(BaseModel):
-    """Response schema for GET /chats."""
+    """Response schema for GET /chats?full=true."""
 
     chats: dict[str, ChatSchema]
 
 
+class ChatSummary(BaseModel):
+    """Sidebar entry for one chat."""
+
+    id: str
+    title: str
+    updatedAt: datetime
+    version: int
+    messageCount: int
+
+
+class ChatSummariesResponse(BaseModel):
+    """Response schema for GET /chats."""
+
+    chats: list[ChatSummary]
+    nextCursor: Optional[str] = None
+
+
 class ToolCallInput(BaseModel):
     """Input schema for tool call in POST request."""
 
@@ -80,6 +99,57 @@ class ChatsInput(BaseModel):
     chats: dict[str, ChatInput]
 
 
+class MessagesInput(BaseModel):
+    """Request schema for POST /chats/{chat_id}/messages."""
+
+    messages: list[MessageInput] = Field(default_factory=list)
+    title: Optional[str] = None
+
+
+class ChatPatchInput(BaseModel):
+    """Request schema for PATCH /chats/{chat_id}."""
+
+    title: str
+
+
+class ChatVersionResponse(BaseModel):
+    """Response schema for chat writes."""
+
+    id: str
+    version: int
+    lastSeq: int
+
+
+class ChatMessagesResponse(BaseModel):
+    """Response schema for GET /chats/{chat_id} and its messages."""
+
+    id: str
+    title: str
+    version: int
+    lastSeq: int
+    messages: list[MessageSchema]
+    nextCursor: Optional[int] = None
+
+
+class SearchResult(BaseModel):
+    """One matching message in GET /chats/search."""
+
+    chatId: str
+    chatTitle: str
+    messageId: str
+    seq: int
+    type: str
+    snippet: str
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    """Response schema for GET /chats/search."""
+
+    results: list[SearchResult]
+    nextOffset: Optional[int] = None
+
+
 class ConfigResponse(BaseModel):
     """Response schema for GET /config."""
 
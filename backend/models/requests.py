@@ -30,6 +30,14 @@ class UserChatMessage(BaseModel):
     ] = Field(..., description="Sequence of human/AI/tool messages.")
     user_id: str = ""
     session_id: str = ""
+    history: Literal["client", "server"] = Field(
+        "client",
+        description=(
+            "'client' when messages hold the whole conversation, 'server' when "
+            "they hold only the new turn and the server keeps the conversation "
+            "of session_id."
+        ),
+    )
 
 
 class ConversationInputWrapper(BaseModel):
@@ -38,6 +46,86 @@ class ConversationInputWrapper(BaseModel):
     """
 
     input_data: UserChatMessage
+    chain: Optional[str] = Field(
+        None, description="Pattern to run; the server's default chain if omitted."
+    )
+
+
+class BatchInput(BaseModel):
+    """
+    A batch of conversations to run through one chain.
+    """
+
+    items: List[ConversationInputWrapper]
+    chain: Optional[str] = Field(
+        None, description="Pattern to run; the server's default chain if omitted."
+    )
+    max_concurrency: Optional[int] = Field(
+        None, ge=1, description="Items to run at once, up to the server limit."
+    )
+
+
+class SocketAuth(BaseModel):
+    """
+    Authenticate a stream socket, or refresh the token of an authenticated one.
+    """
+
+    type: Literal["auth"]
+    token: str
+
+
+class SocketStart(BaseModel):
+    """
+    Start a run on a stream socket.
+    """
+
+    type: Literal["start"]
+    ref: Optional[str] = Field(
+        None, description="Client reference echoed back with the run id."
+    )
+    input_data: UserChatMessage
+    chain: Optional[str] = None
+    framing: Optional[Literal["lines", "coalesced"]] = None
+    stream_schema: Optional[Literal["compact", "legacy"]] = Field(None, alias="schema")
+    window: Optional[int] = Field(
+        None, ge=1, description="Events the client may have unacknowledged."
+    )
+
+
+class SocketResume(BaseModel):
+    """
+    Reattach to a run, receiving the events after sequence number ``after``.
+    """
+
+    type: Literal["resume"]
+    run_id: str
+    after: int = -1
+    window: Optional[int] = Field(None, ge=1)
+
+
+class SocketCancel(BaseModel):
+    """
+    Cancel a run started by the same user.
+    """
+
+    type: Literal["cancel"]
+    run_id: str
+
+
+class SocketAck(BaseModel):
+    """
+    Acknowledge the events of a run up to sequence number ``seq``.
+    """
+
+    type: Literal["ack"]
+    run_id: str
+    seq: int
+
+
+SocketMessage = Annotated[
+    Union[SocketAuth, SocketStart, SocketResume, SocketCancel, SocketAck],
+    Field(discriminator="type"),
+]
 
 
 class UserFeedback(BaseModel):
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import uuid
-from typing import Any, Literal
+from typing import Any, Literal, Optional
 
 from langchain_core.messages import AIMessageChunk
 from pydantic import BaseModel, Field
@@ -72,3 +72,77 @@ class EndOfStreamEvent(BaseModel):
     """
 
     event: Literal["end"] = "end"
+
+
+# Version of the compact streaming schema below. Bump on incompatible changes.
+COMPACT_SCHEMA_VERSION = 1
+
+
+class SourceRef(BaseModel):
+    """
+    A reference to a retrieved source document.
+    """
+
+    id: Optional[str] = None
+    title: Optional[str] = None
+
+
+class CompactChunk(BaseModel):
+    """
+    The text delta of a streamed token.
+    """
+
+    content: str
+
+
+class CompactChunkData(BaseModel):
+    chunk: CompactChunk
+
+
+class CompactInputData(BaseModel):
+    input: dict[str, Any] = {}
+
+
+class CompactOutput(BaseModel):
+    """
+    The rendered output of a tool or retriever.
+    """
+
+    content: Optional[Any] = None
+    sources: Optional[list[SourceRef]] = None
+
+
+class CompactOutputData(BaseModel):
+    output: CompactOutput
+
+
+class CompactTokenEvent(BaseModel):
+    """
+    Compact event for a streamed chat model token.
+    """
+
+    event: Literal["on_chat_model_stream"] = "on_chat_model_stream"
+    run_id: Optional[str] = None
+    data: CompactChunkData
+
+
+class CompactStartEvent(BaseModel):
+    """
+    Compact event to signal the start of a tool or retriever.
+    """
+
+    event: Literal["on_tool_start", "on_retriever_start"]
+    name: Optional[str] = None
+    run_id: Optional[str] = None
+    data: CompactInputData
+
+
+class CompactEndEvent(BaseModel):
+    """
+    Compact event to signal the completion of a tool or retriever.
+    """
+
+    event: Literal["on_tool_end", "on_retriever_end"]
+    name: Optional[str] = None
+    run_id: Optional[str] = None
+    data: CompactOutputData
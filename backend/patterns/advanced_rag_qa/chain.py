@@ -23,7 +23,9 @@ from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_postgres import PGVector
 from langgraph.graph import END, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
-from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.common.clients import gateway_clients, get_async_engine
+from backend.common.history import HistoryManager, history_budget
 
 logger = logging.getLogger("advanced_rag_qa")
 
@@ -69,9 +71,9 @@ if not COLLECTION_NAME:
     logging.error("COLLECTION_NAME is not set")
     raise Exception("COLLECTION_NAME is not set")
 
-embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL_ID)
+embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL_ID, **gateway_clients())
 
-engine = create_async_engine(
+engine = get_async_engine(
     f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 )
 
@@ -86,14 +88,17 @@ llm = ChatOpenAI(
     base_url=MODEL_GATEWAY_BASE_URL,
     temperature=0,
     streaming=True,
+    **gateway_clients(),
 )
 
+history = HistoryManager("advanced_rag_qa", history_budget("advanced_rag_qa", 6000))
+
 system_prompt = SystemMessage(
     content="You are a helpful assistant that answers questions about the Tennessee State Legislature."
 )
 
 
-@tool
+@tool(response_format="content_and_artifact")
 def retrieve_documents(query: str) -> tuple[str, list[Document]]:
     """Retrieve relevant documents based on the query."""
     try:
@@ -113,7 +118,7 @@ def retrieve_documents(query: str) -> tuple[str, list[Document]]:
 def query_or_respond(state: MessagesState) -> dict[str, list[BaseMessage]]:
     """Generate tool call for retrieval or respond."""
 
-    messages = [system_prompt] + state["messages"]
+    messages = [system_prompt] + history.fit(state["messages"], llm)
     llm_with_tools = llm.bind_tools([retrieve_documents])
     response = llm_with_tools.invoke(messages)
     # MessagesState appends messages to state instead of overwriting
@@ -139,7 +144,9 @@ def call_model(
     docs_content = "\n\n".join(str(doc.content) for doc in tool_messages)
 
     messages = (
-        [system_prompt] + state["messages"] + [HumanMessage(f"context: {docs_content}")]
+        [system_prompt]
+        + history.fit(state["messages"], llm)
+        + [HumanMessage(f"context: {docs_content}")]
     )
 
     try:
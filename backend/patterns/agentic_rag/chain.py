@@ -14,6 +14,7 @@
 
 import logging
 import os
+import uuid
 from typing import Annotated, Literal, Sequence, TypedDict
 
 from langchain_core.tools import tool
@@ -21,11 +22,14 @@ from langchain_community.tools import TavilySearchResults
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_postgres import PGVector
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode, tools_condition
 from pydantic import BaseModel, Field
-from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.common.clients import gateway_clients, get_async_engine
+from backend.common.history import HistoryManager, history_budget
 
 logger = logging.getLogger("agentic_rag")
 
@@ -71,9 +75,9 @@ if not COLLECTION_NAME:
     logging.error("COLLECTION_NAME is not set")
     raise Exception("COLLECTION_NAME is not set")
 
-embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL_ID)
+embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL_ID, **gateway_clients())
 
-engine = create_async_engine(
+engine = get_async_engine(
     f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 )
 
@@ -88,15 +92,27 @@ llm = ChatOpenAI(
     base_url=MODEL_GATEWAY_BASE_URL,
     temperature=0,
     streaming=True,
+    **gateway_clients(),
 )
 
 retriever = vector_store.as_retriever()
 
+history = HistoryManager("agentic_rag", history_budget("agentic_rag", 4000))
+
 
 @tool
 def retrieve_tennessee_documents(query: str) -> str:
     """Search and return information about Tennessee. This tool does not return information about other States."""
+    # Report the retrieval on the custom stream so clients see it without
+    # astream_events callbacks
+    writer = get_stream_writer()
+    run_id = str(uuid.uuid4())
+    event = {"name": retriever.get_name(), "run_id": run_id}
+    writer(
+        {**event, "event": "on_retriever_start", "data": {"input": {"query": query}}}
+    )
     docs = retriever.invoke(query)
+    writer({**event, "event": "on_retriever_end", "data": {"output": docs}})
     return "\n\n".join([doc.page_content for doc in docs])
 
 
@@ -119,7 +135,9 @@ def grade_documents(state) -> Literal["generate", "rewrite"]:
     class grade(BaseModel):
         binary_score: str = Field(description="Relevance score 'yes' or 'no'")
 
-    llm = ChatOpenAI(temperature=0, streaming=True, model="gpt-4o-mini")
+    llm = ChatOpenAI(
+        temperature=0, streaming=True, model="gpt-4o-mini", **gateway_clients()
+    )
     llm_with_tool = llm.with_structured_output(grade)
 
     messages = state["messages"]
@@ -155,9 +173,11 @@ def grade_documents(state) -> Literal["generate", "rewrite"]:
 def agent(state):
     print("---CALL AGENT---")
     messages = state["messages"]
-    llm = ChatOpenAI(temperature=0, streaming=True, model="gpt-4o-mini")
+    llm = ChatOpenAI(
+        temperature=0, streaming=True, model="gpt-4o-mini", **gateway_clients()
+    )
     llm_with_tools = llm.bind_tools(tools).with_config({"tags": ["include"]})
-    response = llm_with_tools.invoke(messages)
+    response = llm_with_tools.invoke(history.fit(messages, llm))
     return {"messages": [response]}
 
 
@@ -178,7 +198,9 @@ def rewrite(state):
         )
     ]
 
-    llm = ChatOpenAI(temperature=0, model="gpt-4o-mini", streaming=True)
+    llm = ChatOpenAI(
+        temperature=0, model="gpt-4o-mini", streaming=True, **gateway_clients()
+    )
     response = llm.invoke(message)
     return {"messages": [response]}
 
@@ -201,7 +223,7 @@ def generate(state):
     system_message = SystemMessage(content=system_prompt_message)
 
     llm = ChatOpenAI(
-        model_name="gpt-4o-mini", temperature=0, streaming=True
+        model_name="gpt-4o-mini", temperature=0, streaming=True, **gateway_clients()
     ).with_config({"tags": ["include"]})
 
     messages = [system_message, HumanMessage(f"question: {question}\ncontext: {docs}")]
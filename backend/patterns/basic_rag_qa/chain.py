@@ -21,7 +21,9 @@ from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_postgres import PGVector
 from langgraph.graph import END, MessagesState, StateGraph
-from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.common.clients import gateway_clients, get_async_engine
+from backend.common.history import HistoryManager, history_budget
 
 logger = logging.getLogger("rag_qa")
 
@@ -67,9 +69,9 @@ if not COLLECTION_NAME:
     logging.error("COLLECTION_NAME is not set")
     raise Exception("COLLECTION_NAME is not set")
 
-embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL_ID)
+embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL_ID, **gateway_clients())
 
-engine = create_async_engine(
+engine = get_async_engine(
     f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 )
 
@@ -84,8 +86,11 @@ llm = ChatOpenAI(
     base_url=MODEL_GATEWAY_BASE_URL,
     temperature=0,
     streaming=True,
+    **gateway_clients(),
 )
 
+history = HistoryManager("basic_rag_qa", history_budget("basic_rag_qa", 6000))
+
 
 def retrieve_documents(query: str) -> list[tuple[Document, float]]:
     """Retrieve relevant documents based on the query."""
@@ -113,7 +118,7 @@ def call_model(state: MessagesState, config: RunnableConfig) -> dict[str, BaseMe
     )
     messages_with_system = (
         [{"type": "system", "content": system_message}]
-        + state["messages"]
+        + history.fit(state["messages"], llm)
         + [HumanMessage(content=f"context: {context}")]
     )
 
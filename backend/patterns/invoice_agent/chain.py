@@ -25,6 +25,9 @@ from langgraph.graph import END, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode
 from typing_extensions import TypedDict
 
+from backend.common.clients import gateway_clients
+from backend.common.history import HistoryManager, history_budget
+
 logger = logging.getLogger("invoice_agent")
 
 # Initalize model information
@@ -90,8 +93,11 @@ llm = ChatOpenAI(
     base_url=MODEL_GATEWAY_BASE_URL,
     temperature=0,
     streaming=True,
+    **gateway_clients(),
 ).bind_tools(tools)
 
+history = HistoryManager("invoice_agent", history_budget("invoice_agent", 4000))
+
 
 def should_continue(state: MessagesState) -> str:
     """Determines whether to use tools or end the conversation."""
@@ -107,9 +113,9 @@ def call_model(state: MessagesState, config: RunnableConfig) -> dict[str, BaseMe
 You are provided with a tool to perform a database lookup when the user requests the status
 of an invoice with an invoice id. Perform the lookup and provide the status to the user in a
 clear, readable format. The status should be every field in the entry returned from the database on a separate line."""
-    messages_with_system = [{"type": "system", "content": system_message}] + state[
-        "messages"
-    ]
+    messages_with_system = [
+        {"type": "system", "content": system_message}
+    ] + history.fit(state["messages"], llm)
     # Forward the RunnableConfig object to ensure the agent is capable of streaming the response.
     response = llm.invoke(messages_with_system, config)
     return {"messages": response}
@@ -0,0 +1,204 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import logging
+import os
+from typing import Annotated, Any, AsyncGenerator, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from backend.auth import get_user_email
+from backend.common.batch import (
+    BatchInputTooLarge,
+    BatchJob,
+    BatchJobRegistry,
+    run_batch,
+)
+from backend.common.encoder import FastJSONResponse, encode_event
+from backend.models.requests import BatchInput
+from backend.routes.chats import get_token_payload
+from backend.routes.events import (
+    AdmittedStreamingResponse,
+    admit,
+    get_chain_module,
+    resolve_chain,
+)
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+logger = logging.getLogger("batch_routes")
+
+# Items of a batch run concurrently up to BATCH_MAX_CONCURRENCY (requests may
+# ask for less) and each item is given BATCH_ITEM_TIMEOUT seconds. A batch's
+# concurrency is taken from the admission controller of /stream_events, so it
+# may be granted less while the server is busy.
+# /invoke_batch takes at most BATCH_MAX_ITEMS items per request; larger batches
+# go through the JSONL batch jobs, of which BATCH_MAX_RUNNING_JOBS run at once
+# with bodies of at most BATCH_JOB_MAX_BYTES.
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_ITEM_TIMEOUT = float(os.getenv("BATCH_ITEM_TIMEOUT", "300"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+BATCH_MAX_RUNNING_JOBS = int(os.getenv("BATCH_MAX_RUNNING_JOBS", "4"))
+BATCH_JOB_TTL = float(os.getenv("BATCH_JOB_TTL", "3600"))
+BATCH_JOB_MAX_BYTES = int(os.getenv("BATCH_JOB_MAX_BYTES", str(100 * 1024 * 1024)))
+
+batch_jobs = BatchJobRegistry(ttl=BATCH_JOB_TTL, max_running=BATCH_MAX_RUNNING_JOBS)
+
+
+def batch_concurrency(requested: Optional[int]) -> int:
+    if requested is None:
+        return BATCH_MAX_CONCURRENCY
+    return max(1, min(requested, BATCH_MAX_CONCURRENCY))
+
+
+async def stream_batch_results(
+    results: AsyncGenerator[dict[str, Any], None],
+) -> AsyncGenerator[bytes, None]:
+    async for result in results:
+        yield encode_event(result)
+
+
+@router.post("/invoke_batch")
+@router.post("/chains/{chain_name}/invoke_batch")
+async def invoke_batch(
+    request: Request, batch: BatchInput, chain_name: Optional[str] = None
+) -> StreamingResponse:
+    """
+    Run every conversation of a batch through the selected chain.
+
+    Results are streamed back as JSON lines in the order items finish; each
+    carries the item's ``index``, its ``status``, its ``output`` or ``error``
+    and ``elapsed_ms``. The chain is selected as for ``/stream_events``, and
+    the batch is admitted like a stream, with 429 and Retry-After when the
+    server is at capacity.
+    """
+    if len(batch.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batches are limited to {BATCH_MAX_ITEMS} items; use /batch_jobs",
+        )
+    owner = get_user_email(await get_token_payload(request))
+    selected_chain = await resolve_chain(chain_name or batch.chain)
+    chain_module = await get_chain_module(selected_chain)
+    slot = await admit(owner, batch_concurrency(batch.max_concurrency))
+    logger.info(
+        f"Running batch of {len(batch.items)} items on {selected_chain} "
+        f"with concurrency {slot.count}"
+    )
+    try:
+        results = run_batch(
+            chain_module.chain,
+            (item.input_data.model_dump() for item in batch.items),
+            max_concurrency=slot.count,
+            timeout=BATCH_ITEM_TIMEOUT,
+        )
+        return AdmittedStreamingResponse(
+            stream_batch_results(results),
+            slot,
+            media_type="application/x-ndjson",
+            headers={"X-Chain": selected_chain},
+        )
+    except BaseException:
+        slot.release()
+        raise
+
+
+def input_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Batch job input is limited to {max_bytes} bytes",
+    )
+
+
+async def get_owned_job(request: Request, job_id: str) -> BatchJob:
+    owner = get_user_email(await get_token_payload(request))
+    job = batch_jobs.get(job_id)
+    if job is None or job.owner != owner:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Batch job not found"
+        )
+    return job
+
+
+@router.post("/batch_jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_batch_job(
+    request: Request,
+    chain: Annotated[Optional[str], Query()] = None,
+    max_concurrency: Annotated[Optional[int], Query(ge=1)] = None,
+) -> dict[str, Any]:
+    """
+    Start a batch job over a JSONL body of ``ConversationInputWrapper`` lines.
+
+    The body is spooled to disk and run in the background; poll
+    ``/batch_jobs/{job_id}`` for progress and read the JSONL results from
+    ``/batch_jobs/{job_id}/results``. Lines that fail to parse become error
+    results. The job holds its admission slots until it finishes. Returns 429
+    when too many jobs are already running or the server is at capacity, and
+    413 for bodies over ``BATCH_JOB_MAX_BYTES``.
+    """
+    owner = get_user_email(await get_token_payload(request))
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > BATCH_JOB_MAX_BYTES:
+            raise input_too_large(BATCH_JOB_MAX_BYTES)
+    if batch_jobs.running >= batch_jobs.max_running:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many batch jobs running",
+        )
+    selected_chain = await resolve_chain(chain)
+    chain_module = await get_chain_module(selected_chain)
+    slot = await admit(owner, batch_concurrency(max_concurrency))
+    try:
+        input_path = await batch_jobs.spool(request.stream(), BATCH_JOB_MAX_BYTES)
+        job = batch_jobs.start(
+            chain_module.chain,
+            selected_chain,
+            input_path,
+            owner=owner,
+            max_concurrency=slot.count,
+            timeout=BATCH_ITEM_TIMEOUT,
+        )
+    except BatchInputTooLarge as e:
+        slot.release()
+        raise input_too_large(e.max_bytes)
+    except BaseException:
+        slot.release()
+        raise
+    job.task.add_done_callback(lambda _: slot.release())
+    logger.info(f"Started batch job {job.job_id} on {selected_chain} for {owner}")
+    return job.info()
+
+
+@router.get("/batch_jobs/{job_id}")
+async def get_batch_job(request: Request, job_id: str) -> dict[str, Any]:
+    """Return the status and progress of a batch job."""
+    return (await get_owned_job(request, job_id)).info()
+
+
+@router.get("/batch_jobs/{job_id}/results")
+async def get_batch_job_results(request: Request, job_id: str) -> StreamingResponse:
+    """Stream the JSONL results of a batch job, following it while it runs."""
+    job = await get_owned_job(request, job_id)
+    return StreamingResponse(job.read_results(), media_type="application/x-ndjson")
+
+
+@router.delete("/batch_jobs/{job_id}")
+async def delete_batch_job(request: Request, job_id: str) -> dict[str, Any]:
+    """Cancel a batch job if it is still running and delete its results."""
+    job = await get_owned_job(request, job_id)
+    await batch_jobs.cancel(job)
+    return job.info()
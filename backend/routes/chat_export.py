@@ -0,0 +1,156 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Streaming NDJSON export of chat history."""
+
+import logging
+import os
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, Text, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth import get_user_email, is_admin
+from ..database.config import get_db
+from ..database.models import Chat
+from .chats import chat_messages_json, get_token_payload, json_object
+
+# Chats fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "100"))
+
+# How far behind the database clock an export stops. updatedAt is set when a
+# write's transaction starts, so a write still running when an export reads
+# can commit later with an updatedAt before the export's end; no write may run
+# longer than this lag.
+EXPORT_SAFETY_LAG = float(os.getenv("EXPORT_SAFETY_LAG", "60"))
+
+router = APIRouter()
+logger = logging.getLogger("chat_export")
+
+
+def export_query(
+    user_email: Optional[str],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Select[tuple[str]]:
+    """
+    One JSON text row per chat, oldest update first.
+
+    ``since`` is inclusive and ``until`` exclusive, so consecutive windows do
+    not overlap. They only leave no gaps when ``until`` is at or below the
+    high-water mark of :func:`export_high_water`. A None ``user_email``
+    selects every user's chats.
+    """
+    chat = json_object(
+        id=Chat.id,
+        userId=Chat.userId,
+        title=Chat.title,
+        createdAt=Chat.createdAt,
+        updatedAt=Chat.updatedAt,
+        version=Chat.version,
+        messages=chat_messages_json(),
+    )
+    query = select(cast(chat, Text)).order_by(Chat.updatedAt, Chat.id)
+    if user_email is not None:
+        query = query.where(Chat.userId == user_email)
+    if since is not None:
+        query = query.where(Chat.updatedAt >= since)
+    if until is not None:
+        query = query.where(Chat.updatedAt < until)
+    return query
+
+
+async def export_high_water(db: AsyncSession) -> datetime:
+    """
+    Latest ``until`` an export can use without missing writes that are
+    still in flight: the database clock minus EXPORT_SAFETY_LAG.
+    """
+    return await db.scalar(select(func.now() - timedelta(seconds=EXPORT_SAFETY_LAG)))
+
+
+async def stream_export(
+    db: AsyncSession,
+    query: Select[tuple[str]],
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Stream one chat per line, optionally gzipped.
+
+    Rows come from a server-side cursor in batches of EXPORT_BATCH_SIZE, so
+    memory use does not depend on the size of the export.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for (chat_json,) in result:
+        line = chat_json.encode() + b"\n"
+        if compressor is None:
+            yield line
+        elif chunk := compressor.compress(line):
+            yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+@router.get("/chats/export")
+async def export_chats(
+    request: Request,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    all_users: bool = False,
+    gzip: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Export the caller's chats, or every user's for admins, as NDJSON.
+
+    ``until`` is capped at the high-water mark, and the bound actually used
+    is returned in the ``X-Export-Until`` header. For incremental exports,
+    pass that header of the previous run as ``since``. Times without a
+    timezone are taken as UTC.
+    """
+    token_payload = await get_token_payload(request)
+    user_email = get_user_email(token_payload)
+
+    if all_users and not is_admin(token_payload):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden",
+        )
+    high_water = await export_high_water(db)
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if until is not None and until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    if until is None or until > high_water:
+        until = high_water
+    logger.info(
+        f"Exporting chats for {'all users' if all_users else user_email} "
+        f"(since={since}, until={until}, gzip={gzip})"
+    )
+
+    query = export_query(None if all_users else user_email, since, until)
+    filename = "chats.ndjson.gz" if gzip else "chats.ndjson"
+    return StreamingResponse(
+        stream_export(db, query, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Until": until.isoformat(),
+        },
+    )
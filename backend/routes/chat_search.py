@@ -0,0 +1,133 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Full-text search over the caller's chat history."""
+
+import logging
+import os
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import Select, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth import get_user_email
+from ..common.encoder import FastJSONResponse
+from ..database.config import get_db
+from ..database.models import SEARCH_CONFIG, Chat, Message
+from ..models.chat_schemas import SearchResponse, SearchResult
+from .chats import get_token_payload
+
+# Results per page, and the most a client may ask for
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+SEARCH_PAGE_MAX = int(os.getenv("SEARCH_PAGE_MAX", "100"))
+
+# Deepest offset served; relevance pages past this are rarely useful
+SEARCH_MAX_OFFSET = int(os.getenv("SEARCH_MAX_OFFSET", "1000"))
+
+# Markers around matched terms in snippets. The snippet is otherwise raw
+# message text, so clients must escape it before rendering it as HTML.
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=24"
+
+router = APIRouter(default_response_class=FastJSONResponse)
+logger = logging.getLogger("chat_search")
+
+
+def search_query(user_email: str, q: str, limit: int, offset: int = 0) -> Select:
+    """
+    Best matches for ``q`` among the user's messages, best first.
+
+    ``q`` uses web search syntax: quoted phrases, ``or`` and ``-term``.
+    Ranking and paging happen on the indexed tsvector; snippets are only
+    generated for the rows of the requested page.
+    """
+    query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), q)
+    rank = func.ts_rank_cd(Message.content_tsv, query)
+    page = (
+        select(
+            Message.chatId,
+            Chat.title,
+            Message.id,
+            Message.seq,
+            Message.type,
+            Message.content,
+            rank.label("rank"),
+        )
+        .join(Chat, Message.chatId == Chat.id)
+        .where(Chat.userId == user_email, Message.content_tsv.op("@@")(query))
+        .order_by(rank.desc(), Message.id)
+        .offset(offset)
+        .limit(limit)
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        literal_column(f"'{SEARCH_CONFIG}'"), page.c.content, query, HEADLINE_OPTIONS
+    )
+    return select(
+        page.c.chatId,
+        page.c.title,
+        page.c.id,
+        page.c.seq,
+        page.c.type,
+        snippet,
+        page.c.rank,
+    ).order_by(page.c.rank.desc(), page.c.id)
+
+
+async def search_chats_impl(
+    db: AsyncSession,
+    user_email: str,
+    q: str,
+    limit: int = SEARCH_PAGE_SIZE,
+    offset: int = 0,
+) -> SearchResponse:
+    """Search the user's messages and return one page of ranked results."""
+    rows = (await db.execute(search_query(user_email, q, limit + 1, offset))).all()
+    next_offset = offset + limit if len(rows) > limit else None
+    if next_offset is not None and next_offset > SEARCH_MAX_OFFSET:
+        next_offset = None
+
+    return SearchResponse(
+        results=[
+            SearchResult(
+                chatId=chat_id,
+                chatTitle=title,
+                messageId=message_id,
+                seq=seq,
+                type=message_type,
+                snippet=snippet,
+                rank=rank,
+            )
+            for chat_id, title, message_id, seq, message_type, snippet, rank in rows[
+                :limit
+            ]
+        ],
+        nextOffset=next_offset,
+    )
+
+
+@router.get("/chats/search", response_model=SearchResponse)
+async def search_chats(
+    request: Request,
+    q: Annotated[str, Query(min_length=1, max_length=500)],
+    limit: Annotated[int, Query(ge=1, le=SEARCH_PAGE_MAX)] = SEARCH_PAGE_SIZE,
+    offset: Annotated[int, Query(ge=0, le=SEARCH_MAX_OFFSET)] = 0,
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """Search the authenticated user's chat history."""
+    token_payload = await get_token_payload(request)
+    user_email = get_user_email(token_payload)
+    logger.debug(f"Searching chats for {user_email} (limit={limit}, offset={offset})")
+    return FastJSONResponse(await search_chats_impl(db, user_email, q, limit, offset))
@@ -14,34 +14,103 @@
 
 """Chat persistence API routes."""
 
+import base64
 import logging
 import os
-from datetime import datetime, timezone
-from typing import Any, Callable, Optional
+import uuid
+from datetime import datetime, timedelta
+from typing import Annotated, Any, AsyncIterator, Callable, Iterator, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlalchemy import delete, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import (
+    Select,
+    Text,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    func,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    UUID,
+    aggregate_order_by,
+    insert,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from ..auth import get_user_email
+from ..common.encoder import FastJSONResponse, encode
 from ..database.config import get_db
-from ..database.models import Chat, Message, ToolCall
+from ..database.models import (
+    Chat,
+    ChatListVersion,
+    IdempotencyKey,
+    Message,
+    ToolCall,
+)
 from ..models.chat_schemas import (
+    ChatMessagesResponse,
+    ChatPatchInput,
     ChatSchema,
     ChatsInput,
     ChatsResponse,
+    ChatSummariesResponse,
+    ChatSummary,
+    ChatVersionResponse,
+    MessageInput,
     MessageSchema,
+    MessagesInput,
     ToolCallSchema,
 )
 
 # Check if auth is disabled
 DISABLE_AUTH = os.getenv("DISABLE_AUTH", "false").lower() == "true"
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 logger = logging.getLogger("chats_routes")
 
 
+# Chats per page of GET /chats, and the most a client may ask for
+CHATS_PAGE_SIZE = int(os.getenv("CHATS_PAGE_SIZE", "50"))
+CHATS_PAGE_MAX = int(os.getenv("CHATS_PAGE_MAX", "200"))
+
+# Build the full chat dump in Postgres instead of from ORM objects
+CHATS_JSON_IN_SQL = os.getenv("CHATS_JSON_IN_SQL", "true").lower() == "true"
+
+# Chats fetched per round trip when the full dump is streamed
+CHATS_STREAM_BATCH = int(os.getenv("CHATS_STREAM_BATCH", "50"))
+
+# Messages per page of GET /chats/{chat_id}, and the most a client may ask for
+MESSAGES_PAGE_SIZE = int(os.getenv("MESSAGES_PAGE_SIZE", "100"))
+MESSAGES_PAGE_MAX = int(os.getenv("MESSAGES_PAGE_MAX", "1000"))
+
+
+def _message_schema(msg: Message) -> MessageSchema:
+    return MessageSchema(
+        id=msg.id,
+        type=msg.type,
+        content=msg.content,
+        name=msg.name,
+        tool_call_id=msg.tool_call_id,
+        additional_kwargs=msg.additional_kwargs,
+        tool_calls=[
+            ToolCallSchema(id=tc.id, name=tc.name, args=tc.args)
+            for tc in msg.tool_calls
+        ],
+        seq=msg.seq,
+    )
+
+
 async def get_chats_impl(
     db: AsyncSession,
     user_email: str,
@@ -57,95 +126,396 @@ async def get_chats_impl(
 
     chats_dict: dict[str, ChatSchema] = {}
     for chat in user_chats:
-        messages = [
-            MessageSchema(
-                id=msg.id,
-                type=msg.type,
-                content=msg.content,
-                name=msg.name,
-                tool_call_id=msg.tool_call_id,
-                additional_kwargs=msg.additional_kwargs,
-                tool_calls=[
-                    ToolCallSchema(id=tc.id, name=tc.name, args=tc.args)
-                    for tc in msg.tool_calls
-                ],
-            )
-            for msg in chat.messages
-        ]
+        messages = [_message_schema(msg) for msg in chat.messages]
         chats_dict[chat.id] = ChatSchema(title=chat.title, messages=messages)
 
     return ChatsResponse(chats=chats_dict)
 
 
+def json_object(**fields: Any) -> Any:
+    # Keys are rendered inline: json_build_object is variadic over "any", so
+    # Postgres cannot infer a type for them as bind parameters
+    args = []
+    for key, value in fields.items():
+        args += [literal_column(f"'{key}'"), value]
+    return func.json_build_object(*args)
+
+
+def _json_agg(value: Any, *order_by: Any) -> Any:
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(value, *order_by)),
+        literal_column("'[]'::json"),
+    )
+
+
+def chat_messages_json() -> Any:
+    """
+    Scalar subquery with the messages of the enclosing query's Chat as a JSON
+    array of MessageSchema objects, in sequence order.
+    """
+    tool_call = json_object(id=ToolCall.id, name=ToolCall.name, args=ToolCall.args)
+    tool_calls = (
+        select(_json_agg(tool_call, ToolCall.createdAt, ToolCall.id))
+        .where(ToolCall.messageId == Message.id)
+        .scalar_subquery()
+    )
+    message = json_object(
+        id=Message.id,
+        type=Message.type,
+        content=Message.content,
+        name=Message.name,
+        tool_call_id=Message.tool_call_id,
+        additional_kwargs=Message.additional_kwargs,
+        tool_calls=tool_calls,
+        seq=Message.seq,
+    )
+    return (
+        select(_json_agg(message, Message.seq))
+        .where(Message.chatId == Chat.id)
+        .scalar_subquery()
+    )
+
+
+def chats_json_query(user_email: str) -> Select[tuple[str, str]]:
+    """
+    One row per chat of the user: its id and its ChatSchema as JSON text.
+
+    The JSON is assembled by Postgres, so neither ORM objects nor schema
+    models are created for the messages.
+    """
+    chat = json_object(title=Chat.title, messages=chat_messages_json())
+    return (
+        select(Chat.id, cast(chat, Text))
+        .where(Chat.userId == user_email)
+        .order_by(Chat.updatedAt.desc(), Chat.id.desc())
+    )
+
+
+async def stream_chats_json(db: AsyncSession, user_email: str) -> AsyncIterator[bytes]:
+    """
+    Stream the ChatsResponse of the user as JSON bytes.
+
+    Rows come from a server-side cursor in batches of CHATS_STREAM_BATCH, so
+    only one batch of chats is held in memory at a time.
+    """
+    result = await db.stream(
+        chats_json_query(user_email).execution_options(yield_per=CHATS_STREAM_BATCH)
+    )
+    yield b'{"chats":{'
+    separator = b""
+    async for chat_id, chat_json in result:
+        yield separator + encode(chat_id) + b":" + chat_json.encode()
+        separator = b","
+    yield b"}}"
+
+
+def encode_chats_cursor(updated_at: datetime, chat_id: str) -> str:
+    """Opaque cursor pointing just past the chat with this sort key."""
+    raw = f"{updated_at.isoformat()}|{chat_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_chats_cursor(cursor: str) -> tuple[datetime, str]:
+    """Inverse of :func:`encode_chats_cursor`; 400 for anything it did not make."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        updated_at, chat_id = raw.split("|", 1)
+        # Checked here so a bad id is not first caught by the UUID cast in SQL
+        uuid.UUID(chat_id)
+        return datetime.fromisoformat(updated_at), chat_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+async def get_chat_summaries_impl(
+    db: AsyncSession,
+    user_email: str,
+    limit: int = CHATS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> ChatSummariesResponse:
+    """
+    Get one page of the user's chats, most recently updated first.
+
+    Pages are keyed on (updatedAt, id) rather than offsets, so each page is an
+    index range scan no matter how deep the client has paged.
+    """
+    message_count = (
+        select(func.count())
+        .select_from(Message)
+        .where(Message.chatId == Chat.id)
+        .scalar_subquery()
+        .label("messageCount")
+    )
+    query = (
+        select(Chat.id, Chat.title, Chat.updatedAt, Chat.version, message_count)
+        .where(Chat.userId == user_email)
+        .order_by(Chat.updatedAt.desc(), Chat.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        updated_at, chat_id = decode_chats_cursor(cursor)
+        query = query.where(tuple_(Chat.updatedAt, Chat.id) < (updated_at, chat_id))
+
+    rows = (await db.execute(query)).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_chats_cursor(page[-1].updatedAt, page[-1].id)
+
+    return ChatSummariesResponse(
+        chats=[
+            ChatSummary(
+                id=row.id,
+                title=row.title,
+                updatedAt=row.updatedAt,
+                version=row.version,
+                messageCount=row.messageCount,
+            )
+            for row in page
+        ],
+        nextCursor=next_cursor,
+    )
+
+
+# Rows per INSERT, well below the 32767 bind parameters a statement may have
+SAVE_BATCH_SIZE = 1000
+
+# Seconds an Idempotency-Key is remembered
+IDEMPOTENCY_KEY_TTL = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+
+UUID_ARRAY = ARRAY(UUID(as_uuid=False))
+
+
+def _batches(rows: list[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+    for start in range(0, len(rows), SAVE_BATCH_SIZE):
+        yield rows[start : start + SAVE_BATCH_SIZE]
+
+
+def chat_etag(version: int) -> str:
+    """ETag of a chat at ``version``."""
+    return f'"{version}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Whether an If-Match/If-None-Match header names ``etag``."""
+    if header is None:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+async def get_chats_etag(db: AsyncSession, user_email: str) -> str:
+    """
+    ETag of everything GET /chats can return for the user.
+
+    It is the user's chat listing version, which every chat write and delete
+    bumps in its own transaction, so the listing cannot change without it.
+    """
+    result = await db.execute(
+        select(ChatListVersion.version).where(ChatListVersion.userId == user_email)
+    )
+    return f'"chats-{result.scalar_one_or_none() or 0}"'
+
+
+async def _bump_chat_list_version(db: AsyncSession, user_email: str) -> None:
+    # The row lock makes the user's writes bump one after another in commit
+    # order, so it is taken last to hold it briefly. Timestamps cannot stand
+    # in for this: now() is when a transaction started, not when it commits.
+    stmt = insert(ChatListVersion).values(userId=user_email, version=1)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ChatListVersion.userId],
+            set_={"version": ChatListVersion.version + 1},
+        )
+    )
+
+
+def etag_response(content: Any, etag: str) -> FastJSONResponse:
+    """JSON response that browsers revalidate with If-None-Match."""
+    return FastJSONResponse(
+        content, headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
+
+
+def _message_row(msg_data: MessageInput, chat_id: str, seq: int) -> dict[str, Any]:
+    return {
+        "id": msg_data.id,
+        "type": msg_data.type,
+        "content": msg_data.content,
+        "name": msg_data.name,
+        "tool_call_id": msg_data.tool_call_id,
+        "additional_kwargs": msg_data.additional_kwargs,
+        "chatId": chat_id,
+        "seq": seq,
+    }
+
+
+def _tool_call_rows(msg_data: MessageInput) -> Iterator[dict[str, Any]]:
+    for tc_data in msg_data.tool_calls:
+        yield {
+            "id": tc_data.id,
+            "name": tc_data.name,
+            "args": tc_data.args,
+            "messageId": msg_data.id,
+        }
+
+
+async def _upsert_messages(db: AsyncSession, rows: list[dict[str, Any]]) -> set[str]:
+    """Write message rows, returning the ids of chats that actually changed."""
+    changed: set[str] = set()
+    for batch in _batches(rows):
+        stmt = insert(Message).values(batch)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Message.id],
+            set_={
+                "type": excluded.type,
+                "content": excluded.content,
+                "name": excluded.name,
+                "tool_call_id": excluded.tool_call_id,
+                "additional_kwargs": excluded.additional_kwargs,
+                "seq": excluded.seq,
+                "updatedAt": func.now(),
+            },
+            # Messages of other chats are not moved into this one
+            where=and_(
+                Message.chatId == excluded.chatId,
+                or_(
+                    Message.type.is_distinct_from(excluded.type),
+                    Message.content.is_distinct_from(excluded.content),
+                    Message.name.is_distinct_from(excluded.name),
+                    Message.tool_call_id.is_distinct_from(excluded.tool_call_id),
+                    Message.additional_kwargs.is_distinct_from(
+                        excluded.additional_kwargs
+                    ),
+                    Message.seq.is_distinct_from(excluded.seq),
+                ),
+            ),
+        ).returning(Message.chatId)
+        changed.update((await db.execute(stmt)).scalars())
+    return changed
+
+
+async def _upsert_tool_calls(
+    db: AsyncSession,
+    rows: list[dict[str, Any]],
+    message_chats: dict[str, str],
+) -> set[str]:
+    """Write tool call rows, returning the ids of chats that actually changed."""
+    changed: set[str] = set()
+    for batch in _batches(rows):
+        stmt = insert(ToolCall).values(batch)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ToolCall.id],
+            set_={
+                "name": excluded.name,
+                "args": excluded.args,
+                "updatedAt": func.now(),
+            },
+            where=and_(
+                ToolCall.messageId == excluded.messageId,
+                or_(
+                    ToolCall.name.is_distinct_from(excluded.name),
+                    ToolCall.args.is_distinct_from(excluded.args),
+                ),
+            ),
+        ).returning(ToolCall.messageId)
+        changed.update(
+            message_chats[message_id]
+            for message_id in (await db.execute(stmt)).scalars()
+        )
+    return changed
+
+
 async def save_chats_impl(
     chats_input: ChatsInput,
     db: AsyncSession,
     user_email: str,
 ) -> dict[str, bool]:
-    """Save/upsert chats for the authenticated user."""
+    """
+    Save/upsert chats for the authenticated user.
+
+    Each table is written with batched INSERT ... ON CONFLICT DO UPDATE
+    statements, so the number of round trips does not grow with the number of
+    chats. Rows whose content is unchanged are left alone, and a chat's
+    updatedAt and version only move when its title or one of its messages
+    changed.
+    """
+    if not chats_input.chats:
+        return {"success": True}
+
+    chat_rows = []
+    messages: dict[str, dict[str, Any]] = {}
+    tool_calls: dict[str, dict[str, Any]] = {}
+    for chat_id, chat_data in chats_input.chats.items():
+        chat_rows.append(
+            {
+                "id": chat_id,
+                "title": chat_data.title or "Untitled Chat",
+                "userId": user_email,
+            }
+        )
+        for seq, msg_data in enumerate(chat_data.messages):
+            # Later duplicates win, as they did when rows were saved one by one
+            messages[msg_data.id] = _message_row(msg_data, chat_id, seq)
+            for row in _tool_call_rows(msg_data):
+                tool_calls[row["id"]] = row
+
+    # Ids are chosen by the client; never write into another user's chats. The
+    # ids are sent as arrays so the check takes two parameters at any size.
+    # Messages are checked against the user's own chats, which the userId
+    # index finds, rather than joined to everyone else's.
+    chat_ids = bindparam("chat_ids", list(chats_input.chats), type_=UUID_ARRAY)
+    message_ids = bindparam("message_ids", list(messages), type_=UUID_ARRAY)
+    user_chats = select(Chat.id).where(Chat.userId == user_email)
+    result = await db.execute(
+        union_all(
+            select(Chat.id).where(Chat.id == any_(chat_ids), Chat.userId != user_email),
+            select(Message.id).where(
+                Message.id == any_(message_ids), Message.chatId.not_in(user_chats)
+            ),
+        ).limit(1)
+    )
+    if result.first() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden",
+        )
+
     try:
-        for chat_id, chat_data in chats_input.chats.items():
-            # Check if chat exists
-            result = await db.execute(select(Chat).where(Chat.id == chat_id))
-            existing_chat = result.scalar_one_or_none()
-
-            if existing_chat:
-                existing_chat.title = chat_data.title or "Untitled Chat"
-                existing_chat.userId = user_email
-                existing_chat.updatedAt = datetime.now(timezone.utc)
-            else:
-                new_chat = Chat(
-                    id=chat_id,
-                    title=chat_data.title or "Untitled Chat",
-                    userId=user_email,
-                )
-                db.add(new_chat)
+        changed_chats: set[str] = set()
 
-            # Upsert messages
-            for msg_data in chat_data.messages:
-                result = await db.execute(
-                    select(Message).where(Message.id == msg_data.id)
-                )
-                existing_msg = result.scalar_one_or_none()
-
-                if existing_msg:
-                    existing_msg.type = msg_data.type
-                    existing_msg.content = msg_data.content
-                    existing_msg.name = msg_data.name
-                    existing_msg.tool_call_id = msg_data.tool_call_id
-                    existing_msg.additional_kwargs = msg_data.additional_kwargs
-                    existing_msg.updatedAt = datetime.now(timezone.utc)
-                else:
-                    new_msg = Message(
-                        id=msg_data.id,
-                        type=msg_data.type,
-                        content=msg_data.content,
-                        name=msg_data.name,
-                        tool_call_id=msg_data.tool_call_id,
-                        additional_kwargs=msg_data.additional_kwargs,
-                        chatId=chat_id,
-                    )
-                    db.add(new_msg)
+        for batch in _batches(chat_rows):
+            stmt = insert(Chat).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Chat.id],
+                set_={"title": stmt.excluded.title},
+                where=and_(
+                    Chat.userId == stmt.excluded.userId,
+                    Chat.title.is_distinct_from(stmt.excluded.title),
+                ),
+            ).returning(Chat.id)
+            changed_chats.update((await db.execute(stmt)).scalars())
 
-                # Upsert tool calls
-                for tc_data in msg_data.tool_calls:
-                    result = await db.execute(
-                        select(ToolCall).where(ToolCall.id == tc_data.id)
-                    )
-                    existing_tc = result.scalar_one_or_none()
-
-                    if existing_tc:
-                        existing_tc.name = tc_data.name
-                        existing_tc.args = tc_data.args
-                        existing_tc.updatedAt = datetime.now(timezone.utc)
-                    else:
-                        new_tc = ToolCall(
-                            id=tc_data.id,
-                            name=tc_data.name,
-                            args=tc_data.args,
-                            messageId=msg_data.id,
-                        )
-                        db.add(new_tc)
+        changed_chats |= await _upsert_messages(db, list(messages.values()))
+        changed_chats |= await _upsert_tool_calls(
+            db,
+            list(tool_calls.values()),
+            {message_id: row["chatId"] for message_id, row in messages.items()},
+        )
+
+        if changed_chats:
+            changed = bindparam("changed", list(changed_chats), type_=UUID_ARRAY)
+            await db.execute(
+                update(Chat)
+                .where(Chat.id == any_(changed), Chat.userId == user_email)
+                .values(updatedAt=func.now(), version=Chat.version + 1)
+            )
+            await _bump_chat_list_version(db, user_email)
 
         await db.commit()
         return {"success": True}
@@ -159,6 +529,272 @@ async def save_chats_impl(
         )
 
 
+async def _claim_idempotency_key(
+    db: AsyncSession,
+    user_email: str,
+    endpoint: str,
+    key: str,
+) -> Optional[dict[str, Any]]:
+    """
+    Claim ``key`` on ``endpoint`` for the current transaction.
+
+    Returns the stored response when an earlier request to the same endpoint
+    already used the key; the same key sent elsewhere is a different request.
+    A concurrent request with the same key waits on the row until the first
+    one commits or rolls back.
+    """
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.userId == user_email,
+            IdempotencyKey.createdAt
+            < func.now() - timedelta(seconds=IDEMPOTENCY_KEY_TTL),
+        )
+    )
+    result = await db.execute(
+        insert(IdempotencyKey)
+        .values(userId=user_email, endpoint=endpoint, key=key)
+        .on_conflict_do_nothing()
+        .returning(IdempotencyKey.key)
+    )
+    if result.first() is not None:
+        return None
+    result = await db.execute(
+        select(IdempotencyKey.response).where(
+            IdempotencyKey.userId == user_email,
+            IdempotencyKey.endpoint == endpoint,
+            IdempotencyKey.key == key,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def write_chat_impl(
+    chat_id: str,
+    db: AsyncSession,
+    user_email: str,
+    messages: list[MessageInput],
+    title: Optional[str] = None,
+    if_match: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+    create: bool = True,
+) -> ChatVersionResponse:
+    """
+    Apply a delta to one chat, creating it if needed and ``create`` is set.
+
+    New messages are appended after the chat's last sequence number; messages
+    the chat already has keep their position and are rewritten only if their
+    content changed. The chat's version is bumped only when something was
+    written, so resending an unchanged delta is a cheap no-op.
+    """
+    endpoint = (
+        f"POST /chats/{chat_id}/messages" if create else f"PATCH /chats/{chat_id}"
+    )
+    try:
+        if idempotency_key:
+            stored = await _claim_idempotency_key(
+                db, user_email, endpoint, idempotency_key
+            )
+            if stored is not None:
+                await db.rollback()
+                return ChatVersionResponse(**stored)
+
+        created = False
+        if create:
+            result = await db.execute(
+                insert(Chat)
+                .values(id=chat_id, title=title or "Untitled Chat", userId=user_email)
+                .on_conflict_do_nothing()
+                .returning(Chat.id)
+            )
+            created = result.first() is not None
+
+        # The row lock serializes writers, so sequence numbers are never reused
+        last_seq = (
+            select(func.coalesce(func.max(Message.seq), -1))
+            .where(Message.chatId == chat_id)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            select(Chat.userId, Chat.title, Chat.version, last_seq)
+            .where(Chat.id == chat_id)
+            .with_for_update(of=Chat)
+        )
+        row = result.one_or_none()
+
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Chat not found",
+            )
+        owner, current_title, version, seq = row
+        if owner != user_email:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Forbidden",
+            )
+        if if_match is not None and not etag_matches(if_match, chat_etag(version)):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Chat has changed",
+                headers={"ETag": chat_etag(version)},
+            )
+
+        existing: dict[str, int] = {}
+        if messages:
+            ids = bindparam("ids", [msg.id for msg in messages], type_=UUID_ARRAY)
+            result = await db.execute(
+                select(Message.id, Message.chatId, Message.seq).where(
+                    Message.id == any_(ids)
+                )
+            )
+            for message_id, message_chat, message_seq in result.all():
+                if message_chat != chat_id:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Message belongs to another chat",
+                    )
+                existing[message_id] = message_seq
+
+        message_rows: dict[str, dict[str, Any]] = {}
+        tool_calls: dict[str, dict[str, Any]] = {}
+        for msg_data in messages:
+            if msg_data.id in existing:
+                row_seq = existing[msg_data.id]
+            elif msg_data.id in message_rows:
+                row_seq = message_rows[msg_data.id]["seq"]
+            else:
+                seq += 1
+                row_seq = seq
+            message_rows[msg_data.id] = _message_row(msg_data, chat_id, row_seq)
+            for row in _tool_call_rows(msg_data):
+                tool_calls[row["id"]] = row
+
+        changed = created or (title is not None and title != current_title)
+        changed |= bool(await _upsert_messages(db, list(message_rows.values())))
+        changed |= bool(
+            await _upsert_tool_calls(
+                db,
+                list(tool_calls.values()),
+                {message_id: chat_id for message_id in message_rows},
+            )
+        )
+
+        if changed:
+            values: dict[str, Any] = {
+                "updatedAt": func.now(),
+                "version": Chat.version + 1,
+            }
+            if title is not None:
+                values["title"] = title
+            result = await db.execute(
+                update(Chat)
+                .where(Chat.id == chat_id)
+                .values(**values)
+                .returning(Chat.version)
+            )
+            version = result.scalar_one()
+            await _bump_chat_list_version(db, user_email)
+
+        response = ChatVersionResponse(id=chat_id, version=version, lastSeq=seq)
+        if idempotency_key:
+            await db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.userId == user_email,
+                    IdempotencyKey.endpoint == endpoint,
+                    IdempotencyKey.key == idempotency_key,
+                )
+                .values(response=response.model_dump())
+            )
+
+        await db.commit()
+        return response
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Error writing chat: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save chat.",
+        )
+
+
+async def get_chat_messages_impl(
+    chat_id: str,
+    db: AsyncSession,
+    user_email: str,
+    after: int = -1,
+    if_none_match: Optional[str] = None,
+    limit: Optional[int] = None,
+    before: Optional[int] = None,
+    latest: bool = False,
+) -> ChatMessagesResponse:
+    """
+    Get the messages of a chat, in sequence order.
+
+    With ``latest`` set, returns the last ``limit`` messages (below ``before``
+    if given), so a client can page backwards from the newest message;
+    otherwise returns the first ``limit`` messages above ``after``. In both
+    cases ``nextCursor`` continues in the same direction and is None on the
+    last page. Answers 304 without reading any message rows when
+    ``if_none_match`` names the chat's current version.
+    """
+    result = await db.execute(
+        select(Chat.userId, Chat.title, Chat.version).where(Chat.id == chat_id)
+    )
+    chat = result.one_or_none()
+
+    if chat is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat not found",
+        )
+    if chat.userId != user_email:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden",
+        )
+    if etag_matches(if_none_match, chat_etag(chat.version)):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": chat_etag(chat.version)},
+        )
+
+    query = select(Message).options(selectinload(Message.tool_calls))
+    if latest:
+        query = query.where(Message.chatId == chat_id)
+        if before is not None:
+            query = query.where(Message.seq < before)
+        query = query.order_by(Message.seq.desc())
+    else:
+        query = query.where(Message.chatId == chat_id, Message.seq > after)
+        query = query.order_by(Message.seq)
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = list((await db.execute(query)).scalars().all())
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit]
+    if latest:
+        rows.reverse()
+
+    next_cursor = None
+    if has_more:
+        next_cursor = rows[0].seq if latest else rows[-1].seq
+
+    return ChatMessagesResponse(
+        id=chat_id,
+        title=chat.title,
+        version=chat.version,
+        lastSeq=rows[-1].seq if rows else after,
+        messages=[_message_schema(msg) for msg in rows],
+        nextCursor=next_cursor,
+    )
+
+
 async def delete_chat_impl(
     chat_id: str,
     db: AsyncSession,
@@ -183,23 +819,22 @@ async def delete_chat_impl(
 
     try:
         # Delete in order: tool_calls -> messages -> chat
-        # First get all message IDs for this chat
-        messages_result = await db.execute(
-            select(Message.id).where(Message.chatId == chat_id)
-        )
-        message_ids = [row[0] for row in messages_result.all()]
-
-        # Delete tool calls for these messages
-        if message_ids:
-            await db.execute(
-                delete(ToolCall).where(ToolCall.messageId.in_(message_ids))
+        # The subquery keeps the message ids in the database, where the
+        # (chatId, seq) and (messageId) indexes serve both deletes
+        await db.execute(
+            delete(ToolCall).where(
+                ToolCall.messageId.in_(
+                    select(Message.id).where(Message.chatId == chat_id)
+                )
             )
+        )
 
         # Delete messages
         await db.execute(delete(Message).where(Message.chatId == chat_id))
 
         # Delete chat
         await db.execute(delete(Chat).where(Chat.id == chat_id))
+        await _bump_chat_list_version(db, user_email)
 
         await db.commit()
         return {"success": True}
@@ -224,32 +859,68 @@ def set_verify_token_dependency(dep: Optional[Callable]) -> None:
     _verify_token_dep = dep
 
 
-async def get_token_payload(request: Request) -> dict[str, Any]:
-    """Get token payload, using the configured dependency or returning anonymous."""
+async def verify_token_value(token: Optional[str]) -> dict[str, Any]:
+    """Verify a bearer token with the configured dependency or return anonymous."""
     if DISABLE_AUTH or _verify_token_dep is None:
         return {"email": "anonymous@example.com", "preferred_username": "anonymous"}
 
-    # Get the Authorization header and extract token
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
+    if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing authorization header",
         )
 
-    token = auth_header.split(" ")[1]
     return await _verify_token_dep(token)
 
 
-@router.get("/chats", response_model=ChatsResponse)
+async def get_token_payload(request: Request) -> dict[str, Any]:
+    """Get token payload, using the configured dependency or returning anonymous."""
+    # Get the Authorization header and extract token
+    auth_header = request.headers.get("Authorization")
+    token = None
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+    return await verify_token_value(token)
+
+
+@router.get("/chats", response_model=Union[ChatSummariesResponse, ChatsResponse])
 async def get_chats(
     request: Request,
+    limit: Annotated[int, Query(ge=1, le=CHATS_PAGE_MAX)] = CHATS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    full: bool = False,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     db: AsyncSession = Depends(get_db),
-) -> ChatsResponse:
-    """Get all chats for the authenticated user."""
+) -> Response:
+    """
+    Get a page of chat summaries for the authenticated user.
+
+    ``full=true`` returns every chat with all of its messages instead, as
+    this endpoint did before it was paginated.
+    """
     token_payload = await get_token_payload(request)
     user_email = get_user_email(token_payload)
-    return await get_chats_impl(db, user_email)
+
+    # One key lookup answers an unchanged listing without reading chats
+    etag = await get_chats_etag(db, user_email)
+    if etag_matches(if_none_match, etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+
+    if full and CHATS_JSON_IN_SQL:
+        return StreamingResponse(
+            stream_chats_json(db, user_email),
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+        )
+    if full:
+        # Returning the response directly skips FastAPI's second validation pass
+        return etag_response(await get_chats_impl(db, user_email), etag)
+    return etag_response(
+        await get_chat_summaries_impl(db, user_email, limit, cursor), etag
+    )
 
 
 @router.post("/chats")
@@ -264,6 +935,97 @@ async def save_chats(
     return await save_chats_impl(chats_input, db, user_email)
 
 
+@router.get("/chats/{chat_id}", response_model=ChatMessagesResponse)
+async def get_chat(
+    chat_id: str,
+    request: Request,
+    limit: Annotated[int, Query(ge=1, le=MESSAGES_PAGE_MAX)] = MESSAGES_PAGE_SIZE,
+    before: Optional[int] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """Get a chat with its newest messages, paging back with ``before``."""
+    token_payload = await get_token_payload(request)
+    user_email = get_user_email(token_payload)
+    response = await get_chat_messages_impl(
+        chat_id,
+        db,
+        user_email,
+        if_none_match=if_none_match,
+        limit=limit,
+        before=before,
+        latest=True,
+    )
+    return etag_response(response, chat_etag(response.version))
+
+
+@router.get("/chats/{chat_id}/messages", response_model=ChatMessagesResponse)
+async def get_chat_messages(
+    chat_id: str,
+    request: Request,
+    after: int = -1,
+    limit: Annotated[Optional[int], Query(ge=1, le=MESSAGES_PAGE_MAX)] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """Get the messages of a chat after a sequence number."""
+    token_payload = await get_token_payload(request)
+    user_email = get_user_email(token_payload)
+    response = await get_chat_messages_impl(
+        chat_id, db, user_email, after, if_none_match, limit=limit
+    )
+    return etag_response(response, chat_etag(response.version))
+
+
+@router.post("/chats/{chat_id}/messages", response_model=ChatVersionResponse)
+async def append_messages(
+    chat_id: str,
+    messages_input: MessagesInput,
+    request: Request,
+    if_match: Annotated[Optional[str], Header()] = None,
+    idempotency_key: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """Append new or changed messages to a chat, creating it if needed."""
+    token_payload = await get_token_payload(request)
+    user_email = get_user_email(token_payload)
+    response = await write_chat_impl(
+        chat_id,
+        db,
+        user_email,
+        messages_input.messages,
+        title=messages_input.title,
+        if_match=if_match,
+        idempotency_key=idempotency_key,
+    )
+    return FastJSONResponse(response, headers={"ETag": chat_etag(response.version)})
+
+
+@router.patch("/chats/{chat_id}", response_model=ChatVersionResponse)
+async def patch_chat(
+    chat_id: str,
+    patch_input: ChatPatchInput,
+    request: Request,
+    if_match: Annotated[Optional[str], Header()] = None,
+    idempotency_key: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_db),
+) -> FastJSONResponse:
+    """Update a chat's title."""
+    token_payload = await get_token_payload(request)
+    user_email = get_user_email(token_payload)
+    response = await write_chat_impl(
+        chat_id,
+        db,
+        user_email,
+        [],
+        title=patch_input.title,
+        if_match=if_match,
+        idempotency_key=idempotency_key,
+        create=False,
+    )
+    return FastJSONResponse(response, headers={"ETag": chat_etag(response.version)})
+
+
 @router.delete("/chats/{chat_id}")
 async def delete_chat(
     chat_id: str,
@@ -12,19 +12,56 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import importlib
-import json
 import logging
+import math
 import os
+import time
 import uuid
-from typing import AsyncGenerator
+from types import ModuleType
+from typing import (
+    Annotated,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Literal,
+    Optional,
+)
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
+from langchain_core.runnables import RunnableConfig
 from traceloop.sdk import Traceloop
 
-from backend.common.serialization import custom_default
-from backend.models.requests import ConversationInputWrapper
+from backend.auth import get_user_email
+from backend.common.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    AdmissionSlot,
+)
+from backend.common.checkpointer import get_checkpointer, thread_input
+from backend.common.disconnect import ClientDisconnected, cancel_on_disconnect
+from backend.common.encoder import encode, encode_event
+from backend.common.framing import coalesce_token_events, token_text
+from backend.common.graph_events import stream_graph_events
+from backend.common.projection import project_event
+from backend.common.response_cache import (
+    CachedEvents,
+    InMemoryResponseCache,
+    PostgresResponseCache,
+    ResponseCache,
+    response_cache_key,
+)
+from backend.common.run_buffer import Line, ReplayGap, RunBuffer, RunRegistry
+from backend.common.semantic_cache import SemanticAnswerCache, single_turn_question
+from backend.models.requests import ConversationInputWrapper, UserChatMessage
+from backend.models.responses import COMPACT_SCHEMA_VERSION
+from backend.routes.chats import get_token_payload
+from backend.telemetry import record_stream_abort
 
 router = APIRouter()
 
@@ -37,18 +74,42 @@ chain_map = {
     "agentic_rag": "backend.patterns.agentic_rag.chain",
 }
 
-USE_CHAIN = os.getenv("USE_CHAIN")
 
-if not USE_CHAIN:
-    logger.error("USE_CHAIN is not set")
-    raise Exception("USE_CHAIN is not set")
+def _chain_list(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
 
-if USE_CHAIN not in chain_map:
+
+# USE_CHAIN is the chain used when a request does not select one.
+# HOSTED_CHAINS lists the patterns this process serves: only USE_CHAIN by
+# default, since each pattern needs its own configuration, and all of
+# chain_map when neither is set.
+USE_CHAIN = os.getenv("USE_CHAIN") or None
+HOSTED_CHAINS = _chain_list(
+    os.getenv("HOSTED_CHAINS") or USE_CHAIN or ",".join(chain_map)
+)
+
+for name in HOSTED_CHAINS:
+    if name not in chain_map:
+        logger.error(f"Invalid chain: {name}")
+        raise Exception(f"Invalid chain: {name}")
+
+if USE_CHAIN is not None and USE_CHAIN not in HOSTED_CHAINS:
     logger.error(f"Invalid chain: {USE_CHAIN}")
     raise Exception(f"Invalid chain: {USE_CHAIN}")
 
-chain_module_name = chain_map[USE_CHAIN]
-chain = importlib.import_module(chain_module_name).chain
+# Chains are imported and compiled on first use; PRELOAD_CHAINS (the default
+# chain unless set) are loaded at startup instead.
+PRELOAD_CHAINS = _chain_list(os.getenv("PRELOAD_CHAINS", USE_CHAIN or ""))
+
+for name in PRELOAD_CHAINS:
+    if name not in HOSTED_CHAINS:
+        logger.error(f"Cannot preload chain that is not hosted: {name}")
+        raise Exception(f"Cannot preload chain that is not hosted: {name}")
+
+chain_modules: dict[str, ModuleType] = {}
+_chain_locks: dict[str, asyncio.Lock] = {}
+# Chains compiled with the conversation checkpointer, by name
+stateful_chains: dict[str, Any] = {}
 
 EVENTS = [
     "on_tool_start",
@@ -58,15 +119,387 @@ EVENTS = [
     "on_chat_model_stream",
 ]
 
+# Stream engine: "graph" uses LangGraph's native messages/updates/custom stream
+# modes, "events" falls back to astream_events v2 with callback-based filtering.
+StreamEngine = Literal["graph", "events"]
+STREAM_ENGINE = os.getenv("STREAM_ENGINE", "graph")
+
+# Stream framing: "lines" sends one JSON line per event, "coalesced" merges
+# consecutive token deltas into frames flushed on a time window or byte limit.
+StreamFraming = Literal["lines", "coalesced"]
+STREAM_FRAMING_DEFAULT = os.getenv("STREAM_FRAMING_DEFAULT", "lines")
+STREAM_COALESCE_WINDOW_MS = float(os.getenv("STREAM_COALESCE_WINDOW_MS", "30"))
+STREAM_COALESCE_MAX_BYTES = int(os.getenv("STREAM_COALESCE_MAX_BYTES", "4096"))
+
+# Event schema: "compact" projects events onto the versioned models in
+# backend.models.responses, "legacy" sends the full astream_events v2 dicts.
+StreamSchema = Literal["compact", "legacy"]
+STREAM_SCHEMA_DEFAULT = os.getenv("STREAM_SCHEMA_DEFAULT", "compact")
+
+# How often the client connection is checked while a chain run is streaming
+STREAM_DISCONNECT_POLL_MS = float(os.getenv("STREAM_DISCONNECT_POLL_MS", "250"))
+
+# Resumable streams: runs are buffered per run_id so a client can reconnect
+# with Last-Event-ID. Finished runs are kept for STREAM_RESUME_TTL seconds and
+# runs nobody is reading are cancelled after STREAM_RESUME_GRACE seconds. Off
+# by default, since the bundled frontend never resumes; without it a run is
+# cancelled as soon as its client disconnects.
+STREAM_RESUME_ENABLED = os.getenv("STREAM_RESUME_ENABLED", "false").lower() == "true"
+STREAM_RESUME_TTL = float(os.getenv("STREAM_RESUME_TTL", "300"))
+STREAM_RESUME_GRACE = float(os.getenv("STREAM_RESUME_GRACE", "30"))
+STREAM_RESUME_RUN_MAX_BYTES = int(os.getenv("STREAM_RESUME_RUN_MAX_BYTES", "1048576"))
+STREAM_RESUME_MAX_BYTES = int(os.getenv("STREAM_RESUME_MAX_BYTES", "67108864"))
+
+# Opt-in response cache: RESPONSE_CACHE_CHAINS lists the chains whose
+# responses are cached, RESPONSE_CACHE_BACKEND selects "memory" (per process)
+# or "postgres" (shared across replicas).
+RESPONSE_CACHE_CHAINS = {
+    name.strip()
+    for name in os.getenv("RESPONSE_CACHE_CHAINS", "").split(",")
+    if name.strip()
+}
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+response_cache: Optional[ResponseCache] = None
+if RESPONSE_CACHE_CHAINS & set(HOSTED_CHAINS):
+    if RESPONSE_CACHE_BACKEND == "postgres":
+        response_cache = PostgresResponseCache()
+    elif RESPONSE_CACHE_BACKEND == "memory":
+        response_cache = InMemoryResponseCache(RESPONSE_CACHE_MAX_ENTRIES)
+    else:
+        logger.error(f"Invalid response cache backend: {RESPONSE_CACHE_BACKEND}")
+        raise Exception(f"Invalid response cache backend: {RESPONSE_CACHE_BACKEND}")
+    logger.info(
+        f"Response cache enabled for {sorted(RESPONSE_CACHE_CHAINS)} "
+        f"({RESPONSE_CACHE_BACKEND})"
+    )
+
+# Opt-in semantic answer cache for the RAG patterns: SEMANTIC_CACHE_CHAINS lists
+# the chains that serve earlier answers to questions whose embedding has at
+# least SEMANTIC_CACHE_THRESHOLD cosine similarity. Expired and least recently
+# served answers are evicted every SEMANTIC_CACHE_EVICT_INTERVAL seconds.
+SEMANTIC_CACHE_CHAINS = {
+    name.strip()
+    for name in os.getenv("SEMANTIC_CACHE_CHAINS", "").split(",")
+    if name.strip()
+}
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "86400"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+SEMANTIC_CACHE_EVICT_INTERVAL = float(os.getenv("SEMANTIC_CACHE_EVICT_INTERVAL", "60"))
+
+# Built for each chain when it is loaded, since it needs the chain's embeddings
+semantic_caches: dict[str, SemanticAnswerCache] = {}
+
+# Server-side conversation state: turns sent with history="server" carry only
+# their new messages, and the conversation of their session_id is kept by a
+# Postgres checkpointer.
+CONVERSATION_STATE_ENABLED = (
+    os.getenv("CONVERSATION_STATE_ENABLED", "false").lower() == "true"
+)
+
+# Admission control: at most ADMISSION_MAX_IN_FLIGHT runs per replica and
+# ADMISSION_MAX_PER_USER per user. Runs over the global limit wait in a queue of
+# ADMISSION_MAX_QUEUE entries for up to ADMISSION_QUEUE_TIMEOUT seconds;
+# everything else is rejected with 429 and Retry-After.
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+ADMISSION_MAX_PER_USER = int(os.getenv("ADMISSION_MAX_PER_USER", "4"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+ADMISSION_RETRY_AFTER = float(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+
+admission = AdmissionController(
+    max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+    max_per_user=ADMISSION_MAX_PER_USER,
+    max_queue=ADMISSION_MAX_QUEUE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    retry_after=ADMISSION_RETRY_AFTER,
+)
+
+run_registry = RunRegistry(
+    ttl=STREAM_RESUME_TTL,
+    grace=STREAM_RESUME_GRACE,
+    run_max_bytes=STREAM_RESUME_RUN_MAX_BYTES,
+    max_bytes=STREAM_RESUME_MAX_BYTES,
+)
+
+
+def register_chain(name: str, module: ModuleType) -> None:
+    """Make a loaded chain module available, with its semantic cache if enabled."""
+    if name in SEMANTIC_CACHE_CHAINS:
+        embeddings = getattr(module, "embeddings", None)
+        if embeddings is None or not os.getenv("COLLECTION_NAME"):
+            logger.error(f"Semantic cache requires a RAG chain, not {name}")
+            raise Exception(f"Semantic cache requires a RAG chain, not {name}")
+        semantic_caches[name] = SemanticAnswerCache(
+            embeddings,
+            chain=name,
+            collection=os.environ["COLLECTION_NAME"],
+            model=os.getenv("EMBEDDING_MODEL_ID", ""),
+            threshold=SEMANTIC_CACHE_THRESHOLD,
+            ttl=SEMANTIC_CACHE_TTL,
+            max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+            evict_interval=SEMANTIC_CACHE_EVICT_INTERVAL,
+        )
+        logger.info(f"Semantic cache enabled for {name}")
+    chain_modules[name] = module
+
+
+async def get_chain_module(name: str) -> ModuleType:
+    """
+    Return the module of a hosted chain, importing it on first use.
+
+    The import runs in a worker thread so a cold chain does not stall the
+    streams of chains that are already loaded, and concurrent first requests
+    for the same chain wait for a single import. A chain that fails to import
+    or initialize, e.g. for missing configuration, is reported as a 503 and
+    tried again on the next request.
+    """
+    module = chain_modules.get(name)
+    if module is not None:
+        return module
+    lock = _chain_locks.setdefault(name, asyncio.Lock())
+    async with lock:
+        module = chain_modules.get(name)
+        if module is None:
+            started = time.monotonic()
+            try:
+                module = await asyncio.to_thread(
+                    importlib.import_module, chain_map[name]
+                )
+                register_chain(name, module)
+            except Exception as e:
+                logger.error(f"Failed to load chain {name}: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Chain unavailable: {name}",
+                )
+            logger.info(
+                f"Loaded chain {name} in {(time.monotonic() - started) * 1000:.0f} ms"
+            )
+    return module
+
+
+for name in PRELOAD_CHAINS:
+    register_chain(name, importlib.import_module(chain_map[name]))
+
+
+async def get_stateful_chain(name: str) -> Any:
+    """Return the chain ``name`` with the conversation checkpointer attached."""
+    chain = stateful_chains.get(name)
+    if chain is None:
+        module = await get_chain_module(name)
+        checkpointer = await get_checkpointer()
+        chain = stateful_chains[name] = module.chain.copy(
+            {"checkpointer": checkpointer}
+        )
+    return chain
+
+
+def conversation_thread_id(
+    owner: Optional[str], chain_name: str, session_id: str
+) -> str:
+    """Checkpointer thread of a session, scoped to its user and chain."""
+    return f"{owner or ''}/{chain_name}/{session_id}"
+
+
+def check_conversation_input(input_data: UserChatMessage) -> None:
+    """Reject turns asking for server-side history when it cannot be used."""
+    if input_data.history != "server":
+        return
+    if not CONVERSATION_STATE_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Server-side conversation history is not enabled",
+        )
+    if not input_data.session_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Server-side conversation history requires a session_id",
+        )
+
+
+async def filter_chain_events(
+    input_data: dict[str, Any],
+    chain: Any,
+    config: Optional[RunnableConfig] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Stream events from the chain but only stream events that are tagged.
+    """
+    # The chain, itself, must specify which events should be streamed by tagging.
+    # This allows intermediate messages to be hidden from the user if desired.
+    if STREAM_ENGINE == "graph":
+        async for event in stream_graph_events(
+            chain, input_data, tag="include", config=config
+        ):
+            yield event
+        return
+
+    async for event in chain.astream_events(
+        input_data, config, version="v2", include_tags=["include"]
+    ):
+        if event["event"] in EVENTS:
+            yield event
+
+
+async def replay_events(events: CachedEvents) -> AsyncIterator[dict[str, Any]]:
+    """
+    Replay cached events, copying them so per-stream fields can be set.
+
+    Every run gets a fresh run id, shared by all of its events. Clients save a
+    tool run's id as the tool call's id, which must not repeat across chats.
+    """
+    run_ids: dict[str, str] = {}
+
+    def fresh(run_id: str) -> str:
+        if run_id not in run_ids:
+            run_ids[run_id] = str(uuid.uuid4())
+        return run_ids[run_id]
+
+    for event in events:
+        event = dict(event)
+        if event.get("run_id") is not None:
+            event["run_id"] = fresh(event["run_id"])
+        if event.get("parent_ids"):
+            event["parent_ids"] = [fresh(parent) for parent in event["parent_ids"]]
+        yield event
+
+
+async def lookup_cached_response(key: str) -> Optional[CachedEvents]:
+    """Return the cached response for ``key``; cache errors count as a miss."""
+    if response_cache is None:
+        return None
+    try:
+        return await response_cache.get(key)
+    except Exception as e:
+        logger.warning(f"Response cache lookup failed: {e}")
+        return None
+
+
+async def store_cached_response(key: str, events: CachedEvents) -> None:
+    if response_cache is None:
+        return
+    try:
+        await response_cache.set(key, events, RESPONSE_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Response cache update failed: {e}")
+
+
+def cached_answer_event(answer: str) -> dict[str, Any]:
+    """Build a token event carrying a whole cached answer."""
+    return {
+        "event": "on_chat_model_stream",
+        "name": "semantic_cache",
+        "run_id": str(uuid.uuid4()),
+        "data": {"chunk": {"type": "AIMessageChunk", "content": answer}},
+    }
+
+
+async def lookup_semantic_answer(
+    input_data: dict[str, Any],
+    semantic_cache: Optional[SemanticAnswerCache],
+) -> tuple[Optional[str], Optional[tuple[str, list[float]]]]:
+    """
+    Look up a cached answer to the question of a first turn.
+
+    Returns the answer, if any, and the question with its embedding so a
+    fresh answer can be stored under it. Follow-up turns are neither served
+    nor stored, since the cache does not key on the earlier turns. Cache
+    errors count as a miss.
+    """
+    if semantic_cache is None:
+        return None, None
+    question = single_turn_question(input_data.get("messages") or [])
+    if question is None:
+        return None, None
+    try:
+        vector = await semantic_cache.embed(question)
+        return await semantic_cache.lookup(vector), (question, vector)
+    except Exception as e:
+        logger.warning(f"Semantic cache lookup failed: {e}")
+        return None, None
+
+
+async def store_semantic_answer(
+    semantic_cache: SemanticAnswerCache, question: tuple[str, list[float]], answer: str
+) -> None:
+    try:
+        await semantic_cache.store(question[0], question[1], answer)
+    except Exception as e:
+        logger.warning(f"Semantic cache update failed: {e}")
+
 
 async def stream_conversation_events(
     input_data: dict[str, str],
-) -> AsyncGenerator[str, None]:
+    framing: StreamFraming = "lines",
+    schema: StreamSchema = "compact",
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    run_id: Optional[str] = None,
+    chain_name: Optional[str] = None,
+    owner: Optional[str] = None,
+) -> AsyncGenerator[bytes, None]:
     """
-    This async generator streams conversation-related events one at a time.
+    This async generator streams conversation-related events one at a time
+    from the chain named ``chain_name`` (the default chain if not given).
+
+    Every event carries a ``seq`` number counting from 0 for the metadata
+    event, which clients send back as ``Last-Event-ID`` to resume. When
+    ``is_disconnected`` is given, the chain run is cancelled as soon as it
+    reports the client has gone. Streams that end early for any reason are
+    recorded in telemetry.
+
+    For chains with the response cache enabled, a cached response is replayed
+    instead of running the chain, and completed runs are added to the cache.
+    The semantic cache is consulted next and serves a cached final answer as a
+    single token event.
+
+    Turns with ``history="server"`` run on the checkpointed chain in the thread
+    of ``owner``'s session and bypass both caches, whose answers would not be
+    saved to the thread.
     """
 
-    session_identifier = str(uuid.uuid4())
+    session_identifier = run_id or str(uuid.uuid4())
+    chain_name = chain_name or USE_CHAIN
+    config: Optional[RunnableConfig] = None
+    if input_data.get("history") == "server":
+        chain = await get_stateful_chain(chain_name)
+        config = {
+            "configurable": {
+                "thread_id": conversation_thread_id(
+                    owner, chain_name, input_data["session_id"]
+                )
+            }
+        }
+        input_data = await thread_input(chain, config, input_data)
+        semantic_cache = None
+    else:
+        chain = (await get_chain_module(chain_name)).chain
+        semantic_cache = semantic_caches.get(chain_name)
+
+    cache_key = None
+    cached = None
+    if (
+        response_cache is not None
+        and config is None
+        and chain_name in RESPONSE_CACHE_CHAINS
+    ):
+        cache_key = response_cache_key(
+            input_data.get("messages") or [],
+            chain=chain_name,
+            collection=os.getenv("COLLECTION_NAME"),
+            revision=os.getenv("COMMIT_SHA", "None"),
+            framing=framing,
+            schema=schema,
+        )
+        cached = await lookup_cached_response(cache_key)
+
+    answer = None
+    question = None
+    if cached is None:
+        answer, question = await lookup_semantic_answer(input_data, semantic_cache)
 
     # Attach metadata to the tracing session
     Traceloop.set_association_properties(
@@ -80,40 +513,342 @@ async def stream_conversation_events(
     )
 
     # Yield initial metadata event
-    initial_event = {"event": "metadata", "data": {"run_id": session_identifier}}
+    initial_event: dict[str, Any] = {
+        "event": "metadata",
+        "data": {"run_id": session_identifier},
+        "seq": 0,
+    }
+    if schema == "compact":
+        initial_event["data"].update(
+            {"schema": "compact", "schema_version": COMPACT_SCHEMA_VERSION}
+        )
+    if cached is not None:
+        initial_event["data"].update({"cached": True, "cache": "exact"})
+        logger.info(f"Replaying cached response for session {session_identifier}")
+    elif answer is not None:
+        initial_event["data"].update({"cached": True, "cache": "semantic"})
+        logger.info(f"Serving cached answer for session {session_identifier}")
     logger.debug(f"Starting event stream for session {session_identifier}")
-    yield json.dumps(initial_event, default=custom_default) + "\n"
+    yield encode_event(initial_event)
 
-    # Stream events from the chain but only stream events that are tagged.
-    # The chain, itself, must specify which events should be streamed by tagging.
-    # This allows intermediate messages to be hidden from the user if desired.
-    async for event in chain.astream_events(
-        input_data, version="v2", include_tags=["include"]
-    ):
-        if event["event"] in EVENTS:
-            logger.debug(
-                f"Event: {json.dumps(event, default=custom_default, indent=2)}"
+    # Cached events were stored after framing and projection
+    project = schema == "compact" and cached is None
+    recorded: Optional[CachedEvents] = None
+    if cached is not None:
+        events = replay_events(cached)
+    elif answer is not None:
+        events = replay_events([cached_answer_event(answer)])
+    else:
+        events = filter_chain_events(input_data, chain, config)
+        if cache_key is not None:
+            recorded = []
+        if framing == "coalesced":
+            events = coalesce_token_events(
+                events,
+                window=STREAM_COALESCE_WINDOW_MS / 1000,
+                max_bytes=STREAM_COALESCE_MAX_BYTES,
+            )
+    # Text of the last model run, i.e. the final answer, for the semantic cache
+    track_answer = question is not None and answer is None
+    answer_run = None
+    answer_parts: list[str] = []
+    if is_disconnected is not None:
+        events = cancel_on_disconnect(
+            events, is_disconnected, poll_interval=STREAM_DISCONNECT_POLL_MS / 1000
+        )
+
+    started = time.monotonic()
+    events_sent = 0
+    abort_reason = None
+    seq = 0
+    try:
+        async for event in events:
+            if track_answer:
+                text = token_text(event)
+                if text is not None:
+                    if event.get("run_id") != answer_run:
+                        answer_run, answer_parts = event.get("run_id"), []
+                    answer_parts.append(text)
+            if project:
+                event = project_event(event)
+                if event is None:
+                    continue
+            seq += 1
+            event["seq"] = seq
+            line = encode_event(event)
+            if recorded is not None:
+                recorded.append(orjson.loads(line))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Event: {line.decode()}")
+            yield line
+            events_sent += 1
+    except ClientDisconnected:
+        abort_reason = "client_disconnected"
+        return
+    except (asyncio.CancelledError, GeneratorExit) as e:
+        # Cancelled by the server, e.g. Starlette noticing the disconnect first,
+        # or by the run registry once no client reattached
+        abort_reason = str(e.args[0]) if e.args else "cancelled"
+        raise
+    finally:
+        if abort_reason is not None:
+            record_stream_abort(
+                session_identifier,
+                abort_reason,
+                user_id=input_data.get("user_id"),
+                session_id=input_data.get("session_id"),
+                events_sent=events_sent,
+                elapsed_ms=round((time.monotonic() - started) * 1000),
             )
-            yield json.dumps(event, default=custom_default) + "\n"
+
+    if recorded is not None:
+        await store_cached_response(cache_key, recorded)
+    if track_answer and answer_parts:
+        await store_semantic_answer(semantic_cache, question, "".join(answer_parts))
 
     # Final "end" event
     logger.debug(f"Ending event stream for session {session_identifier}")
-    yield json.dumps({"event": "end"}, default=custom_default) + "\n"
+    yield encode_event({"event": "end", "seq": seq + 1})
 
 
-@router.post("/stream_events")
-async def initiate_stream(req_payload: ConversationInputWrapper) -> StreamingResponse:
+async def stream_run(
+    buffer: RunBuffer,
+    after: int = -1,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> AsyncGenerator[Line, None]:
     """
-    Initiate a streaming response of events for a given conversation input.
+    Stream the buffered lines of a run after sequence number ``after``.
+
+    A client disconnect only detaches the reader; the run keeps going until it
+    finishes or the registry's grace period passes without a reconnect.
     """
+    lines = run_registry.subscribe(buffer, after)
+    if is_disconnected is not None:
+        lines = cancel_on_disconnect(
+            lines, is_disconnected, poll_interval=STREAM_DISCONNECT_POLL_MS / 1000
+        )
     try:
-        logger.debug(
-            f"Received conversation input: {json.dumps(req_payload, default=custom_default, indent=2)}"
+        async for line in lines:
+            yield line
+    except ClientDisconnected:
+        logger.info(f"Client detached from run {buffer.run_id}")
+    except ReplayGap as e:
+        # The reader fell behind the ring buffer; the client has to restart
+        logger.warning(f"Stopped streaming run {buffer.run_id}: {e}")
+
+
+async def admit(owner: str, count: int = 1) -> AdmissionSlot:
+    """Take up to ``count`` admission slots for ``owner``, or fail with 429."""
+    try:
+        return await admission.acquire(owner, count)
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected run for {owner}: {e.reason}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.reason,
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    A streaming response holding an admission slot until it has been sent.
+
+    The slot is given back even when the body is never iterated, e.g. when the
+    client is gone before the response starts.
+    """
+
+    def __init__(self, content: Any, slot: AdmissionSlot, **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.slot.release()
+
+
+def start_buffered_run(
+    run_id: str,
+    owner: str,
+    slot: AdmissionSlot,
+    input_data: dict[str, Any],
+    framing: StreamFraming,
+    schema: StreamSchema,
+    chain_name: str,
+) -> RunBuffer:
+    """
+    Start a run in the run registry, holding ``slot``, which the caller has
+    already acquired for ``owner``, until the run's task is done.
+    """
+    buffer = run_registry.start(
+        run_id,
+        stream_conversation_events(
+            input_data,
+            framing=framing,
+            schema=schema,
+            run_id=run_id,
+            chain_name=chain_name,
+            owner=owner,
+        ),
+        owner=owner,
+    )
+    buffer.task.add_done_callback(lambda _: slot.release())
+    return buffer
+
+
+async def resolve_chain(chain_name: Optional[str]) -> str:
+    """
+    Return the hosted chain a request selected, loading it if needed.
+
+    Raises 400 when no chain was selected and there is no default, and 404 for
+    chains this process does not host.
+    """
+    chain_name = chain_name or USE_CHAIN
+    if chain_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No chain selected"
         )
-        return StreamingResponse(
-            stream_conversation_events(req_payload.input_data.model_dump()),
-            media_type="text/event-stream",
+    if chain_name not in HOSTED_CHAINS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Chain not found: {chain_name}",
         )
+    await get_chain_module(chain_name)
+    return chain_name
+
+
+@router.get("/chains")
+async def list_chains() -> dict[str, Any]:
+    """List the chains hosted by this process and whether they are loaded."""
+    return {
+        "default": USE_CHAIN,
+        "chains": [
+            {"name": name, "loaded": name in chain_modules} for name in HOSTED_CHAINS
+        ],
+    }
+
+
+@router.post("/stream_events")
+@router.post("/chains/{chain_name}/stream_events")
+async def initiate_stream(
+    request: Request,
+    req_payload: ConversationInputWrapper,
+    chain_name: Optional[str] = None,
+    framing: Annotated[Optional[StreamFraming], Query()] = None,
+    x_stream_framing: Annotated[Optional[StreamFraming], Header()] = None,
+    stream_schema: Annotated[Optional[StreamSchema], Query(alias="schema")] = None,
+    x_stream_schema: Annotated[Optional[StreamSchema], Header()] = None,
+) -> StreamingResponse:
+    """
+    Initiate a streaming response of events for a given conversation input.
+
+    The chain is taken from the path, then the ``chain`` body field, then the
+    server's default chain, and is loaded on first use.
+
+    The framing mode can be negotiated with the ``framing`` query parameter or
+    the ``X-Stream-Framing`` header, and the event schema with the ``schema``
+    query parameter or the ``X-Stream-Schema`` header. Both are echoed back in
+    the response headers. The run id is returned in ``X-Run-Id``; see
+    ``resume_stream`` for reconnecting to the run.
+
+    Runs beyond the admission limits are rejected with 429 and Retry-After,
+    and turns asking for server-side history without it being available with
+    400.
+    """
+    try:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Received conversation input: {encode(req_payload).decode()}")
+        selected_framing = framing or x_stream_framing or STREAM_FRAMING_DEFAULT
+        selected_schema = stream_schema or x_stream_schema or STREAM_SCHEMA_DEFAULT
+        check_conversation_input(req_payload.input_data)
+        selected_chain = await resolve_chain(chain_name or req_payload.chain)
+        run_id = str(uuid.uuid4())
+        headers = {
+            "X-Chain": selected_chain,
+            "X-Stream-Framing": selected_framing,
+            "X-Stream-Schema": selected_schema,
+            "X-Run-Id": run_id,
+        }
+
+        owner = get_user_email(await get_token_payload(request))
+        slot = await admit(owner)
+
+        try:
+            if not STREAM_RESUME_ENABLED:
+                # Without a buffer the run is cancelled as soon as the client
+                # leaves
+                return AdmittedStreamingResponse(
+                    stream_conversation_events(
+                        req_payload.input_data.model_dump(),
+                        framing=selected_framing,
+                        schema=selected_schema,
+                        is_disconnected=request.is_disconnected,
+                        run_id=run_id,
+                        chain_name=selected_chain,
+                        owner=owner,
+                    ),
+                    slot,
+                    media_type="text/event-stream",
+                    headers=headers,
+                )
+
+            buffer = start_buffered_run(
+                run_id,
+                owner,
+                slot,
+                req_payload.input_data.model_dump(),
+                framing=selected_framing,
+                schema=selected_schema,
+                chain_name=selected_chain,
+            )
+            return StreamingResponse(
+                stream_run(buffer, is_disconnected=request.is_disconnected),
+                media_type="text/event-stream",
+                headers=headers,
+            )
+        except BaseException:
+            slot.release()
+            raise
     except Exception as e:
         print(f"Error processing request: {str(e)}")
         raise
+
+
+@router.get("/stream_events/{run_id}")
+async def resume_stream(
+    run_id: str,
+    request: Request,
+    last_event_id: Annotated[Optional[int], Header()] = None,
+    after: Annotated[Optional[int], Query()] = None,
+) -> StreamingResponse:
+    """
+    Resume the event stream of a run started on this instance.
+
+    Lines after the sequence number in the ``Last-Event-ID`` header (or the
+    ``after`` query parameter) are replayed from the run's buffer, followed by
+    the rest of the run if it is still generating. Returns 404 for unknown or
+    expired runs and 410 when the requested lines are no longer buffered.
+    """
+    buffer = run_registry.get(run_id)
+    owner = get_user_email(await get_token_payload(request))
+    if buffer is None or buffer.owner != owner:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Run not found"
+        )
+
+    last_seq = after if after is not None else last_event_id
+    last_seq = -1 if last_seq is None else last_seq
+    if last_seq + 1 < buffer.first_seq:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"Events before {buffer.first_seq} are no longer buffered",
+        )
+
+    logger.info(f"Resuming run {run_id} after event {last_seq}")
+    return StreamingResponse(
+        stream_run(buffer, last_seq, is_disconnected=request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"X-Run-Id": run_id},
+    )
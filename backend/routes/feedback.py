@@ -16,9 +16,10 @@ import logging
 
 from fastapi import APIRouter
 
+from backend.common.encoder import FastJSONResponse
 from backend.models.requests import UserFeedback
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 logger = logging.getLogger("feedback_routes")
 
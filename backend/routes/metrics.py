@@ -0,0 +1,38 @@
+"""Metrics API route."""
+
+import logging
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .events import admission
+
+router = APIRouter()
+logger = logging.getLogger("metrics_routes")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Return stream admission gauges in the Prometheus text format.
+
+    In-flight and queued runs are the load signals for autoscaling; a replica
+    with queued runs is already at its concurrency limit.
+    """
+    stats = admission.stats()
+    lines = [
+        "# HELP stream_events_in_flight Chain runs currently executing.",
+        "# TYPE stream_events_in_flight gauge",
+        f"stream_events_in_flight {stats['in_flight']}",
+        "# HELP stream_events_queued Chain runs waiting for an admission slot.",
+        "# TYPE stream_events_queued gauge",
+        f"stream_events_queued {stats['queued']}",
+        "# HELP stream_events_max_in_flight Admission limit for concurrent runs.",
+        "# TYPE stream_events_max_in_flight gauge",
+        f"stream_events_max_in_flight {stats['max_in_flight']}",
+        "# HELP stream_events_rejected_total Runs rejected with 429.",
+        "# TYPE stream_events_rejected_total counter",
+        f"stream_events_rejected_total {stats['rejected']}",
+    ]
+    return PlainTextResponse(
+        "\n".join(lines) + "\n", media_type="text/plain; version=0.0.4"
+    )
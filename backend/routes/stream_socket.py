@@ -0,0 +1,340 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+WebSocket transport for event streams.
+
+A client authenticates once per connection and can then run several
+conversations over it at the same time. Runs go through the same run registry
+as ``/stream_events``, so a run started over HTTP can be resumed over a socket
+and the other way around.
+
+Client messages (see ``SocketMessage``):
+
+- ``auth``: the bearer token, unless sent in the Authorization header; may be
+  sent again later to refresh it.
+- ``start``: start a run. The server answers with ``started``, carrying the
+  client's ``ref`` and the ``run_id``.
+- ``resume``: reattach to a run after sequence number ``after``.
+- ``cancel``: cancel a run.
+- ``ack``: acknowledge the events of a run up to ``seq``. Runs started or
+  resumed with a ``window`` pause after that many unacknowledged events.
+
+Server messages are ``ready``, ``started``, ``event`` (the encoded event in
+``data``), ``done`` and ``error``.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+import uuid
+from typing import Any, Optional, Union
+
+import orjson
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import TypeAdapter, ValidationError
+
+from backend.auth import get_user_email
+from backend.common.admission import AdmissionRejected
+from backend.common.encoder import encode
+from backend.common.run_buffer import Line, ReplayGap, RunBuffer
+from backend.models.requests import (
+    SocketAck,
+    SocketAuth,
+    SocketCancel,
+    SocketMessage,
+    SocketResume,
+    SocketStart,
+)
+from backend.routes import events
+from backend.routes.chats import verify_token_value
+
+router = APIRouter()
+
+logger = logging.getLogger("stream_socket_routes")
+
+# Clients that do not send the token in the Authorization header must send an
+# auth message within STREAM_SOCKET_AUTH_TIMEOUT seconds. Each connection runs
+# at most STREAM_SOCKET_MAX_RUNS runs at once.
+STREAM_SOCKET_AUTH_TIMEOUT = float(os.getenv("STREAM_SOCKET_AUTH_TIMEOUT", "10"))
+STREAM_SOCKET_MAX_RUNS = int(os.getenv("STREAM_SOCKET_MAX_RUNS", "8"))
+
+# Close code for connections that fail to authenticate (policy violation)
+CLOSE_POLICY_VIOLATION = 1008
+
+socket_messages: TypeAdapter[Any] = TypeAdapter(SocketMessage)
+
+
+def event_frame(run_id: str, line: Line) -> str:
+    """Wrap an encoded event line in an event message without re-encoding it."""
+    if isinstance(line, str):
+        line = line.encode()
+    return (
+        b'{"type":"event","run_id":'
+        + orjson.dumps(run_id)
+        + b',"data":'
+        + line.rstrip(b"\n")
+        + b"}"
+    ).decode()
+
+
+class AckWindow:
+    """Pauses a run until the client has acknowledged enough of its events."""
+
+    def __init__(self, size: int, acked: int) -> None:
+        self.size = size
+        self.acked = acked
+        self._changed = asyncio.Event()
+
+    def ack(self, seq: int) -> None:
+        if seq > self.acked:
+            self.acked = seq
+            self._changed.set()
+            self._changed = asyncio.Event()
+
+    async def wait(self, seq: int) -> None:
+        """Wait until the event numbered ``seq`` fits in the window."""
+        while seq - self.acked > self.size:
+            await self._changed.wait()
+
+
+class StreamSocket:
+    """An authenticated socket and the runs it is forwarding."""
+
+    def __init__(self, websocket: WebSocket, payload: dict[str, Any]) -> None:
+        self.websocket = websocket
+        self.payload = payload
+        self.owner = get_user_email(payload)
+        self.forwarders: dict[str, asyncio.Task] = {}
+        self.windows: dict[str, AckWindow] = {}
+        self._send_lock = asyncio.Lock()
+
+    async def send(self, message: Union[dict[str, Any], str]) -> None:
+        if not isinstance(message, str):
+            message = encode(message).decode()
+        # Sends wait for the connection to drain, so a slow reader slows the runs
+        async with self._send_lock:
+            await self.websocket.send_text(message)
+
+    async def send_error(
+        self, code: str, detail: str, run_id: Optional[str] = None, **extra: Any
+    ) -> None:
+        await self.send(
+            {"type": "error", "code": code, "detail": detail, "run_id": run_id, **extra}
+        )
+
+    async def handle(self, message: Any) -> None:
+        if isinstance(message, SocketAuth):
+            await self.refresh(message.token)
+        elif isinstance(message, SocketStart):
+            if len(self.forwarders) >= STREAM_SOCKET_MAX_RUNS:
+                await self.send_error(
+                    "too_many_runs",
+                    f"At most {STREAM_SOCKET_MAX_RUNS} runs per connection",
+                    ref=message.ref,
+                )
+            elif self.token_expired():
+                await self.send_error(
+                    "token_expired", "Send a new token to start runs", ref=message.ref
+                )
+            else:
+                run_id = str(uuid.uuid4())
+                self.forwarders[run_id] = asyncio.create_task(
+                    self.start(run_id, message)
+                )
+        elif isinstance(message, SocketResume):
+            await self.resume(message)
+        elif isinstance(message, SocketCancel):
+            await self.cancel(message.run_id)
+        elif isinstance(message, SocketAck):
+            window = self.windows.get(message.run_id)
+            if window is not None:
+                window.ack(message.seq)
+
+    async def refresh(self, token: str) -> None:
+        try:
+            payload = await verify_token_value(token)
+        except HTTPException as e:
+            await self.send_error("unauthorized", str(e.detail))
+            return
+        if get_user_email(payload) != self.owner:
+            await self.send_error("unauthorized", "Token belongs to another user")
+            return
+        self.payload = payload
+
+    def token_expired(self) -> bool:
+        exp = self.payload.get("exp")
+        return exp is not None and exp <= time.time()
+
+    async def start(self, run_id: str, message: SocketStart) -> None:
+        await self.send({"type": "started", "ref": message.ref, "run_id": run_id})
+        try:
+            events.check_conversation_input(message.input_data)
+            chain_name = await events.resolve_chain(message.chain)
+        except HTTPException as e:
+            await self.send_error("invalid_input", str(e.detail), run_id)
+            self.forwarders.pop(run_id, None)
+            return
+        try:
+            slot = await events.admission.acquire(self.owner)
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected socket run for {self.owner}: {e.reason}")
+            await self.send_error(
+                "rejected", e.reason, run_id, retry_after=math.ceil(e.retry_after)
+            )
+            self.forwarders.pop(run_id, None)
+            return
+        try:
+            buffer = events.start_buffered_run(
+                run_id,
+                self.owner,
+                slot,
+                message.input_data.model_dump(),
+                framing=message.framing or events.STREAM_FRAMING_DEFAULT,
+                schema=message.stream_schema or events.STREAM_SCHEMA_DEFAULT,
+                chain_name=chain_name,
+            )
+        except BaseException:
+            slot.release()
+            raise
+        await self.forward(buffer, -1, message.window)
+
+    async def resume(self, message: SocketResume) -> None:
+        buffer = events.run_registry.get(message.run_id)
+        if buffer is None or buffer.owner != self.owner:
+            await self.send_error("not_found", "Run not found", message.run_id)
+            return
+        if message.after + 1 < buffer.first_seq:
+            await self.send_error(
+                "gone",
+                f"Events before {buffer.first_seq} are no longer buffered",
+                message.run_id,
+            )
+            return
+        previous = self.forwarders.get(message.run_id)
+        if previous is not None:
+            previous.cancel()
+            await asyncio.gather(previous, return_exceptions=True)
+        self.forwarders[message.run_id] = asyncio.create_task(
+            self.forward(buffer, message.after, message.window)
+        )
+
+    async def cancel(self, run_id: str) -> None:
+        buffer = events.run_registry.get(run_id)
+        if buffer is not None and buffer.owner == self.owner:
+            if buffer.task is not None and not buffer.done:
+                buffer.task.cancel("client_cancelled")
+            return
+        # Still waiting for admission, so there is no buffer yet
+        forwarder = self.forwarders.pop(run_id, None)
+        if forwarder is None:
+            await self.send_error("not_found", "Run not found", run_id)
+            return
+        forwarder.cancel()
+        await self.send({"type": "done", "run_id": run_id, "cancelled": True})
+
+    async def forward(
+        self, buffer: RunBuffer, after: int, window_size: Optional[int]
+    ) -> None:
+        """Send the lines of ``buffer`` after ``after`` as event messages."""
+        run_id = buffer.run_id
+        window = None
+        if window_size is not None:
+            window = self.windows[run_id] = AckWindow(window_size, after)
+        seq = after
+        try:
+            async for line in events.run_registry.subscribe(buffer, after):
+                seq += 1
+                if window is not None:
+                    await window.wait(seq)
+                await self.send(event_frame(run_id, line))
+            await self.send({"type": "done", "run_id": run_id})
+        except ReplayGap as e:
+            await self.send_error("gone", str(e), run_id)
+        except WebSocketDisconnect:
+            # The receive loop notices the disconnect and stops the other runs
+            return
+        except Exception as e:
+            logger.error(f"Run {run_id} failed: {e}")
+            await self.send_error("run_failed", "Run failed", run_id)
+        finally:
+            if self.forwarders.get(run_id) is asyncio.current_task():
+                del self.forwarders[run_id]
+            if self.windows.get(run_id) is window:
+                self.windows.pop(run_id, None)
+
+    async def aclose(self) -> None:
+        """Stop forwarding; runs are cancelled if no client reattaches in time."""
+        forwarders = list(self.forwarders.values())
+        for forwarder in forwarders:
+            forwarder.cancel()
+        await asyncio.gather(*forwarders, return_exceptions=True)
+
+
+async def authenticate(websocket: WebSocket) -> Optional[dict[str, Any]]:
+    """
+    Verify the token from the Authorization header or the first message.
+
+    Closes the socket and returns None if authentication fails.
+    """
+    auth_header = websocket.headers.get("Authorization")
+    token = None
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+    try:
+        try:
+            return await verify_token_value(token)
+        except HTTPException:
+            if token is not None:
+                raise
+        message = socket_messages.validate_json(
+            await asyncio.wait_for(websocket.receive_text(), STREAM_SOCKET_AUTH_TIMEOUT)
+        )
+        if not isinstance(message, SocketAuth):
+            raise ValueError("Expected an auth message")
+        return await verify_token_value(message.token)
+    except WebSocketDisconnect:
+        return None
+    except (HTTPException, ValueError, asyncio.TimeoutError) as e:
+        logger.warning(f"Socket authentication failed: {e}")
+        await websocket.close(CLOSE_POLICY_VIOLATION, "Authentication failed")
+        return None
+
+
+@router.websocket("/ws/stream_events")
+async def stream_socket(websocket: WebSocket) -> None:
+    """Multiplex event streams over one authenticated WebSocket connection."""
+    await websocket.accept()
+    payload = await authenticate(websocket)
+    if payload is None:
+        return
+    socket = StreamSocket(websocket, payload)
+    logger.info(f"Stream socket opened for {socket.owner}")
+    try:
+        await socket.send({"type": "ready"})
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = socket_messages.validate_json(raw)
+            except ValidationError as e:
+                await socket.send_error("invalid_message", str(e))
+                continue
+            await socket.handle(message)
+    except WebSocketDisconnect:
+        logger.info(f"Stream socket closed for {socket.owner}")
+    finally:
+        await socket.aclose()
@@ -14,13 +14,17 @@
 
 import logging
 import os
+from typing import Any
 
 from traceloop.sdk import Instruments, Traceloop
 
+from opentelemetry import trace
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 
 logger = logging.getLogger("telemetry")
 
+tracer = trace.get_tracer("ai-foundry.streaming")
+
 # Configure endpoint for the OTLP exporter
 OTLP_ENDPOINT = os.getenv("OTLP_ENDPOINT", "localhost:4317")
 # Configure endpoint security
@@ -50,3 +54,19 @@ def setup_telemetry(service_name: str) -> None:
         logger.info("Traceloop telemetry initialized successfully.")
     except Exception as exc:
         logger.error("Failed to initialize Traceloop: %s", exc)
+
+
+def record_stream_abort(run_id: str, reason: str, **attributes: Any) -> None:
+    """
+    Record an event stream that ended before the chain finished.
+
+    Emits a ``stream_events.aborted`` span carrying the run id, the reason and
+    any extra attributes, e.g. how many events were sent before the abort.
+    """
+    logger.info(f"Event stream {run_id} aborted: {reason}")
+    with tracer.start_as_current_span("stream_events.aborted") as span:
+        span.set_attribute("run_id", run_id)
+        span.set_attribute("abort.reason", reason)
+        for key, value in attributes.items():
+            if value is not None:
+                span.set_attribute(key, value)
@@ -0,0 +1,26 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+
+import pytest
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list) -> None:
+    """Fail instead of skipping the database tests when CI has no database."""
+    if os.getenv("CI") and not os.getenv("PLAN_TEST_DATABASE_URL"):
+        raise pytest.UsageError(
+            "PLAN_TEST_DATABASE_URL must be set in CI so the integration tests run"
+        )
@@ -0,0 +1,89 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Chat listing ETag tests, run against the same throwaway database as the query
+plan tests (PLAN_TEST_DATABASE_URL) in a schema of their own.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.database.config import Base
+from backend.database.models import Chat, ChatListVersion, Message, ToolCall
+from backend.models.chat_schemas import MessageInput
+from backend.routes.chats import get_chats_etag, write_chat_impl
+
+PLAN_TEST_DATABASE_URL = os.getenv("PLAN_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not PLAN_TEST_DATABASE_URL, reason="PLAN_TEST_DATABASE_URL is not set"
+)
+
+SCHEMA = "etag_test"
+USER = "user@example.com"
+
+TABLES = [
+    Chat.__table__,
+    Message.__table__,
+    ToolCall.__table__,
+    ChatListVersion.__table__,
+]
+
+
+def message() -> MessageInput:
+    return MessageInput(id=str(uuid.uuid4()), type="human", content="hi")
+
+
+def test_listing_etag_changes_when_an_earlier_write_commits_last() -> None:
+    async def run() -> tuple[str, str]:
+        engine = create_async_engine(
+            PLAN_TEST_DATABASE_URL,
+            connect_args={"server_settings": {"search_path": SCHEMA}},
+        )
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        first, second = str(uuid.uuid4()), str(uuid.uuid4())
+        async with sessions() as db:
+            await write_chat_impl(first, db, USER, [message()])
+            await write_chat_impl(second, db, USER, [message()])
+
+        async with sessions() as early, sessions() as late:
+            # The early write's transaction, and so its now(), starts first
+            await early.execute(text("SELECT now()"))
+            await write_chat_impl(second, late, USER, [message()])
+            async with sessions() as db:
+                before = await get_chats_etag(db, USER)
+            await write_chat_impl(first, early, USER, [message()])
+        async with sessions() as db:
+            after = await get_chats_etag(db, USER)
+
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        await engine.dispose()
+        return before, after
+
+    before, after = asyncio.run(run())
+
+    assert before != after
@@ -0,0 +1,110 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Data migration tests, run against the same throwaway database as the query
+plan tests (PLAN_TEST_DATABASE_URL).
+"""
+
+import asyncio
+import importlib.util
+import os
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+PLAN_TEST_DATABASE_URL = os.getenv("PLAN_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not PLAN_TEST_DATABASE_URL, reason="PLAN_TEST_DATABASE_URL is not set"
+)
+
+VERSIONS = Path(__file__).parents[2] / "alembic" / "versions"
+
+CHAT = "00000000-0000-0000-0000-000000000001"
+
+# One turn per transaction, in list order. Ids descend so that id order is
+# the reverse of the order the messages were written in.
+TURNS = [
+    [
+        "ffffffff-0000-0000-0000-000000000000",
+        "eeeeeeee-0000-0000-0000-000000000000",
+    ],
+    [
+        "dddddddd-0000-0000-0000-000000000000",
+        "cccccccc-0000-0000-0000-000000000000",
+        "bbbbbbbb-0000-0000-0000-000000000000",
+        "aaaaaaaa-0000-0000-0000-000000000000",
+    ],
+]
+
+
+def load_migration(name: str) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(name, VERSIONS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_seq_backfill_keeps_turn_order_when_timestamps_tie() -> None:
+    migration = load_migration("5d2e8a1c7f49_chat_delta_sync")
+
+    async def run() -> list[str]:
+        engine = create_async_engine(PLAN_TEST_DATABASE_URL)
+        async with engine.connect() as conn:
+            await conn.execute(text("DROP SCHEMA IF EXISTS migration_test CASCADE"))
+            await conn.execute(text("CREATE SCHEMA migration_test"))
+            await conn.execute(text("SET search_path TO migration_test"))
+            await conn.execute(
+                text(
+                    'CREATE TABLE "Message" (id uuid PRIMARY KEY, "chatId" uuid, '
+                    '"createdAt" timestamptz DEFAULT now(), seq integer)'
+                )
+            )
+            await conn.commit()
+
+            # Each save inserts the new turn and rewrites the earlier messages,
+            # all in list order, within one transaction
+            saved: list[str] = []
+            for turn in TURNS:
+                for message_id in saved:
+                    await conn.execute(
+                        text('UPDATE "Message" SET seq = NULL WHERE id = :id'),
+                        {"id": message_id},
+                    )
+                for message_id in turn:
+                    await conn.execute(
+                        text(
+                            'INSERT INTO "Message" (id, "chatId") VALUES (:id, :chat)'
+                        ),
+                        {"id": message_id, "chat": CHAT},
+                    )
+                await conn.commit()
+                saved += turn
+
+            await conn.execute(text(migration.BACKFILL_SEQ))
+            result = await conn.execute(
+                text('SELECT id::text FROM "Message" ORDER BY seq')
+            )
+            ordered = list(result.scalars())
+            await conn.execute(text("DROP SCHEMA migration_test CASCADE"))
+            await conn.commit()
+        await engine.dispose()
+        return ordered
+
+    assert asyncio.run(run()) == [m for turn in TURNS for m in turn]
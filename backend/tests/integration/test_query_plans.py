@@ -0,0 +1,328 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Query plan regression tests for the chat persistence queries.
+
+Each scenario runs the real route implementation against a Postgres seeded
+with a few hundred thousand synthetic rows, captures the statements it sends,
+and fails if EXPLAIN shows a sequential scan of a chat table for any of them.
+The semantic cache lookup is checked to use its HNSW index the same way.
+
+Set PLAN_TEST_DATABASE_URL to a postgresql+asyncpg URL of a throwaway
+database to run them; the chat tables in it are dropped and recreated.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Iterator
+
+import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.database.config import Base
+from backend.database.models import Chat, ChatListVersion, Message, ToolCall
+from backend.models.chat_schemas import ChatsInput, MessageInput
+from backend.routes.chat_export import export_query, stream_export
+from backend.routes.chat_search import search_chats_impl
+from backend.routes.chats import (
+    delete_chat_impl,
+    get_chat_messages_impl,
+    get_chat_summaries_impl,
+    get_chats_etag,
+    save_chats_impl,
+    stream_chats_json,
+    write_chat_impl,
+)
+
+PLAN_TEST_DATABASE_URL = os.getenv("PLAN_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not PLAN_TEST_DATABASE_URL, reason="PLAN_TEST_DATABASE_URL is not set"
+)
+
+USERS = 200
+CHATS_PER_USER = 25
+MESSAGES_PER_CHAT = 40
+USER = "user-7@example.com"
+
+CHAT_TABLES = [
+    Chat.__table__,
+    Message.__table__,
+    ToolCall.__table__,
+    ChatListVersion.__table__,
+]
+CHAT_TABLE_NAMES = {table.name for table in CHAT_TABLES}
+
+SEED = [
+    """
+    INSERT INTO "Chat" (id, title, "userId", "updatedAt", version)
+    SELECT gen_random_uuid(), 'Chat ' || c, 'user-' || u || '@example.com',
+           now() - c * interval '1 minute', 1
+    FROM generate_series(1, :users) AS u, generate_series(1, :chats) AS c
+    """,
+    """
+    INSERT INTO "Message" (id, type, content, "chatId", seq, additional_kwargs)
+    SELECT gen_random_uuid(), CASE WHEN s % 2 = 0 THEN 'human' ELSE 'ai' END,
+           'message ' || s, c.id, s, '{}'::json
+    FROM "Chat" AS c, generate_series(0, :messages - 1) AS s
+    """,
+    """
+    INSERT INTO "ToolCall" (id, name, args, "messageId")
+    SELECT gen_random_uuid()::text, 'search', '{"query": "q"}'::json, m.id
+    FROM "Message" AS m WHERE m.seq % 5 = 1
+    """,
+    # A version row for every user, most of whom have no seeded chats
+    """
+    INSERT INTO "ChatListVersion" ("userId", version)
+    SELECT 'user-' || u || '@example.com', 1
+    FROM generate_series(1, :users * 100) AS u
+    """,
+    "ANALYZE",
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded_database() -> Iterator[None]:
+    async def create() -> None:
+        engine = create_async_engine(PLAN_TEST_DATABASE_URL)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=CHAT_TABLES)
+            await conn.run_sync(Base.metadata.create_all, tables=CHAT_TABLES)
+            params = {
+                "users": USERS,
+                "chats": CHATS_PER_USER,
+                "messages": MESSAGES_PER_CHAT,
+            }
+            for statement in SEED:
+                await conn.execute(text(statement), params)
+        await engine.dispose()
+
+    async def drop() -> None:
+        engine = create_async_engine(PLAN_TEST_DATABASE_URL)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=CHAT_TABLES)
+        await engine.dispose()
+
+    asyncio.run(create())
+    yield
+    asyncio.run(drop())
+
+
+def sequential_scans(plan: dict[str, Any]) -> list[str]:
+    """Chat tables read by Seq Scan nodes anywhere in ``plan``."""
+    scans = []
+    if plan["Node Type"] == "Seq Scan" and plan["Relation Name"] in CHAT_TABLE_NAMES:
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans += sequential_scans(child)
+    return scans
+
+
+async def explain(
+    scenario: Callable[[AsyncSession], Awaitable[Any]],
+) -> list[tuple[str, list[str]]]:
+    """Run ``scenario`` and return each statement it sent with its seq scans."""
+    engine = create_async_engine(PLAN_TEST_DATABASE_URL)
+    statements: list[tuple[str, Any]] = []
+
+    def record(
+        conn: Any, cursor: Any, statement: str, parameters: Any, *_: Any
+    ) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        await scenario(db)
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            plans.append((statement, sequential_scans(plan[0]["Plan"])))
+    await engine.dispose()
+    return plans
+
+
+async def some_chat(db: AsyncSession) -> str:
+    result = await db.execute(select(Chat.id).where(Chat.userId == USER).limit(1))
+    return result.scalar_one()
+
+
+async def summaries(db: AsyncSession) -> None:
+    page = await get_chat_summaries_impl(db, USER, limit=10)
+    await get_chat_summaries_impl(db, USER, limit=10, cursor=page.nextCursor)
+
+
+async def etag(db: AsyncSession) -> None:
+    await get_chats_etag(db, USER)
+
+
+async def latest_messages(db: AsyncSession) -> None:
+    chat_id = await some_chat(db)
+    page = await get_chat_messages_impl(chat_id, db, USER, limit=10, latest=True)
+    await get_chat_messages_impl(
+        chat_id, db, USER, limit=10, latest=True, before=page.nextCursor
+    )
+
+
+async def messages_since(db: AsyncSession) -> None:
+    await get_chat_messages_impl(await some_chat(db), db, USER, after=30)
+
+
+async def full_dump(db: AsyncSession) -> None:
+    async for _ in stream_chats_json(db, USER):
+        pass
+
+
+async def incremental_export(db: AsyncSession) -> None:
+    since = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    async for _ in stream_export(db, export_query(USER, since=since)):
+        pass
+
+
+async def search(db: AsyncSession) -> None:
+    # Every seeded message says "message", so search for a rarer term
+    page = await search_chats_impl(db, USER, "17", limit=10)
+    await search_chats_impl(db, USER, "17", limit=10, offset=page.nextOffset or 0)
+
+
+async def append(db: AsyncSession) -> None:
+    message = MessageInput(id=str(uuid.uuid4()), type="human", content="hi")
+    await write_chat_impl(await some_chat(db), db, USER, [message])
+
+
+async def bulk_save(db: AsyncSession) -> None:
+    chat_id = await some_chat(db)
+    chat = await get_chat_messages_impl(chat_id, db, USER)
+    messages = [message.model_dump() for message in chat.messages]
+    payload = {"chats": {chat_id: {"title": chat.title, "messages": messages}}}
+    await save_chats_impl(ChatsInput.model_validate(payload), db, USER)
+
+
+async def delete(db: AsyncSession) -> None:
+    await delete_chat_impl(await some_chat(db), db, USER)
+
+
+SCENARIOS = {
+    "summaries": summaries,
+    "etag": etag,
+    "latest_messages": latest_messages,
+    "messages_since": messages_since,
+    "full_dump": full_dump,
+    "incremental_export": incremental_export,
+    "search": search,
+    "append": append,
+    "bulk_save": bulk_save,
+    "delete": delete,
+}
+
+
+@pytest.mark.parametrize("name", list(SCENARIOS))
+def test_chat_queries_avoid_sequential_scans(name: str) -> None:
+    plans = asyncio.run(explain(SCENARIOS[name]))
+
+    offenders = [(statement, scans) for statement, scans in plans if scans]
+    assert plans
+    assert not offenders, f"Sequential scans in {name}: {offenders}"
+
+
+def test_semantic_cache_lookup_uses_hnsw_index() -> None:
+    from backend.common.semantic_cache import SemanticAnswerCache
+    from backend.database.models import SEMANTIC_CACHE_DIMENSIONS, SemanticCache
+
+    table = SemanticCache.__table__
+    seed = """
+        INSERT INTO "SemanticCache"
+            (id, chain, collection, "embeddingModel", question, embedding,
+             answer, "lastHitAt", "expiresAt")
+        SELECT gen_random_uuid(), 'basic_rag_qa', 'docs', 'model', 'q' || n,
+               v.embedding, 'a' || n, now() - n * interval '1 second',
+               now() + interval '1 day'
+        FROM generate_series(1, :rows) AS n,
+        -- Correlated with n so that every row gets its own vector
+        LATERAL (
+            SELECT array_agg(random())::vector AS embedding
+            FROM generate_series(1, :dims) WHERE n > 0
+        ) AS v
+    """
+
+    async def run() -> tuple[list[dict[str, Any]], list[str], int]:
+        engine = create_async_engine(PLAN_TEST_DATABASE_URL)
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            await conn.run_sync(Base.metadata.drop_all, tables=[table])
+            await conn.run_sync(Base.metadata.create_all, tables=[table])
+            await conn.execute(
+                text(seed), {"dims": SEMANTIC_CACHE_DIMENSIONS, "rows": 1000}
+            )
+            await conn.execute(text('ANALYZE "SemanticCache"'))
+
+        cache = SemanticAnswerCache(
+            embeddings=None,
+            chain="basic_rag_qa",
+            collection="docs",
+            model="model",
+            max_entries=500,
+            evict_interval=3600,
+            session_maker=lambda: async_sessionmaker(engine),
+        )
+        statements: list[tuple[str, Any]] = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, parameters, *_: statements.append(
+                (statement, parameters)
+            ),
+        )
+        vector = [0.5] * SEMANTIC_CACHE_DIMENSIONS
+        await cache.lookup(vector)
+        lookup_statement, lookup_parameters = statements[0]
+        statements.clear()
+        # Stores do not evict until evict_interval has passed
+        cache._evicted_at = time.monotonic()
+        await cache.store("q", vector, "a")
+        store_statements = [statement for statement, _ in statements]
+        await cache.evict()
+        size = await cache.size()
+
+        async with engine.connect() as conn:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {lookup_statement}", lookup_parameters
+            )
+            plan = result.scalar_one()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=[table])
+        await engine.dispose()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan, store_statements, size
+
+    plan, store_statements, size = asyncio.run(run())
+
+    assert "ix_SemanticCache_embedding" in json.dumps(plan)
+    assert not [s for s in store_statements if s.lstrip().startswith("DELETE")]
+    assert size == 500
@@ -12,81 +12,192 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
 import os
-from typing import Any
-from unittest.mock import MagicMock, patch
+from typing import Any, Callable
+from unittest.mock import patch
 
+import httpx
+import jwt
 import pytest
-import requests
+from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi import HTTPException
 
+from backend.common.jwks import JWKSKeyManager
+from backend.common.token_cache import VerifiedTokenCache
+
 
 @pytest.fixture(autouse=True)
 def clear_public_key_cache() -> None:
-    from backend.main import _public_key_cache
+    from backend.main import jwks_manager, token_cache
+
+    jwks_manager.clear()
+    token_cache.clear()
+
+
+def make_jwk(kid: str) -> dict[str, Any]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return jwk
+
+
+def make_manager(
+    handler: Callable[[httpx.Request], httpx.Response], **kwargs: Any
+) -> JWKSKeyManager:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return JWKSKeyManager("http://test-auth:8080/certs", client=client, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_get_key_success() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"keys": [make_jwk("key-1")]})
 
-    _public_key_cache.update({"key": None, "timestamp": 0.0})
+    manager = make_manager(handler)
 
+    key = await manager.get_key("key-1")
+    assert key is not None
+    # Second lookup is served from the cache
+    assert await manager.get_key("key-1") is key
+    assert len(calls) == 1
 
-@patch("requests.get")
-def test_get_public_key_success(mock_get: Any) -> None:
-    from backend.main import get_public_key
 
-    mock_response = MagicMock()
-    mock_response.json.return_value = {"public_key": "test_key"}
-    mock_get.return_value = mock_response
-    mock_response.raise_for_status.return_value = None
+@pytest.mark.asyncio
+async def test_get_key_multiple_kids() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={
+                "keys": [
+                    make_jwk("key-1"),
+                    make_jwk("key-2"),
+                    {"kid": "enc-1", "use": "enc", "kty": "RSA", "alg": "RSA-OAEP"},
+                ]
+            },
+        )
+
+    manager = make_manager(handler)
+
+    assert await manager.get_key("key-1") is not await manager.get_key("key-2")
+    with pytest.raises(jwt.InvalidTokenError):
+        await manager.get_key("enc-1")
+
 
-    result = get_public_key()
-    assert "test_key" in result
-    mock_get.assert_called_once()
-    mock_response.raise_for_status.assert_called_once()
+@pytest.mark.asyncio
+async def test_get_key_concurrent_misses_single_fetch() -> None:
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"keys": [make_jwk("key-1")]})
+
+    manager = make_manager(handler)
 
+    keys = await asyncio.gather(*[manager.get_key("key-1") for _ in range(20)])
+    assert len(calls) == 1
+    assert all(key is keys[0] for key in keys)
 
-@patch("requests.get")
-def test_get_public_key_failure(mock_get: Any) -> None:
-    from backend.main import _public_key_cache, get_public_key
 
-    # Ensure cache is empty
-    _public_key_cache.update({"key": None, "timestamp": 0.0})
+@pytest.mark.asyncio
+async def test_get_key_rotation_refetches_unknown_kid() -> None:
+    jwks = {"keys": [make_jwk("key-1")]}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=jwks)
 
-    mock_response = MagicMock()
+    manager = make_manager(handler, min_refresh_interval=0)
+    await manager.get_key("key-1")
 
-    def raise_error() -> None:
-        raise requests.exceptions.RequestException("Connection error")
+    jwks = {"keys": [make_jwk("key-1"), make_jwk("key-2")]}
+    assert await manager.get_key("key-2") is not None
 
-    mock_response.raise_for_status.side_effect = raise_error
-    mock_get.return_value = mock_response
 
+@pytest.mark.asyncio
+async def test_get_key_unknown_kid_rate_limited() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"keys": [make_jwk("key-1")]})
+
+    manager = make_manager(handler)
+    await manager.get_key("key-1")
+
+    for _ in range(5):
+        with pytest.raises(jwt.InvalidTokenError):
+            await manager.get_key("unknown")
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_key_serves_stale_on_failure() -> None:
+    fail = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": [make_jwk("key-1")]})
+
+    manager = make_manager(handler, ttl=0, refresh_ahead=0, min_refresh_interval=0)
+    key = await manager.get_key("key-1")
+
+    fail = True
+    assert await manager.get_key("key-1") is key
+    await asyncio.sleep(0)
+    assert await manager.get_key("key-1") is key
+
+
+@pytest.mark.asyncio
+async def test_get_key_stops_serving_keys_past_max_stale() -> None:
+    fail = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if fail:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": [make_jwk("key-1")]})
+
+    manager = make_manager(handler, max_stale=0)
+    await manager.get_key("key-1")
+
+    fail = True
     with pytest.raises(HTTPException) as exc_info:
-        get_public_key()
+        await manager.get_key("key-1")
 
     assert exc_info.value.status_code == 500
-    assert "Failed to fetch public key" in str(exc_info.value.detail)
-    mock_get.assert_called_once()
 
 
-@patch("requests.get")
-def test_get_public_key_json_failure(mock_get: Any) -> None:
-    from backend.main import _public_key_cache, get_public_key
+@pytest.mark.asyncio
+async def test_get_key_failure() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    manager = make_manager(handler)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await manager.get_key("key-1")
+
+    assert exc_info.value.status_code == 500
+    assert "Failed to fetch public key" in str(exc_info.value.detail)
+
 
-    # Ensure cache is empty
-    _public_key_cache.update({"key": None, "timestamp": 0.0})
+@pytest.mark.asyncio
+async def test_get_key_json_failure() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b"not json")
 
-    mock_response = MagicMock()
-    mock_response.raise_for_status.return_value = None
-    mock_response.json.side_effect = requests.exceptions.JSONDecodeError(
-        "Invalid JSON", "", 0
-    )
-    mock_get.return_value = mock_response
+    manager = make_manager(handler)
 
     with pytest.raises(HTTPException) as exc_info:
-        get_public_key()
+        await manager.get_key("key-1")
 
     assert exc_info.value.status_code == 500
     assert "Failed to fetch public key" in str(exc_info.value.detail)
-    mock_get.assert_called_once()
-    mock_response.json.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -95,7 +206,10 @@ async def test_verify_token_expired(mock_jwt_token: str) -> None:
 
     from backend.main import verify_token
 
-    with patch("jwt.decode") as mock_decode:
+    with (
+        patch("jwt.decode") as mock_decode,
+        patch("backend.main.get_public_key", return_value="mock_public_key"),
+    ):
         mock_decode.side_effect = jwt.ExpiredSignatureError
 
         with pytest.raises(HTTPException) as exc_info:
@@ -116,17 +230,7 @@ async def test_verify_token_invalid_signature(mock_jwt_token: str) -> None:
         patch("jwt.decode") as mock_decode,
         patch("backend.main.get_public_key", return_value="mock_public_key"),
     ):
-        # Mock first decode (unverified) to return valid claims
-        mock_decode.side_effect = [
-            {
-                "aud": "account",
-                "azp": "ai-foundry-chat-app",
-                "iss": f"{os.getenv('KEYCLOAK_URL')}/realms/{os.getenv('KEYCLOAK_REALM')}",
-                "sub": "test_user",
-            },
-            # Second decode raises InvalidSignatureError
-            jwt.InvalidSignatureError("Invalid signature"),
-        ]
+        mock_decode.side_effect = jwt.InvalidSignatureError("Invalid signature")
 
         with pytest.raises(HTTPException) as exc_info:
             await verify_token(mock_jwt_token)
@@ -168,3 +272,63 @@ async def test_verify_token_invalid_claims() -> None:
         await verify_token(invalid_token)
 
     assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_verify_token_cached(
+    mock_jwt_token: str, mock_key_pair: tuple[bytes, bytes]
+) -> None:
+    from backend.main import token_cache, verify_token
+
+    _, public_key = mock_key_pair
+
+    with patch("backend.main.get_public_key", return_value=public_key.decode()):
+        payload = await verify_token(mock_jwt_token)
+
+    with patch("jwt.decode") as mock_decode:
+        assert await verify_token(mock_jwt_token) == payload
+        mock_decode.assert_not_called()
+
+    assert token_cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+@pytest.mark.asyncio
+async def test_verify_token_failure_not_cached(mock_jwt_token: str) -> None:
+    from backend.main import token_cache, verify_token
+
+    with (
+        patch("jwt.decode") as mock_decode,
+        patch("backend.main.get_public_key", return_value="mock_public_key"),
+    ):
+        mock_decode.side_effect = jwt.InvalidSignatureError("Invalid signature")
+
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await verify_token(mock_jwt_token)
+
+        assert mock_decode.call_count == 2
+    assert len(token_cache) == 0
+
+
+def test_token_cache_expires_with_token() -> None:
+    cache = VerifiedTokenCache(max_size=10, ttl=300)
+
+    cache.put("expired", {"sub": "a", "exp": 1})
+    cache.put("valid", {"sub": "b", "exp": 9999999999})
+
+    assert cache.get("expired") is None
+    assert cache.get("valid") == {"sub": "b", "exp": 9999999999}
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_token_cache_evicts_least_recently_used() -> None:
+    cache = VerifiedTokenCache(max_size=2, ttl=300)
+
+    cache.put("a", {"sub": "a"})
+    cache.put("b", {"sub": "b"})
+    cache.get("a")
+    cache.put("c", {"sub": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"sub": "a"}
+    assert cache.get("c") == {"sub": "c"}
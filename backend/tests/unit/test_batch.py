@@ -0,0 +1,248 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+
+@pytest.fixture
+def test_client() -> TestClient:
+    from backend.main import app
+
+    return TestClient(app)
+
+
+class FakeChain:
+    """Answers with the question reversed after the requested delay."""
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+
+    async def ainvoke(self, input_data: dict[str, Any], config: Any = None) -> Any:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            question = input_data["messages"][-1]["content"]
+            if question == "fail":
+                raise ValueError("bad question")
+            await asyncio.sleep(float(question.split()[0]))
+            answer = AIMessage(content=question[::-1])
+            return {"messages": [*input_data["messages"], answer]}
+        finally:
+            self.running -= 1
+
+
+def conversation(question: str) -> dict[str, Any]:
+    return {"input_data": {"messages": [{"type": "human", "content": question}]}}
+
+
+@pytest.mark.asyncio
+async def test_run_batch_streams_results_as_items_finish() -> None:
+    from backend.common.batch import run_batch
+
+    chain = FakeChain()
+    items = [
+        conversation(question)["input_data"]
+        for question in ["0.05 slow", "0 fast", "fail", "0.5 stuck", "0.01 quick"]
+    ]
+
+    results = [
+        result
+        async for result in run_batch(chain, items, max_concurrency=2, timeout=0.2)
+    ]
+
+    assert chain.max_running == 2
+    assert sorted(result["index"] for result in results) == [0, 1, 2, 3, 4]
+    # The first item is still running when the second finishes
+    assert results[0]["index"] == 1
+    by_index = {result["index"]: result for result in results}
+    assert by_index[0]["status"] == "ok"
+    assert by_index[0]["output"]["answer"] == "wols 50.0"
+    assert [m.type for m in by_index[0]["output"]["messages"]] == ["ai"]
+    assert by_index[0]["elapsed_ms"] >= 50
+    assert by_index[2] == {
+        "index": 2,
+        "status": "error",
+        "error": "ValueError: bad question",
+        "elapsed_ms": by_index[2]["elapsed_ms"],
+    }
+    assert by_index[3]["error"] == "Timed out after 0.2 s"
+    assert by_index[4]["status"] == "ok"
+
+
+def test_invoke_batch(
+    test_client: TestClient, mock_token_verification: Any, mock_jwt_token: str
+) -> None:
+    chain = FakeChain()
+
+    async def get_chain_module(name: str) -> Any:
+        return SimpleNamespace(chain=chain)
+
+    with (
+        patch("backend.routes.events.get_chain_module", get_chain_module),
+        patch("backend.routes.batch.get_chain_module", get_chain_module),
+        patch("backend.routes.events.HOSTED_CHAINS", ["basic_rag_qa"]),
+    ):
+        response = test_client.post(
+            "/invoke_batch",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            json={
+                "items": [conversation("0 one"), conversation("fail")],
+                "chain": "basic_rag_qa",
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.headers["x-chain"] == "basic_rag_qa"
+    results = {
+        result["index"]: result
+        for result in map(json.loads, response.iter_lines())
+        if result
+    }
+    assert results[0]["output"]["answer"] == "eno 0"
+    assert results[0]["output"]["messages"][0]["type"] == "ai"
+    assert results[1]["status"] == "error"
+
+
+def test_batch_job_runs_jsonl_in_background(
+    mock_token_verification: Any, mock_jwt_token: str
+) -> None:
+    from backend.main import app
+
+    chain = FakeChain()
+
+    async def get_chain_module(name: str) -> Any:
+        return SimpleNamespace(chain=chain)
+
+    headers = {"Authorization": f"Bearer {mock_jwt_token}"}
+    body = b"".join(
+        json.dumps(item).encode() + b"\n"
+        for item in [conversation("0.01 a"), conversation("0 b")]
+    )
+    with (
+        patch("backend.routes.events.get_chain_module", get_chain_module),
+        patch("backend.routes.batch.get_chain_module", get_chain_module),
+        TestClient(app) as client,
+    ):
+        created = client.post(
+            "/batch_jobs", headers=headers, content=body + b"not json\n"
+        )
+        assert created.status_code == 202
+        job_id = created.json()["job_id"]
+
+        deadline = time.monotonic() + 5
+        job = created.json()
+        while job["status"] == "running" and time.monotonic() < deadline:
+            time.sleep(0.01)
+            job = client.get(f"/batch_jobs/{job_id}", headers=headers).json()
+
+        results = client.get(f"/batch_jobs/{job_id}/results", headers=headers)
+        deleted = client.delete(f"/batch_jobs/{job_id}", headers=headers)
+        missing = client.get(f"/batch_jobs/{job_id}", headers=headers)
+
+    assert job["status"] == "succeeded"
+    assert (job["completed"], job["failed"]) == (3, 1)
+    lines = [json.loads(line) for line in results.iter_lines() if line]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert lines[0]["index"] == 2
+    assert lines[0]["error"].startswith("Invalid input on line 3")
+    assert deleted.status_code == 200
+    assert missing.status_code == 404
+
+
+def test_invoke_batch_takes_admission_slots(
+    test_client: TestClient, mock_token_verification: Any, mock_jwt_token: str
+) -> None:
+    from backend.common.admission import AdmissionController
+
+    chain = FakeChain()
+    admission = AdmissionController(max_in_flight=3, max_per_user=2, max_queue=0)
+
+    async def get_chain_module(name: str) -> Any:
+        return SimpleNamespace(chain=chain)
+
+    headers = {"Authorization": f"Bearer {mock_jwt_token}"}
+    items = [conversation("0.01 a"), conversation("0.01 b"), conversation("0 c")]
+    with (
+        patch("backend.routes.events.get_chain_module", get_chain_module),
+        patch("backend.routes.batch.get_chain_module", get_chain_module),
+        patch("backend.routes.events.admission", admission),
+    ):
+        response = test_client.post(
+            "/invoke_batch", headers=headers, json={"items": items}
+        )
+        assert admission.stats()["in_flight"] == 0
+
+        admission.in_flight = admission.max_in_flight
+        rejected = test_client.post(
+            "/invoke_batch", headers=headers, json={"items": items}
+        )
+
+    assert response.status_code == 200
+    assert len([line for line in response.iter_lines() if line]) == 3
+    # Concurrency is capped by the user's share of admission slots
+    assert chain.max_running == 2
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == str(int(admission.retry_after))
+
+
+@pytest.mark.asyncio
+async def test_spool_rejects_oversized_body(tmp_path: Any) -> None:
+    from backend.common.batch import BatchInputTooLarge, BatchJobRegistry
+
+    async def chunks() -> Any:
+        for _ in range(4):
+            yield b"x" * 10
+
+    with patch("backend.common.batch.BATCH_JOB_DIR", str(tmp_path)):
+        path = await BatchJobRegistry().spool(chunks(), max_bytes=40)
+        with pytest.raises(BatchInputTooLarge):
+            await BatchJobRegistry().spool(chunks(), max_bytes=39)
+
+    assert [p.name for p in tmp_path.iterdir()] == [path.rsplit("/", 1)[1]]
+
+
+def test_batch_job_rejects_oversized_body(
+    test_client: TestClient, mock_token_verification: Any, mock_jwt_token: str
+) -> None:
+    from backend.routes import events
+
+    chain = FakeChain()
+
+    async def get_chain_module(name: str) -> Any:
+        return SimpleNamespace(chain=chain)
+
+    with (
+        patch("backend.routes.events.get_chain_module", get_chain_module),
+        patch("backend.routes.batch.get_chain_module", get_chain_module),
+        patch("backend.routes.batch.BATCH_JOB_MAX_BYTES", 8),
+    ):
+        response = test_client.post(
+            "/batch_jobs",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            content=json.dumps(conversation("0 a")).encode(),
+        )
+
+    assert response.status_code == 413
+    assert events.admission.stats()["in_flight"] == 0
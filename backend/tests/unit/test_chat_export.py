@@ -0,0 +1,150 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import gzip
+import json
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from backend.database.config import get_db
+from backend.routes.chat_export import export_query, stream_export
+
+ROWS = [
+    ('{"id" : "chat-1", "messages" : []}',),
+    ('{"id" : "chat-2", "messages" : [{"id" : "m", "seq" : 0}]}',),
+]
+
+
+class StreamingSession:
+    """AsyncSession stand-in whose stream() yields fixed rows."""
+
+    def __init__(self, rows: list[tuple[str]]) -> None:
+        self.rows = rows
+        self.statements: list[Any] = []
+        self.high_water = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    async def scalar(self, statement: Any) -> datetime:
+        return self.high_water
+
+    async def stream(self, statement: Any) -> Any:
+        self.statements.append(statement)
+
+        async def rows() -> Any:
+            for row in self.rows:
+                yield row
+
+        return rows()
+
+
+def export(session: StreamingSession, compress: bool) -> bytes:
+    async def collect() -> bytes:
+        chunks = stream_export(session, export_query("user"), compress=compress)
+        return b"".join([chunk async for chunk in chunks])
+
+    return asyncio.run(collect())
+
+
+def test_export_streams_one_chat_per_line() -> None:
+    session = StreamingSession(ROWS)
+
+    lines = export(session, compress=False).splitlines()
+
+    assert [json.loads(line)["id"] for line in lines] == ["chat-1", "chat-2"]
+    assert session.statements[0].get_execution_options()["yield_per"] > 0
+
+
+def test_export_gzip_round_trips() -> None:
+    body = export(StreamingSession(ROWS), compress=True)
+
+    assert gzip.decompress(body) == export(StreamingSession(ROWS), compress=False)
+
+
+def test_export_filters_on_updated_at_window() -> None:
+    since = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    until = datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+    sql = str(export_query(None, since, until).compile(dialect=postgresql.dialect()))
+
+    assert '"Chat"."updatedAt" >= ' in sql
+    assert '"Chat"."updatedAt" < ' in sql
+    assert '"Chat"."userId" =' not in sql
+    assert sql.endswith('ORDER BY "Chat"."updatedAt", "Chat".id')
+
+
+def test_export_of_all_users_requires_admin() -> None:
+    from backend.main import app
+
+    async def no_db() -> Any:
+        yield StreamingSession([])
+
+    app.dependency_overrides[get_db] = no_db
+    try:
+        with patch("backend.routes.chats._verify_token_dep", None):
+            response = TestClient(app).get("/chats/export?all_users=true")
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert response.status_code == 403
+
+
+def test_export_stops_at_high_water_mark() -> None:
+    from backend.main import app
+
+    session = StreamingSession(ROWS)
+
+    async def db() -> Any:
+        yield session
+
+    app.dependency_overrides[get_db] = db
+    try:
+        with patch("backend.routes.chats._verify_token_dep", None):
+            response = TestClient(app).get("/chats/export?until=2030-01-01T00:00:00")
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert response.status_code == 200
+    assert response.headers["X-Export-Until"] == "2026-03-01T00:00:00+00:00"
+    params = session.statements[0].compile().params
+    assert session.high_water in params.values()
+
+
+def test_export_takes_naive_since_as_utc() -> None:
+    from backend.main import app
+
+    session = StreamingSession(ROWS)
+
+    async def db() -> Any:
+        yield session
+
+    app.dependency_overrides[get_db] = db
+    try:
+        with patch("backend.routes.chats._verify_token_dep", None):
+            response = TestClient(app).get("/chats/export?since=2026-02-01T12:00:00")
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert response.status_code == 200
+    params = session.statements[0].compile().params
+    assert datetime(2026, 2, 1, 12, tzinfo=timezone.utc) in params.values()
+    assert all(
+        value.tzinfo is not None
+        for value in params.values()
+        if isinstance(value, datetime)
+    )
@@ -0,0 +1,104 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from backend.database.config import get_db
+from backend.routes.chat_search import search_chats_impl, search_query
+
+
+class Result:
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+
+    def all(self) -> list[tuple]:
+        return self.rows
+
+
+class SearchSession:
+    """AsyncSession stand-in whose execute() returns fixed search rows."""
+
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+        self.statements: list[Any] = []
+
+    async def execute(self, statement: Any) -> Result:
+        self.statements.append(statement)
+        return Result(self.rows)
+
+
+def row(n: int) -> tuple:
+    return ("chat-1", "Invoices", f"msg-{n}", n, "human", "<mark>invoice</mark>", 0.5)
+
+
+def test_search_query_is_scoped_to_user_and_uses_index() -> None:
+    sql = str(
+        search_query("user", "invoice total", 21, 40).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    assert '"Chat"."userId" = \'user\'' in sql
+    assert "\"Message\".content_tsv @@ websearch_to_tsquery('english'" in sql
+    assert "ts_rank_cd" in sql
+    assert "LIMIT 21 OFFSET 40" in sql
+    # Snippets are computed outside the paged subquery, for returned rows only
+    assert sql.index("ts_headline") < sql.index("FROM (SELECT")
+
+
+def test_search_returns_next_offset_when_more_rows() -> None:
+    session = SearchSession([row(n) for n in range(3)])
+
+    response = asyncio.run(search_chats_impl(session, "user", "invoice", limit=2))
+
+    assert [r.messageId for r in response.results] == ["msg-0", "msg-1"]
+    assert response.results[0].snippet == "<mark>invoice</mark>"
+    assert response.nextOffset == 2
+
+
+def test_search_last_page_has_no_next_offset() -> None:
+    session = SearchSession([row(0)])
+
+    response = asyncio.run(
+        search_chats_impl(session, "user", "invoice", limit=2, offset=4)
+    )
+
+    assert len(response.results) == 1
+    assert response.nextOffset is None
+
+
+def test_search_route_requires_query() -> None:
+    from backend.main import app
+
+    async def no_db() -> Any:
+        yield SearchSession([])
+
+    app.dependency_overrides[get_db] = no_db
+    try:
+        with patch("backend.routes.chats._verify_token_dep", None):
+            client = TestClient(app)
+            missing = client.get("/chats/search?q=")
+            found = client.get("/chats/search?q=invoice")
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert missing.status_code == 422
+    assert found.status_code == 200
+    assert found.json() == {"results": [], "nextOffset": None}
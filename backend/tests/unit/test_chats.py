@@ -0,0 +1,391 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Optional
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from backend.database.config import get_db
+from backend.database.models import Message, ToolCall
+from backend.models.chat_schemas import ChatsInput, MessageInput
+from backend.routes.chats import (
+    decode_chats_cursor,
+    encode_chats_cursor,
+    get_chat_messages_impl,
+    get_chat_summaries_impl,
+    save_chats_impl,
+    stream_chats_json,
+    write_chat_impl,
+)
+
+
+class RecordingSession:
+    """AsyncSession stand-in that records every statement it executes."""
+
+    def __init__(self, foreign: Optional[str] = None) -> None:
+        self.statements: list[str] = []
+        self.foreign = foreign
+        self.commit = AsyncMock()
+        self.rollback = AsyncMock()
+
+    async def execute(self, statement: Any) -> Any:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        result = MagicMock()
+        result.first.return_value = (self.foreign,) if self.foreign else None
+        result.scalars.return_value = []
+        return result
+
+
+class ScriptedSession:
+    """AsyncSession stand-in that answers statements from a script."""
+
+    def __init__(self, *results: Any) -> None:
+        self.results = list(results)
+        self.statements: list[Any] = []
+        self.commit = AsyncMock()
+        self.rollback = AsyncMock()
+
+    async def execute(self, statement: Any) -> Any:
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+
+class Scalars(list):
+    def all(self) -> list[Any]:
+        return list(self)
+
+
+def result(
+    first: Any = None,
+    row: Any = None,
+    rows: Any = (),
+    scalar: Any = None,
+    scalars: Any = (),
+) -> MagicMock:
+    mock = MagicMock()
+    mock.first.return_value = first
+    mock.one_or_none.return_value = row
+    mock.all.return_value = list(rows)
+    mock.scalar_one.return_value = scalar
+    mock.scalar_one_or_none.return_value = scalar
+    mock.scalars.return_value = Scalars(scalars)
+    return mock
+
+
+def message(message_id: str) -> MessageInput:
+    return MessageInput(id=message_id, type="human", content="question")
+
+
+def chats_payload(chats: int, messages: int) -> ChatsInput:
+    return ChatsInput.model_validate(
+        {
+            "chats": {
+                f"chat-{c}": {
+                    "title": f"Chat {c}",
+                    "messages": [
+                        {
+                            "id": f"msg-{c}-{m}",
+                            "type": "ai",
+                            "content": "answer",
+                            "tool_calls": [
+                                {"id": f"call-{c}-{m}", "name": "search", "args": {}}
+                            ],
+                        }
+                        for m in range(messages)
+                    ],
+                }
+                for c in range(chats)
+            }
+        }
+    )
+
+
+def test_save_chats_round_trips_do_not_grow_with_payload() -> None:
+    small = RecordingSession()
+    large = RecordingSession()
+
+    asyncio.run(save_chats_impl(chats_payload(1, 1), small, "user"))
+    asyncio.run(save_chats_impl(chats_payload(50, 10), large, "user"))
+
+    # Ownership check plus one upsert per table
+    assert len(small.statements) == len(large.statements) == 4
+    large.commit.assert_awaited_once()
+    upserts = large.statements[1:]
+    assert all("ON CONFLICT" in statement for statement in upserts)
+    assert all("IS DISTINCT FROM" in statement for statement in upserts)
+    # JSONB columns compare directly, without casting every row
+    assert all("CAST(" not in statement for statement in upserts)
+
+
+def test_save_chats_refuses_another_users_chat() -> None:
+    session = RecordingSession(foreign="chat-0")
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(save_chats_impl(chats_payload(2, 1), session, "user"))
+
+    assert exc_info.value.status_code == 403
+    assert len(session.statements) == 1
+    session.commit.assert_not_awaited()
+
+
+def test_append_numbers_new_messages_after_the_last_one() -> None:
+    session = ScriptedSession(
+        result(first=None),  # chat already exists
+        result(row=("user", "Chat", 3, 4)),
+        result(rows=[("msg-old", "chat", 2)]),
+        result(scalars=["chat"]),
+        result(scalar=4),
+        result(),  # chat listing version
+    )
+
+    response = asyncio.run(
+        write_chat_impl(
+            "chat", session, "user", [message("msg-old"), message("msg-new")]
+        )
+    )
+
+    params = session.statements[3].compile(dialect=postgresql.dialect()).params
+    assert (params["seq_m0"], params["seq_m1"]) == (2, 5)
+    assert (response.version, response.lastSeq) == (4, 5)
+    assert session.statements[-1].table.name == "ChatListVersion"
+    session.commit.assert_awaited_once()
+
+
+def test_append_of_unchanged_messages_keeps_the_version() -> None:
+    session = ScriptedSession(
+        result(first=None),
+        result(row=("user", "Chat", 3, 0)),
+        result(rows=[("msg-0", "chat", 0)]),
+        result(scalars=[]),
+    )
+
+    response = asyncio.run(
+        write_chat_impl("chat", session, "user", [message("msg-0")], if_match='"3"')
+    )
+
+    assert (response.version, response.lastSeq) == (3, 0)
+    assert len(session.statements) == 4
+
+
+def test_write_refuses_stale_version() -> None:
+    session = ScriptedSession(result(first=None), result(row=("user", "Chat", 3, 0)))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            write_chat_impl("chat", session, "user", [message("m")], if_match='"2"')
+        )
+
+    assert exc_info.value.status_code == 412
+    assert exc_info.value.headers == {"ETag": '"3"'}
+    session.rollback.assert_awaited_once()
+
+
+def test_retried_write_replays_stored_response() -> None:
+    stored = {"id": "chat", "version": 2, "lastSeq": 1}
+    session = ScriptedSession(result(), result(first=None), result(scalar=stored))
+
+    response = asyncio.run(
+        write_chat_impl(
+            "chat", session, "user", [message("m")], idempotency_key="retry"
+        )
+    )
+
+    assert response.model_dump() == stored
+    session.commit.assert_not_awaited()
+    claim = session.statements[1].compile().params
+    assert claim["endpoint"] == "POST /chats/chat/messages"
+
+
+def test_get_messages_answers_304_for_current_version() -> None:
+    chat = MagicMock(userId="user", title="Chat", version=7)
+    session = ScriptedSession(result(row=chat))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            get_chat_messages_impl("chat", session, "user", if_none_match='W/"7"')
+        )
+
+    assert exc_info.value.status_code == 304
+    assert len(session.statements) == 1
+
+
+def test_chat_summaries_page_on_updated_at_and_id() -> None:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        SimpleNamespace(
+            id=f"00000000-0000-0000-0000-00000000000{n}",
+            title=f"Chat {n}",
+            updatedAt=now - timedelta(minutes=n),
+            version=1,
+            messageCount=2,
+        )
+        for n in range(3)
+    ]
+    session = ScriptedSession(result(rows=rows))
+
+    response = asyncio.run(
+        get_chat_summaries_impl(
+            session, "user", limit=2, cursor=encode_chats_cursor(now, rows[2].id)
+        )
+    )
+
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert '("Chat"."updatedAt", "Chat".id) < (' in sql
+    assert [chat.id for chat in response.chats] == [rows[0].id, rows[1].id]
+    assert response.chats[0].messageCount == 2
+    assert decode_chats_cursor(response.nextCursor or "") == (
+        rows[1].updatedAt,
+        rows[1].id,
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["%%", encode_chats_cursor(datetime(2026, 1, 1, tzinfo=timezone.utc), "chat-x")],
+)
+def test_chat_summaries_reject_malformed_cursor(cursor: str) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_chat_summaries_impl(ScriptedSession(), "user", cursor=cursor))
+
+    assert exc_info.value.status_code == 400
+
+
+def test_latest_messages_page_backwards() -> None:
+    chat = MagicMock(userId="user", title="Chat", version=7)
+    newest_first = [
+        SimpleNamespace(
+            id=f"msg-{seq}",
+            type="ai",
+            content="",
+            name=None,
+            tool_call_id=None,
+            additional_kwargs=None,
+            tool_calls=[],
+            seq=seq,
+        )
+        for seq in (9, 8, 7)
+    ]
+    session = ScriptedSession(result(row=chat), result(scalars=newest_first))
+
+    response = asyncio.run(
+        get_chat_messages_impl("chat", session, "user", limit=2, latest=True)
+    )
+
+    assert [msg.seq for msg in response.messages] == [8, 9]
+    assert (response.nextCursor, response.lastSeq) == (8, 9)
+
+
+def get_chats_with(session: ScriptedSession, **headers: str) -> Any:
+    from backend.main import app
+
+    async def scripted_db() -> Any:
+        yield session
+
+    app.dependency_overrides[get_db] = scripted_db
+    try:
+        with patch("backend.routes.chats._verify_token_dep", None):
+            return TestClient(app).get("/chats", headers=headers)
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+
+def test_unchanged_chat_listing_answers_304() -> None:
+    session = ScriptedSession(result(scalar=3))
+
+    response = get_chats_with(session, **{"If-None-Match": '"chats-3"'})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"chats-3"'
+    assert len(session.statements) == 1
+
+
+def test_chat_listing_carries_etag() -> None:
+    # Users who never wrote a chat have no version row
+    session = ScriptedSession(result(scalar=None), result(rows=[]))
+
+    response = get_chats_with(session)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"chats-0"'
+    assert response.json() == {"chats": [], "nextCursor": None}
+
+
+class StreamingSession:
+    """AsyncSession stand-in whose stream() yields fixed rows."""
+
+    def __init__(self, rows: list[tuple[str, str]]) -> None:
+        self.rows = rows
+        self.statements: list[Any] = []
+
+    async def stream(self, statement: Any) -> Any:
+        self.statements.append(statement)
+
+        async def rows() -> Any:
+            for row in self.rows:
+                yield row
+
+        return rows()
+
+
+def test_full_dump_streams_json_built_by_postgres() -> None:
+    session = StreamingSession(
+        [
+            ("chat-1", '{"title" : "One", "messages" : []}'),
+            ("chat-2", '{"title" : "Two", "messages" : [{"id" : "m", "seq" : 0}]}'),
+        ]
+    )
+
+    async def collect() -> bytes:
+        return b"".join([chunk async for chunk in stream_chats_json(session, "u")])
+
+    body = json.loads(asyncio.run(collect()))
+
+    assert list(body["chats"]) == ["chat-1", "chat-2"]
+    assert body["chats"]["chat-2"]["messages"] == [{"id": "m", "seq": 0}]
+    statement = session.statements[0]
+    assert statement.get_execution_options()["yield_per"] > 0
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "json_agg(json_build_object('id', \"Message\".id" in sql
+    assert 'ORDER BY "Message".seq' in sql
+
+
+def test_full_dump_of_no_chats_is_valid_json() -> None:
+    async def collect() -> bytes:
+        chunks = stream_chats_json(StreamingSession([]), "u")
+        return b"".join([chunk async for chunk in chunks])
+
+    assert json.loads(asyncio.run(collect())) == {"chats": {}}
+
+
+def test_json_columns_have_gin_indexes() -> None:
+    ddl = [
+        str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        for table in (Message.__table__, ToolCall.__table__)
+        for index in table.indexes
+    ]
+
+    assert isinstance(Message.__table__.c.additional_kwargs.type, postgresql.JSONB)
+    assert isinstance(ToolCall.__table__.c.args.type, postgresql.JSONB)
+    assert any("USING gin (additional_kwargs jsonb_path_ops)" in d for d in ddl)
+    assert any("USING gin (args jsonb_path_ops)" in d for d in ddl)
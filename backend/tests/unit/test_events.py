@@ -248,3 +248,1032 @@ async def test_stream_events_malformed_data(
         assert len(events) == 2
         assert events[0]["event"] == "metadata"
         assert events[1]["event"] == "end"
+
+
+@pytest.mark.asyncio
+async def test_stream_events_framing_negotiation(
+    test_client: TestClient,
+    mock_token_verification: Any,
+    valid_conversation_input: ConversationInputWrapper,
+    mock_jwt_token: str,
+) -> None:
+    with patch(
+        "backend.routes.events.stream_conversation_events",
+        side_effect=lambda *args, **kwargs: mock_success_stream(),
+    ) as mock_stream:
+        response = test_client.post(
+            "/stream_events",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            json=valid_conversation_input.model_dump(),
+        )
+        assert response.headers["x-stream-framing"] == "lines"
+        assert mock_stream.call_args.kwargs["framing"] == "lines"
+
+        response = test_client.post(
+            "/stream_events",
+            headers={
+                "Authorization": f"Bearer {mock_jwt_token}",
+                "X-Stream-Framing": "coalesced",
+            },
+            json=valid_conversation_input.model_dump(),
+        )
+        assert response.headers["x-stream-framing"] == "coalesced"
+        assert mock_stream.call_args.kwargs["framing"] == "coalesced"
+
+        response = test_client.post(
+            "/stream_events?framing=bogus",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            json=valid_conversation_input.model_dump(),
+        )
+        assert response.status_code == 422
+
+
+def token_event(content: str, run_id: str = "llm-1") -> dict[str, Any]:
+    return {
+        "event": "on_chat_model_stream",
+        "name": "ChatOpenAI",
+        "run_id": run_id,
+        "data": {"chunk": {"content": content}},
+    }
+
+
+async def collect(events: AsyncGenerator[Any, Any]) -> list[Any]:
+    return [event async for event in events]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_token_events_preserves_order() -> None:
+    from backend.common.framing import coalesce_token_events
+
+    async def source() -> AsyncGenerator[Any, Any]:
+        for event in [
+            token_event("Check"),
+            token_event("ing "),
+            {"event": "on_tool_start", "name": "fetch_invoice_info"},
+            token_event("The "),
+            token_event("invoice"),
+            token_event("Other", run_id="llm-2"),
+        ]:
+            yield event
+
+    frames = await collect(coalesce_token_events(source(), window=10))
+
+    assert [frame["event"] for frame in frames] == [
+        "on_chat_model_stream",
+        "on_tool_start",
+        "on_chat_model_stream",
+        "on_chat_model_stream",
+    ]
+    assert frames[0]["data"]["chunk"]["content"] == "Checking "
+    assert frames[2]["data"]["chunk"]["content"] == "The invoice"
+    assert frames[3]["data"]["chunk"]["content"] == "Other"
+
+
+@pytest.mark.asyncio
+async def test_coalesce_token_events_flushes_on_limits() -> None:
+    import asyncio
+
+    from backend.common.framing import coalesce_token_events
+
+    async def source() -> AsyncGenerator[Any, Any]:
+        yield token_event("a" * 10)
+        yield token_event("b" * 10)
+        yield token_event("c")
+        await asyncio.sleep(0.1)
+        yield token_event("d")
+
+    frames = await collect(coalesce_token_events(source(), window=0.02, max_bytes=20))
+
+    assert [frame["data"]["chunk"]["content"] for frame in frames] == [
+        "a" * 10 + "b" * 10,
+        "c",
+        "d",
+    ]
+
+
+def test_project_event_compact_schema() -> None:
+    from langchain_core.documents import Document
+    from langchain_core.messages import AIMessageChunk, ToolMessage
+
+    from backend.common.projection import project_event
+
+    base = {"run_id": "run-1", "tags": ["include"], "metadata": {"k": "v"}}
+
+    token = project_event(
+        {
+            **base,
+            "event": "on_chat_model_stream",
+            "name": "ChatOpenAI",
+            "data": {"chunk": AIMessageChunk(content="Hello")},
+        }
+    )
+    assert token == {
+        "event": "on_chat_model_stream",
+        "run_id": "run-1",
+        "data": {"chunk": {"content": "Hello"}},
+    }
+
+    tool_call_chunk = project_event(
+        {
+            **base,
+            "event": "on_chat_model_stream",
+            "data": {"chunk": AIMessageChunk(content="")},
+        }
+    )
+    assert tool_call_chunk is None
+
+    tool_start = project_event(
+        {
+            **base,
+            "event": "on_tool_start",
+            "name": "retrieve_documents",
+            "data": {"input": {"query": "budget"}},
+        }
+    )
+    assert tool_start == {
+        "event": "on_tool_start",
+        "name": "retrieve_documents",
+        "run_id": "run-1",
+        "data": {"input": {"query": "budget"}},
+    }
+
+    docs = [
+        Document(
+            id="doc-1",
+            page_content="Long content " * 100,
+            metadata={"title": "Budget Act", "source": "budget.pdf", "page": 3},
+        ),
+        Document(page_content="More content", metadata={"source": "bill.pdf"}),
+    ]
+    tool_end = project_event(
+        {
+            **base,
+            "event": "on_tool_end",
+            "name": "retrieve_documents",
+            "data": {
+                "output": ToolMessage(
+                    content="serialized", tool_call_id="call-1", artifact=docs
+                ),
+                "input": {"query": "budget"},
+            },
+        }
+    )
+    assert tool_end == {
+        "event": "on_tool_end",
+        "name": "retrieve_documents",
+        "run_id": "run-1",
+        "data": {
+            "output": {
+                "sources": [
+                    {"id": "doc-1", "title": "Budget Act"},
+                    {"title": "bill.pdf"},
+                ]
+            }
+        },
+    }
+
+    retriever_end = project_event(
+        {
+            **base,
+            "event": "on_retriever_end",
+            "name": "Retriever",
+            "data": {"output": docs[:1]},
+        }
+    )
+    assert retriever_end["data"] == {
+        "output": {"sources": [{"id": "doc-1", "title": "Budget Act"}]}
+    }
+
+    invoice_end = project_event(
+        {
+            **base,
+            "event": "on_tool_end",
+            "name": "fetch_invoice_info",
+            "data": {
+                "output": ToolMessage(content='{"status": "Paid"}', tool_call_id="c")
+            },
+        }
+    )
+    assert invoice_end["data"] == {"output": {"content": '{"status": "Paid"}'}}
+
+
+@pytest.mark.asyncio
+async def test_stream_events_schema_negotiation(
+    test_client: TestClient,
+    mock_token_verification: Any,
+    valid_conversation_input: ConversationInputWrapper,
+    mock_jwt_token: str,
+) -> None:
+    with patch(
+        "backend.routes.events.stream_conversation_events",
+        side_effect=lambda *args, **kwargs: mock_success_stream(),
+    ) as mock_stream:
+        response = test_client.post(
+            "/stream_events",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            json=valid_conversation_input.model_dump(),
+        )
+        assert response.headers["x-stream-schema"] == "compact"
+        assert mock_stream.call_args.kwargs["schema"] == "compact"
+
+        response = test_client.post(
+            "/stream_events?schema=legacy",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            json=valid_conversation_input.model_dump(),
+        )
+        assert response.headers["x-stream-schema"] == "legacy"
+        assert mock_stream.call_args.kwargs["schema"] == "legacy"
+
+
+def test_encode_event_fast_paths() -> None:
+    import uuid
+    from datetime import datetime, timezone
+
+    from langchain_core.documents import Document
+    from langchain_core.messages import AIMessageChunk, ToolMessage
+
+    from backend.common.encoder import encode_event
+    from backend.common.serialization import custom_default
+
+    run_id = uuid.uuid4()
+    chunk = AIMessageChunk(content="Hello", id="msg-1")
+    doc = Document(id="doc-1", page_content="text", metadata={"title": "T"})
+    tool_message = ToolMessage(content="ok", tool_call_id="call-1", artifact=[doc])
+    event = {
+        "event": "on_chat_model_stream",
+        "run_id": run_id,
+        "created": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        "data": {"chunk": chunk, "output": tool_message, "other": object()},
+    }
+
+    line = encode_event(event)
+    assert isinstance(line, bytes)
+    assert line.endswith(b"\n")
+
+    decoded = json.loads(line)
+    assert decoded["run_id"] == str(run_id)
+    assert decoded["created"] == "2025-01-01T00:00:00+00:00"
+    assert decoded["data"]["chunk"] == json.loads(
+        json.dumps(chunk, default=custom_default)
+    )
+    assert decoded["data"]["output"]["artifact"] == [
+        {
+            "id": "doc-1",
+            "metadata": {"title": "T"},
+            "page_content": "text",
+            "type": "Document",
+        }
+    ]
+    assert decoded["data"]["other"].startswith("<object object")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pattern", ["advanced_rag_qa", "agentic_rag"])
+async def test_stream_graph_events_matches_astream_events(pattern: str) -> None:
+    from langchain_core.messages import HumanMessage
+
+    from backend.benchmarks.patterns import load_pattern
+    from backend.common.graph_events import stream_graph_events
+
+    chain = load_pattern(pattern, tokens=5).chain
+    kinds = {
+        "on_tool_start",
+        "on_tool_end",
+        "on_retriever_start",
+        "on_retriever_end",
+        "on_chat_model_stream",
+    }
+
+    def summarize(events: list[dict[str, Any]]) -> list[tuple[str, Any]]:
+        summary = []
+        for event in events:
+            if event["event"] == "on_chat_model_stream":
+                if event["data"]["chunk"].content:
+                    summary.append(("token", event["data"]["chunk"].content))
+            else:
+                summary.append((event["event"], event["name"]))
+        return summary
+
+    input_data = {"messages": [HumanMessage(content="What is the budget?")]}
+    legacy = [
+        event
+        async for event in chain.astream_events(
+            input_data, version="v2", include_tags=["include"]
+        )
+        if event["event"] in kinds
+    ]
+    graph = [event async for event in stream_graph_events(chain, input_data)]
+
+    assert summarize(graph) == summarize(legacy)
+    assert any(kind == "on_tool_end" for kind, _ in summarize(graph))
+    tool_start = next(e for e in graph if e["event"] == "on_tool_start")
+    assert tool_start["data"]["input"] == {"query": "budget"}
+
+
+@pytest.mark.asyncio
+async def test_cancel_on_disconnect_cancels_chain_run() -> None:
+    import asyncio
+
+    from backend.common.disconnect import ClientDisconnected, cancel_on_disconnect
+
+    state = {"cancelled": False, "disconnected": False}
+
+    async def slow_source() -> AsyncGenerator[Any, Any]:
+        yield token_event("Hello")
+        try:
+            await asyncio.sleep(10)
+            yield token_event("never")
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def is_disconnected() -> bool:
+        return state["disconnected"]
+
+    received = []
+    with pytest.raises(ClientDisconnected):
+        async for event in cancel_on_disconnect(
+            slow_source(), is_disconnected, poll_interval=0.01
+        ):
+            received.append(event)
+            state["disconnected"] = True
+
+    assert [event["data"]["chunk"]["content"] for event in received] == ["Hello"]
+    assert state["cancelled"]
+    assert asyncio.current_task().cancelling() == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_events_disconnect_records_abort() -> None:
+    import asyncio
+
+    from backend.routes.events import stream_conversation_events
+
+    disconnected = asyncio.Event()
+
+    async def slow_events(
+        input_data: Any, chain: Any, config: Any = None
+    ) -> AsyncGenerator[Any, Any]:
+        yield token_event("Hello")
+        disconnected.set()
+        await asyncio.sleep(10)
+        yield token_event("never")
+
+    async def is_disconnected() -> bool:
+        return disconnected.is_set()
+
+    with (
+        patch("backend.routes.events.filter_chain_events", slow_events),
+        patch("backend.routes.events.STREAM_DISCONNECT_POLL_MS", 10),
+        patch("backend.routes.events.record_stream_abort") as mock_record,
+    ):
+        lines = await collect(
+            stream_conversation_events(
+                {"user_id": "test_user", "session_id": "test_session"},
+                is_disconnected=is_disconnected,
+            )
+        )
+
+    events = [json.loads(line) for line in lines]
+    assert [event["event"] for event in events] == [
+        "metadata",
+        "on_chat_model_stream",
+    ]
+    mock_record.assert_called_once()
+    assert mock_record.call_args.args == (
+        events[0]["data"]["run_id"],
+        "client_disconnected",
+    )
+    assert mock_record.call_args.kwargs["events_sent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_registry_replays_and_follows_run() -> None:
+    import asyncio
+
+    from backend.common.run_buffer import ReplayGap, RunRegistry
+
+    release = asyncio.Event()
+
+    async def lines() -> AsyncGenerator[bytes, Any]:
+        yield b"a\n"
+        yield b"b\n"
+        await release.wait()
+        yield b"c\n"
+
+    registry = RunRegistry()
+    buffer = registry.start("run-1", lines())
+
+    reader = registry.subscribe(buffer)
+    assert [await anext(reader), await anext(reader)] == [b"a\n", b"b\n"]
+    await reader.aclose()
+    assert buffer.subscribers == 0
+
+    # Reattach to the still running generation after the last line received
+    release.set()
+    assert await collect(registry.subscribe(buffer, after=1)) == [b"c\n"]
+    assert buffer.done
+    assert registry.get("run-1") is buffer
+    assert registry.size == 6
+
+    # Lines beyond the per-run cap are dropped from the head of the ring
+    small = RunRegistry(run_max_bytes=4)
+    capped = small.start("run-2", lines())
+    assert await collect(small.subscribe(capped, after=0)) == [b"b\n", b"c\n"]
+    assert capped.first_seq == 1
+    with pytest.raises(ReplayGap):
+        await collect(small.subscribe(capped))
+
+
+@pytest.mark.asyncio
+async def test_run_registry_cancels_detached_runs() -> None:
+    import asyncio
+
+    from backend.common.run_buffer import RunRegistry
+
+    cancelled = asyncio.Event()
+
+    async def lines() -> AsyncGenerator[bytes, Any]:
+        yield b"a\n"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    registry = RunRegistry(grace=0.01, ttl=0)
+    buffer = registry.start("run-1", lines())
+    reader = registry.subscribe(buffer)
+    assert await anext(reader) == b"a\n"
+    await reader.aclose()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.wait_for(buffer.task, 1)
+    assert buffer.done
+    assert registry.get("run-1") is None
+    assert registry.size == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_events_resume_with_last_event_id(
+    test_client: TestClient,
+    mock_token_verification: Any,
+    valid_conversation_input: ConversationInputWrapper,
+    mock_jwt_token: str,
+) -> None:
+    headers = {"Authorization": f"Bearer {mock_jwt_token}"}
+    with (
+        patch("backend.routes.events.STREAM_RESUME_ENABLED", True),
+        patch(
+            "backend.routes.events.stream_conversation_events",
+            return_value=mock_comprehensive_stream(),
+        ),
+    ):
+        response = test_client.post(
+            "/stream_events",
+            headers=headers,
+            json=valid_conversation_input.model_dump(),
+        )
+    run_id = response.headers["x-run-id"]
+    events = [json.loads(line) for line in response.iter_lines() if line]
+
+    resumed = test_client.get(
+        f"/stream_events/{run_id}", headers={**headers, "Last-Event-ID": "3"}
+    )
+    assert resumed.status_code == 200
+    assert [json.loads(line) for line in resumed.iter_lines() if line] == events[4:]
+
+    missing = test_client.get("/stream_events/unknown-run", headers=headers)
+    assert missing.status_code == 404
+
+
+def test_response_cache_key_normalization() -> None:
+    from backend.common.response_cache import response_cache_key
+
+    messages = [
+        {"type": "human", "content": "What is  the budget?", "id": "a"},
+        {
+            "type": "ai",
+            "content": "",
+            "id": "b",
+            "tool_calls": [{"name": "search", "args": {"q": "x"}, "id": "call-1"}],
+        },
+    ]
+    same = [
+        {"type": "human", "content": " What is the budget? ", "id": "c"},
+        {
+            "type": "ai",
+            "content": "",
+            "tool_calls": [{"name": "search", "args": {"q": "x"}, "id": "call-2"}],
+        },
+    ]
+
+    key = response_cache_key(messages, chain="basic_rag_qa", revision="abc")
+    assert response_cache_key(same, chain="basic_rag_qa", revision="abc") == key
+    assert response_cache_key(messages, chain="basic_rag_qa", revision="def") != key
+    assert response_cache_key(messages[:1], chain="basic_rag_qa", revision="abc") != key
+
+
+@pytest.mark.asyncio
+async def test_in_memory_response_cache_lru_and_ttl() -> None:
+    from backend.common.response_cache import InMemoryResponseCache
+
+    cache = InMemoryResponseCache(max_entries=2)
+    await cache.set("a", [{"event": "a"}], ttl=60)
+    await cache.set("b", [{"event": "b"}], ttl=60)
+    assert await cache.get("a") == [{"event": "a"}]
+    await cache.set("c", [{"event": "c"}], ttl=60)
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+
+    await cache.set("expired", [], ttl=0)
+    assert await cache.get("expired") is None
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_events_replays_cached_response() -> None:
+    from backend.common.response_cache import InMemoryResponseCache
+    from backend.routes.events import stream_conversation_events
+
+    runs = []
+
+    async def chain_events(
+        input_data: Any, chain: Any, config: Any = None
+    ) -> AsyncGenerator[Any, Any]:
+        runs.append(input_data)
+        yield {
+            "event": "on_tool_start",
+            "name": "search",
+            "run_id": "tool-1",
+            "data": {"input": {"query": "budget"}},
+        }
+        yield token_event("Hello")
+        yield token_event(" world")
+
+    input_data = {
+        "messages": [{"type": "human", "content": "What is the budget?"}],
+        "user_id": "test_user",
+    }
+    with (
+        patch("backend.routes.events.filter_chain_events", chain_events),
+        patch("backend.routes.events.response_cache", InMemoryResponseCache()),
+        patch("backend.routes.events.RESPONSE_CACHE_CHAINS", {"invoice_agent"}),
+    ):
+        first = [
+            json.loads(line)
+            for line in await collect(stream_conversation_events(input_data))
+        ]
+        second = [
+            json.loads(line)
+            for line in await collect(stream_conversation_events(input_data))
+        ]
+        legacy = [
+            json.loads(line)
+            for line in await collect(
+                stream_conversation_events(input_data, schema="legacy")
+            )
+        ]
+
+    def without_run_ids(events: list[Any]) -> list[Any]:
+        return [{k: v for k, v in event.items() if k != "run_id"} for event in events]
+
+    # The compact schema is cached separately from the legacy one
+    assert len(runs) == 2
+    assert "cached" not in first[0]["data"]
+    assert second[0]["data"]["cached"] is True
+    assert without_run_ids(second[1:]) == without_run_ids(first[1:])
+    assert "cached" not in legacy[0]["data"]
+
+    # Replays get fresh run ids, still shared by the events of one run
+    tool, hello, world = (event["run_id"] for event in second[1:4])
+    assert tool != first[1]["run_id"]
+    assert hello != first[2]["run_id"]
+    assert hello == world != tool
+
+
+@pytest.mark.asyncio
+async def test_stream_events_semantic_cache() -> None:
+    from unittest.mock import AsyncMock, MagicMock
+
+    from backend.common.semantic_cache import SemanticAnswerCache
+    from backend.routes.events import stream_conversation_events
+
+    async def chain_events(
+        input_data: Any, chain: Any, config: Any = None
+    ) -> AsyncGenerator[Any, Any]:
+        yield token_event("Let me check.", run_id="llm-1")
+        yield {
+            "event": "on_tool_end",
+            "name": "search",
+            "run_id": "tool-1",
+            "data": {"output": "docs"},
+        }
+        yield token_event("The budget ", run_id="llm-2")
+        yield token_event("is $5M.", run_id="llm-2")
+
+    cache = MagicMock(spec=SemanticAnswerCache)
+    cache.embed = AsyncMock(return_value=[0.1, 0.2])
+    cache.lookup = AsyncMock(return_value=None)
+    cache.store = AsyncMock()
+    input_data = {
+        "messages": [
+            {"type": "system", "content": "Be brief."},
+            {"type": "human", "content": " How big is the budget? "},
+        ]
+    }
+    follow_up = {
+        "messages": [
+            {"type": "human", "content": "How big is the budget?"},
+            {"type": "ai", "content": "The budget is $5M."},
+            {"type": "human", "content": "Tell me more"},
+        ]
+    }
+
+    with (
+        patch("backend.routes.events.filter_chain_events", chain_events),
+        patch.dict("backend.routes.events.semantic_caches", {"invoice_agent": cache}),
+    ):
+        missed = [
+            json.loads(line)
+            for line in await collect(stream_conversation_events(input_data))
+        ]
+        # Only the final answer is stored, under the question
+        cache.embed.assert_awaited_once_with("How big is the budget?")
+        cache.store.assert_awaited_once_with(
+            "How big is the budget?", [0.1, 0.2], "The budget is $5M."
+        )
+
+        cache.lookup = AsyncMock(return_value="The budget is $5M.")
+        hit = [
+            json.loads(line)
+            for line in await collect(stream_conversation_events(input_data))
+        ]
+
+    assert "cached" not in missed[0]["data"]
+    assert hit[0]["data"]["cache"] == "semantic"
+    assert [event["event"] for event in hit] == [
+        "metadata",
+        "on_chat_model_stream",
+        "end",
+    ]
+    assert hit[1]["data"]["chunk"]["content"] == "The budget is $5M."
+    assert cache.store.await_count == 1
+
+    # Follow-ups depend on the conversation and never touch the cache
+    with (
+        patch("backend.routes.events.filter_chain_events", chain_events),
+        patch.dict("backend.routes.events.semantic_caches", {"invoice_agent": cache}),
+    ):
+        followed = [
+            json.loads(line)
+            for line in await collect(stream_conversation_events(follow_up))
+        ]
+    assert "cached" not in followed[0]["data"]
+    assert cache.embed.await_count == 2
+    assert cache.store.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_limits_and_queue() -> None:
+    import asyncio
+
+    from backend.common.admission import AdmissionController, AdmissionRejected
+
+    admission = AdmissionController(
+        max_in_flight=2, max_per_user=2, max_queue=1, queue_timeout=0.05
+    )
+    await admission.acquire("alice")
+    await admission.acquire("alice")
+
+    # Alice is at her limit; Bob queues for a global slot
+    with pytest.raises(AdmissionRejected):
+        await admission.acquire("alice")
+    waiting = asyncio.create_task(admission.acquire("bob"))
+    await asyncio.sleep(0)
+    assert admission.stats()["queued"] == 1
+
+    # The queue is full, so Carol is turned away without waiting
+    with pytest.raises(AdmissionRejected) as rejected:
+        await admission.acquire("carol")
+    assert rejected.value.retry_after == admission.retry_after
+
+    admission.release("alice")
+    await waiting
+    assert admission.stats()["in_flight"] == 2
+    assert admission.stats()["queued"] == 0
+
+    with pytest.raises(AdmissionRejected, match="Timed out"):
+        await admission.acquire("carol")
+
+    admission.release("alice")
+    admission.release("bob")
+    assert admission.stats() == {
+        "in_flight": 0,
+        "queued": 0,
+        "rejected": 3,
+        "max_in_flight": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_admission_slot_released_once_when_response_never_sent() -> None:
+    from backend.common.admission import AdmissionController
+    from backend.routes.events import AdmittedStreamingResponse
+
+    admission = AdmissionController(max_in_flight=1)
+    slot = await admission.acquire("alice")
+    started = False
+
+    async def body() -> AsyncGenerator[bytes, None]:
+        nonlocal started
+        started = True
+        yield b"never sent"
+
+    async def send(message: Any) -> None:
+        raise OSError("client gone")
+
+    response = AdmittedStreamingResponse(body(), slot)
+    with pytest.raises(Exception):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, send)
+
+    assert not started
+    assert admission.stats()["in_flight"] == 0
+    slot.release()
+    assert admission.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_events_releases_slot_when_run_fails_to_start(
+    test_client: TestClient,
+    mock_token_verification: Any,
+    valid_conversation_input: ConversationInputWrapper,
+    mock_jwt_token: str,
+) -> None:
+    from backend.common.admission import AdmissionController
+
+    admission = AdmissionController()
+    with (
+        patch("backend.routes.events.admission", admission),
+        patch("backend.routes.events.STREAM_RESUME_ENABLED", True),
+        patch(
+            "backend.routes.events.start_buffered_run",
+            side_effect=RuntimeError("registry full"),
+        ),
+        pytest.raises(RuntimeError),
+    ):
+        test_client.post(
+            "/stream_events",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            json=valid_conversation_input.model_dump(),
+        )
+
+    assert admission.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_events_rejected_with_retry_after(
+    test_client: TestClient,
+    mock_token_verification: Any,
+    valid_conversation_input: ConversationInputWrapper,
+    mock_jwt_token: str,
+) -> None:
+    from backend.common.admission import AdmissionController
+
+    full = AdmissionController(max_in_flight=0, max_queue=0, retry_after=1.5)
+    with (
+        patch("backend.routes.events.admission", full),
+        patch("backend.routes.metrics.admission", full),
+        patch("backend.routes.events.stream_conversation_events") as mock_stream,
+    ):
+        response = test_client.post(
+            "/stream_events",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            json=valid_conversation_input.model_dump(),
+        )
+        metrics = test_client.get("/metrics")
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "2"
+    mock_stream.assert_not_called()
+    assert "stream_events_rejected_total 1" in metrics.text
+    assert "stream_events_in_flight 0" in metrics.text
+
+
+@pytest.mark.asyncio
+async def test_stream_events_selects_chain_and_loads_lazily(
+    test_client: TestClient,
+    mock_token_verification: Any,
+    valid_conversation_input: ConversationInputWrapper,
+    mock_jwt_token: str,
+) -> None:
+    import asyncio
+    import importlib
+    from types import SimpleNamespace
+
+    from backend.routes import events
+
+    imports = []
+    real_import_module = importlib.import_module
+
+    def import_module(name: str) -> Any:
+        if not name.startswith("backend.patterns."):
+            return real_import_module(name)
+        imports.append(name)
+        return SimpleNamespace(chain=name)
+
+    headers = {"Authorization": f"Bearer {mock_jwt_token}"}
+    with (
+        patch.dict(events.chain_modules, clear=True),
+        patch("backend.routes.events.HOSTED_CHAINS", list(events.chain_map)),
+        patch("backend.routes.events.importlib.import_module", import_module),
+        patch("backend.routes.events.stream_conversation_events") as mock_stream,
+    ):
+        mock_stream.side_effect = lambda *args, **kwargs: mock_success_stream()
+
+        # Concurrent first requests share a single import
+        modules = await asyncio.gather(
+            *(events.get_chain_module("basic_rag_qa") for _ in range(3))
+        )
+        assert imports == ["backend.patterns.basic_rag_qa.chain"]
+        assert modules[0] is modules[1] is modules[2]
+
+        by_path = test_client.post(
+            "/chains/agentic_rag/stream_events",
+            headers=headers,
+            json=valid_conversation_input.model_dump(),
+        )
+        by_body = test_client.post(
+            "/stream_events",
+            headers=headers,
+            json={**valid_conversation_input.model_dump(), "chain": "basic_rag_qa"},
+        )
+        by_default = test_client.post(
+            "/stream_events",
+            headers=headers,
+            json=valid_conversation_input.model_dump(),
+        )
+        unknown = test_client.post(
+            "/chains/missing/stream_events",
+            headers=headers,
+            json=valid_conversation_input.model_dump(),
+        )
+        listing = test_client.get("/chains", headers=headers)
+
+    assert [response.headers["x-chain"] for response in (by_path, by_body)] == [
+        "agentic_rag",
+        "basic_rag_qa",
+    ]
+    assert by_default.headers["x-chain"] == "invoice_agent"
+    assert [call.kwargs["chain_name"] for call in mock_stream.call_args_list] == [
+        "agentic_rag",
+        "basic_rag_qa",
+        "invoice_agent",
+    ]
+    assert unknown.status_code == 404
+    assert imports == [
+        "backend.patterns.basic_rag_qa.chain",
+        "backend.patterns.agentic_rag.chain",
+        "backend.patterns.invoice_agent.chain",
+    ]
+    loaded = {chain["name"]: chain["loaded"] for chain in listing.json()["chains"]}
+    assert loaded == {
+        "invoice_agent": True,
+        "basic_rag_qa": True,
+        "advanced_rag_qa": False,
+        "agentic_rag": True,
+    }
+
+
+def test_stream_events_reports_chain_that_fails_to_load(
+    test_client: TestClient,
+    mock_token_verification: Any,
+    valid_conversation_input: ConversationInputWrapper,
+    mock_jwt_token: str,
+) -> None:
+    import importlib
+
+    from backend.routes import events
+
+    real_import_module = importlib.import_module
+
+    def import_module(name: str) -> Any:
+        if not name.startswith("backend.patterns."):
+            return real_import_module(name)
+        raise Exception("EMBEDDING_MODEL_ID is not set")
+
+    with (
+        patch.dict(events.chain_modules, clear=True),
+        patch("backend.routes.events.importlib.import_module", import_module),
+    ):
+        response = test_client.post(
+            "/stream_events",
+            headers={"Authorization": f"Bearer {mock_jwt_token}"},
+            json=valid_conversation_input.model_dump(),
+        )
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Chain unavailable: invoice_agent"
+    assert events.admission.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_events_server_side_history() -> None:
+    from types import SimpleNamespace
+
+    from langchain_core.messages import AIMessage, ToolMessage
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.graph import END, START, MessagesState, StateGraph
+
+    from backend.routes import events
+
+    seen = []
+
+    def respond(state: MessagesState) -> dict[str, Any]:
+        seen.append([message.type for message in state["messages"]])
+        if state["messages"][-1].content == "call a tool":
+            return {
+                "messages": AIMessage(
+                    content="",
+                    tool_calls=[{"name": "search", "args": {}, "id": "call-1"}],
+                )
+            }
+        return {"messages": AIMessage(content=f"{len(state['messages'])} messages")}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("respond", respond)
+    builder.add_edge(START, "respond")
+    builder.add_edge("respond", END)
+    graph = builder.compile()
+    checkpointer = InMemorySaver()
+
+    async def get_chain_module(name: str) -> Any:
+        return SimpleNamespace(chain=graph)
+
+    async def get_checkpointer() -> Any:
+        return checkpointer
+
+    def turn(content: str, owner: str = "a@example.com") -> Any:
+        return collect(
+            events.stream_conversation_events(
+                {
+                    "messages": [{"type": "human", "content": content}],
+                    "session_id": "session-1",
+                    "history": "server",
+                },
+                owner=owner,
+            )
+        )
+
+    with (
+        patch.dict(events.stateful_chains, clear=True),
+        patch("backend.routes.events.get_chain_module", get_chain_module),
+        patch("backend.routes.events.get_checkpointer", get_checkpointer),
+    ):
+        await turn("Hello")
+        await turn("call a tool")
+        await turn("Again")
+        await turn("Hello", owner="b@example.com")
+
+    # Each turn sees the saved conversation of its user's session; the tool call
+    # the previous turn left unanswered is closed first
+    assert seen == [
+        ["human"],
+        ["human", "ai", "human"],
+        ["human", "ai", "human", "ai", "tool", "human"],
+        ["human"],
+    ]
+    config = {
+        "configurable": {
+            "thread_id": events.conversation_thread_id(
+                "a@example.com", "invoice_agent", "session-1"
+            )
+        }
+    }
+    saved = await graph.copy({"checkpointer": checkpointer}).aget_state(config)
+    messages = saved.values["messages"]
+    assert isinstance(messages[4], ToolMessage)
+    assert messages[4].tool_call_id == "call-1"
+    assert messages[-1].content == "6 messages"
+
+
+@pytest.mark.asyncio
+async def test_stream_events_server_side_history_requires_session(
+    test_client: TestClient,
+    mock_token_verification: Any,
+    valid_conversation_input: ConversationInputWrapper,
+    mock_jwt_token: str,
+) -> None:
+    payload = valid_conversation_input.model_dump()
+    payload["input_data"]["history"] = "server"
+    headers = {"Authorization": f"Bearer {mock_jwt_token}"}
+
+    disabled = test_client.post("/stream_events", headers=headers, json=payload)
+    payload["input_data"]["session_id"] = ""
+    with patch("backend.routes.events.CONVERSATION_STATE_ENABLED", True):
+        no_session = test_client.post("/stream_events", headers=headers, json=payload)
+
+    assert disabled.status_code == 400
+    assert no_session.status_code == 400
+    assert no_session.json()["detail"].endswith("requires a session_id")
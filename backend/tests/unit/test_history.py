@@ -0,0 +1,102 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Any, Sequence
+
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from backend.common.history import HistoryManager, split_turns
+
+
+def conversation(turns: int) -> list[BaseMessage]:
+    messages: list[BaseMessage] = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"question {turn}"))
+        call = {"name": "search", "args": {}, "id": f"call-{turn}"}
+        messages.append(AIMessage(content="", tool_calls=[call]))
+        messages.append(ToolMessage(content=f"result {turn}", tool_call_id=call["id"]))
+        messages.append(AIMessage(content=f"answer {turn}"))
+    return messages
+
+
+def ten_per_message(messages: Sequence[BaseMessage]) -> int:
+    return 10 * len(messages)
+
+
+class RecordingModel(FakeListChatModel):
+    prompts: list[str] = []
+
+    def invoke(self, input: Any, config: Any = None, **kwargs: Any) -> Any:
+        self.prompts.append(input[0].content)
+        return super().invoke(input, config, **kwargs)
+
+
+def test_split_turns_keeps_tool_calls_with_their_results() -> None:
+    turns = split_turns([AIMessage(content="greeting"), *conversation(2)])
+
+    assert [len(turn) for turn in turns] == [1, 4, 4]
+    assert isinstance(turns[1][2], ToolMessage)
+
+
+def test_history_within_budget_is_unchanged() -> None:
+    history = HistoryManager("test", max_tokens=1000, token_counter=ten_per_message)
+    messages = conversation(3)
+
+    assert history.fit(messages, RecordingModel(responses=[])) == messages
+
+
+def test_history_trims_whole_turns_and_rolls_summary() -> None:
+    model = RecordingModel(responses=["summary 1", "summary 2"])
+    # Each turn is 40 tokens: two turns fit next to the summary's 20
+    history = HistoryManager(
+        "test", max_tokens=100, summary_max_tokens=20, token_counter=ten_per_message
+    )
+
+    first = history.fit(conversation(4), model)
+    assert isinstance(first[0], SystemMessage)
+    assert first[0].content.endswith("summary 1")
+    assert first[1:] == conversation(4)[8:]
+    assert "question 0" in model.prompts[0]
+    assert "question 2" not in model.prompts[0]
+
+    # The next turn only summarizes the turn that newly fell out of the budget
+    second = history.fit(conversation(5), model)
+    assert second[0].content.endswith("summary 2")
+    assert second[1:] == conversation(5)[12:]
+    assert "summary 1" in model.prompts[1]
+    assert "question 2" in model.prompts[1]
+    assert "question 1" not in model.prompts[1]
+
+    # Repeating a turn reuses the cached summary
+    assert history.fit(conversation(5), model) == second
+    assert len(model.prompts) == 2
+
+
+def test_history_keeps_current_turn_over_budget() -> None:
+    history = HistoryManager(
+        "test", max_tokens=30, summarize=False, token_counter=ten_per_message
+    )
+
+    assert (
+        history.fit(conversation(2), RecordingModel(responses=[]))
+        == (conversation(2)[4:])
+    )
@@ -0,0 +1,137 @@
+# Copyright 2025 Silex Data Solutions dba Data Science Technologies, LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+from typing import Any, AsyncGenerator
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from backend.common.encoder import encode_event
+
+
+@pytest.fixture
+def test_client() -> TestClient:
+    from backend.main import app
+
+    return TestClient(app)
+
+
+async def fake_stream(
+    input_data: dict[str, Any], run_id: str, **kwargs: Any
+) -> AsyncGenerator[bytes, None]:
+    question = input_data["messages"][-1]["content"]
+    yield encode_event({"event": "metadata", "data": {"run_id": run_id}, "seq": 0})
+    if question == "wait":
+        await asyncio.sleep(10)
+    words = question.split()
+    for seq, word in enumerate(words, start=1):
+        yield encode_event(
+            {"event": "on_chat_model_stream", "data": {"content": word}, "seq": seq}
+        )
+    yield encode_event({"event": "end", "seq": len(words) + 1})
+
+
+def start(ref: str, question: str) -> dict[str, Any]:
+    return {
+        "type": "start",
+        "ref": ref,
+        "input_data": {"messages": [{"type": "human", "content": question}]},
+    }
+
+
+def test_stream_socket_multiplexes_runs(
+    test_client: TestClient, mock_token_verification: Any, mock_jwt_token: str
+) -> None:
+    headers = {"Authorization": f"Bearer {mock_jwt_token}"}
+    with (
+        patch("backend.routes.events.stream_conversation_events", fake_stream),
+        test_client.websocket_connect("/ws/stream_events", headers=headers) as ws,
+    ):
+        assert ws.receive_json() == {"type": "ready"}
+        ws.send_json(start("slow", "wait"))
+        ws.send_json(start("fast", "hello world"))
+
+        run_ids = {}
+        events: dict[str, list[Any]] = {}
+        done = set()
+        while "fast" not in run_ids or run_ids["fast"] not in done:
+            message = ws.receive_json()
+            if message["type"] == "started":
+                run_ids[message["ref"]] = message["run_id"]
+            elif message["type"] == "event":
+                events.setdefault(message["run_id"], []).append(message["data"])
+            elif message["type"] == "done":
+                done.add(message["run_id"])
+
+        fast = events[run_ids["fast"]]
+        assert [event["event"] for event in fast] == [
+            "metadata",
+            "on_chat_model_stream",
+            "on_chat_model_stream",
+            "end",
+        ]
+        assert fast[0]["data"]["run_id"] == run_ids["fast"]
+
+        ws.send_json({"type": "cancel", "run_id": run_ids["slow"]})
+        message = ws.receive_json()
+        while message["type"] != "done":
+            message = ws.receive_json()
+        assert message["run_id"] == run_ids["slow"]
+
+        # Finished runs stay buffered for resuming
+        ws.send_json({"type": "resume", "run_id": run_ids["fast"], "after": 1})
+        resumed = [ws.receive_json() for _ in range(3)]
+        ws.send_json({"type": "resume", "run_id": "unknown"})
+        missing = ws.receive_json()
+
+    assert [message["data"]["seq"] for message in resumed[:2]] == [2, 3]
+    assert resumed[2] == {"type": "done", "run_id": run_ids["fast"]}
+    assert missing["code"] == "not_found"
+
+
+def test_stream_socket_authenticates_first_message(
+    test_client: TestClient, mock_token_verification: Any, mock_jwt_token: str
+) -> None:
+    with test_client.websocket_connect("/ws/stream_events") as ws:
+        ws.send_json({"type": "auth", "token": mock_jwt_token})
+        assert ws.receive_json() == {"type": "ready"}
+        ws.send_json({"type": "start"})
+        assert ws.receive_json()["code"] == "invalid_message"
+
+    with test_client.websocket_connect("/ws/stream_events") as ws:
+        ws.send_json({"type": "auth", "token": "invalid"})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+
+
+@pytest.mark.asyncio
+async def test_ack_window_pauses_until_acknowledged() -> None:
+    from backend.routes.stream_socket import AckWindow
+
+    window = AckWindow(2, -1)
+    await asyncio.wait_for(window.wait(1), 1)
+
+    waiter = asyncio.create_task(window.wait(3))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    window.ack(0)
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    window.ack(1)
+    await asyncio.wait_for(waiter, 1)
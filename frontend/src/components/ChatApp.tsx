@@ -32,11 +32,14 @@ export default function ChatApp() {
     expandedToolCall,
     submittedFeedback,
     isLoadingChats,
+    hasMoreChats,
+    isLoadingMoreChats,
     authLoading,
     user,
     userScrolled,
     setCurrentSessionId,
     setServiceUrl,
+    loadMoreChats,
     createNewChat,
     deleteCurrentChat,
     sendMessage,
@@ -96,9 +99,12 @@ export default function ChatApp() {
         currentSessionId={currentSessionId}
         serviceUrl={serviceUrl}
         isStreaming={isStreaming}
+        hasMoreChats={hasMoreChats}
+        isLoadingMoreChats={isLoadingMoreChats}
         onNewChat={handleNewChat}
         onDeleteChat={deleteCurrentChat}
         onSelectChat={setCurrentSessionId}
+        onLoadMoreChats={loadMoreChats}
         onServiceUrlChange={setServiceUrl}
         onLogout={logout}
       />
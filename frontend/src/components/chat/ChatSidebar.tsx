@@ -13,9 +13,12 @@ interface ChatSidebarProps {
   currentSessionId: string
   serviceUrl: string
   isStreaming: boolean
+  hasMoreChats: boolean
+  isLoadingMoreChats: boolean
   onNewChat: () => void
   onDeleteChat: () => void
   onSelectChat: (id: string) => void
+  onLoadMoreChats: () => void
   onServiceUrlChange: (url: string) => void
   onLogout: () => void
 }
@@ -26,9 +29,12 @@ export function ChatSidebar({
   currentSessionId,
   serviceUrl,
   isStreaming,
+  hasMoreChats,
+  isLoadingMoreChats,
   onNewChat,
   onDeleteChat,
   onSelectChat,
+  onLoadMoreChats,
   onServiceUrlChange,
   onLogout,
 }: ChatSidebarProps) {
@@ -107,6 +113,15 @@ export function ChatSidebar({
               {chat.title}
             </button>
           ))}
+          {hasMoreChats && (
+            <button
+              onClick={onLoadMoreChats}
+              className="w-full p-2 text-sm text-text-light rounded hover:bg-gray-100 focus:outline-none focus:bg-gray-100 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
+              disabled={isLoadingMoreChats}
+            >
+              {isLoadingMoreChats ? 'Loading...' : 'Load more'}
+            </button>
+          )}
         </div>
       </div>
     </aside>
@@ -9,10 +9,17 @@ import type {
   ToolCall,
   ToolCallState,
   StreamEvent,
-  ChatApiResponse,
+  ChatSummary,
+  ChatSummariesResponse,
+  ChatMessagesResponse,
   ChatTitleResponse,
 } from '../types/chat'
 
+// A failed save is retried with the same Idempotency-Key, backing off from
+// SAVE_RETRY_DELAY milliseconds
+const SAVE_ATTEMPTS = 3
+const SAVE_RETRY_DELAY = 1000
+
 function sanitizeToolMessages(messages: Message[]): Message[] {
   return messages
     .filter((m) => m.type !== 'tool')
@@ -33,6 +40,38 @@ function sanitizeToolMessages(messages: Message[]): Message[] {
     })
 }
 
+function toolCallsFrom(messages: Message[]): { [key: string]: ToolCallState } {
+  const toolCallsMap: { [key: string]: ToolCallState } = {}
+  messages.forEach((message) => {
+    if (message.type === 'ai' && message.tool_calls) {
+      message.tool_calls.forEach((toolCall) => {
+        const toolResponse = messages.find(
+          (msg) => msg.type === 'tool' && msg.tool_call_id === toolCall.id
+        )
+
+        let parsedOutput = null
+        if (toolResponse) {
+          try {
+            parsedOutput =
+              typeof toolResponse.content === 'string'
+                ? JSON.parse(toolResponse.content)
+                : toolResponse.content
+          } catch (e) {
+            console.error('Error parsing tool response:', e)
+            parsedOutput = toolResponse.content
+          }
+        }
+
+        toolCallsMap[toolCall.id] = {
+          toolCall,
+          output: parsedOutput,
+        }
+      })
+    }
+  })
+  return toolCallsMap
+}
+
 async function fetchChatTitle(messages: Message[]): Promise<string> {
   try {
     const firstMessage = messages[0]?.content || ''
@@ -54,6 +93,33 @@ async function fetchChatTitle(messages: Message[]): Promise<string> {
   }
 }
 
+// Fetch one page of chat summaries; null when the request failed
+async function fetchChatSummaries(
+  cursor: string | null
+): Promise<ChatSummariesResponse | null> {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+  const response = await fetchWithAuth(`/chats${query}`)
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}))
+    console.error('Failed to fetch chats:', {
+      status: response.status,
+      statusText: response.statusText,
+      error: errorData.error,
+    })
+    return null
+  }
+  return (await response.json()) as ChatSummariesResponse
+}
+
+function listChats(summaries: ChatSummary[]): ChatsState {
+  const listed: ChatsState = {}
+  summaries.forEach((summary) => {
+    listed[summary.id] = { title: summary.title, messages: [], loaded: false }
+  })
+  return listed
+}
+
 export function useChat() {
   const { user, isLoading: authLoading, refreshToken } = useAuth()
   const [chats, setChats] = useState<ChatsState>({})
@@ -66,8 +132,16 @@ export function useChat() {
   const [submittedFeedback, setSubmittedFeedback] = useState<{ [key: string]: boolean }>({})
   const [isLoadingChats, setIsLoadingChats] = useState(true)
   const [isInitialized, setIsInitialized] = useState(false)
+  // Cursor of the next page of chat summaries, null once all are listed
+  const [chatsCursor, setChatsCursor] = useState<string | null>(null)
+  const [isLoadingMoreChats, setIsLoadingMoreChats] = useState(false)
 
   const initialLoadComplete = useRef(false)
+  // Chats as last acknowledged by the server, used to send only what changed
+  const savedChats = useRef<ChatsState>({})
+  // Idempotency-Key of each chat's unacknowledged save, reused while the
+  // same delta is retried so the server applies it only once
+  const pendingSaves = useRef<{ [chatId: string]: { body: string; key: string } }>({})
   const userScrolled = useRef(false)
   const scrollTimeout = useRef<ReturnType<typeof setTimeout> | null>(null)
 
@@ -103,7 +177,7 @@ export function useChat() {
     }
   }, [isLoadingChats, chats, isInitialized])
 
-  // Load chats from server
+  // Load the first page of chats from server; older pages load on demand
   useEffect(() => {
     if (authLoading) return
     if (!user) return
@@ -113,56 +187,17 @@ export function useChat() {
       setIsLoadingChats(true)
       try {
         console.log('Fetching initial chats...')
-        const response = await fetchWithAuth('/chats')
-
-        if (!response.ok) {
-          const errorData = await response.json().catch(() => ({}))
-          console.error('Failed to fetch chats:', {
-            status: response.status,
-            statusText: response.statusText,
-            error: errorData.error,
-          })
-          return
-        }
-
-        const data = (await response.json()) as ChatApiResponse
-        if (data.chats && Object.keys(data.chats).length > 0) {
-          console.log('Loaded chats:', Object.keys(data.chats).length)
-          setChats(data.chats)
-          setCurrentSessionId(Object.keys(data.chats)[0])
-
-          // Initialize tool calls from saved messages
-          const toolCallsMap: { [key: string]: ToolCallState } = {}
-          Object.values(data.chats).forEach((chat) => {
-            chat.messages.forEach((message) => {
-              if (message.type === 'ai' && message.tool_calls) {
-                message.tool_calls.forEach((toolCall) => {
-                  const toolResponse = chat.messages.find(
-                    (msg) => msg.type === 'tool' && msg.tool_call_id === toolCall.id
-                  )
-
-                  let parsedOutput = null
-                  if (toolResponse) {
-                    try {
-                      parsedOutput =
-                        typeof toolResponse.content === 'string'
-                          ? JSON.parse(toolResponse.content)
-                          : toolResponse.content
-                    } catch (e) {
-                      console.error('Error parsing tool response:', e)
-                      parsedOutput = toolResponse.content
-                    }
-                  }
-
-                  toolCallsMap[toolCall.id] = {
-                    toolCall,
-                    output: parsedOutput,
-                  }
-                })
-              }
-            })
-          })
-          setToolCalls(toolCallsMap)
+        // The sidebar only needs summaries; messages are fetched per chat
+        const page = await fetchChatSummaries(null)
+        if (!page) return
+        setChatsCursor(page.nextCursor)
+
+        if (page.chats.length > 0) {
+          console.log('Loaded chats:', page.chats.length)
+          const listed = listChats(page.chats)
+          savedChats.current = { ...listed }
+          setChats(listed)
+          setCurrentSessionId(page.chats[0].id)
         } else {
           console.log('No existing chats, creating new chat')
           const newSessionId = crypto.randomUUID()
@@ -186,6 +221,32 @@ export function useChat() {
     fetchChats()
   }, [user, authLoading])
 
+  const loadMoreChats = useCallback(async () => {
+    if (!chatsCursor || isLoadingMoreChats) return
+    setIsLoadingMoreChats(true)
+    try {
+      const page = await fetchChatSummaries(chatsCursor)
+      if (!page) return
+      // Older chats go below the listed ones, which keep their local state
+      const listed = listChats(page.chats)
+      Object.entries(listed).forEach(([id, chat]) => {
+        if (!(id in savedChats.current)) savedChats.current[id] = chat
+      })
+      setChats((prev) => {
+        const next = { ...prev }
+        Object.entries(listed).forEach(([id, chat]) => {
+          if (!(id in next)) next[id] = chat
+        })
+        return next
+      })
+      setChatsCursor(page.nextCursor)
+    } catch (error) {
+      console.error('Error fetching chats:', error)
+    } finally {
+      setIsLoadingMoreChats(false)
+    }
+  }, [chatsCursor, isLoadingMoreChats])
+
   // Save chats to server
   useEffect(() => {
     if (!user) return
@@ -194,31 +255,108 @@ export function useChat() {
     if (!initialLoadComplete.current) return
     if (Object.keys(chats).length === 0) return
 
-    const saveChats = async () => {
-      try {
-        console.log('Saving chats:', Object.keys(chats).length)
-        const response = await fetchWithAuth('/chats', {
-          method: 'POST',
-          body: JSON.stringify({ chats }),
-        })
+    const saveChat = async (chatId: string) => {
+      const chat = chats[chatId]
+      const saved = savedChats.current[chatId]
+      if (chat === saved) return
+
+      // State updates replace changed messages, so unchanged ones keep identity
+      const savedMessages = new Map(saved?.messages.map((m) => [m.id, m]))
+      const changed = chat.messages.filter((m) => savedMessages.get(m.id) !== m)
+      if (saved && saved.title === chat.title && changed.length === 0) {
+        savedChats.current[chatId] = chat
+        return
+      }
+
+      const body = JSON.stringify({ messages: changed, title: chat.title })
+      const pending = pendingSaves.current[chatId]
+      const key = pending?.body === body ? pending.key : crypto.randomUUID()
+      pendingSaves.current[chatId] = { body, key }
+
+      for (let attempt = 1; attempt <= SAVE_ATTEMPTS; attempt++) {
+        try {
+          const response = await fetchWithAuth(`/chats/${chatId}/messages`, {
+            method: 'POST',
+            headers: { 'Idempotency-Key': key },
+            body,
+          })
+
+          if (response.ok) {
+            savedChats.current[chatId] = chat
+            delete pendingSaves.current[chatId]
+            return
+          }
 
-        if (!response.ok) {
           const errorData = await response.json().catch(() => ({}))
-          console.error('Failed to save chats:', {
+          console.error('Failed to save chat:', {
             status: response.status,
             statusText: response.statusText,
             error: errorData.error,
           })
+          // Client errors will fail the same way again
+          if (response.status < 500 && response.status !== 429) return
+        } catch (error) {
+          console.error('Error saving chat:', error)
+        }
+
+        if (attempt < SAVE_ATTEMPTS) {
+          const delay = SAVE_RETRY_DELAY * 2 ** (attempt - 1)
+          await new Promise((resolve) => setTimeout(resolve, delay))
         }
-      } catch (error) {
-        console.error('Error saving chats:', error)
       }
     }
 
+    const saveChats = async () => {
+      await Promise.all(Object.keys(chats).map(saveChat))
+    }
+
     const timeoutId = setTimeout(saveChats, 1000)
     return () => clearTimeout(timeoutId)
   }, [chats, user, isLoadingChats, isInitialized])
 
+  // Fetch the messages of a listed chat when it is first opened
+  const needsLoad = chats[currentSessionId]?.loaded === false
+  useEffect(() => {
+    if (!needsLoad) return
+    const chatId = currentSessionId
+    let cancelled = false
+
+    const loadChat = async () => {
+      try {
+        const loadedMessages: Message[] = []
+        let before: number | null = null
+        let title = ''
+        do {
+          const query: string = before === null ? '' : `?before=${before}`
+          const response = await fetchWithAuth(`/chats/${chatId}${query}`)
+
+          if (!response.ok) {
+            console.error('Failed to fetch chat:', response.statusText)
+            return
+          }
+
+          const page = (await response.json()) as ChatMessagesResponse
+          loadedMessages.unshift(...page.messages)
+          title = page.title
+          before = page.nextCursor
+        } while (before !== null)
+
+        if (cancelled) return
+        const loaded = { title, messages: loadedMessages }
+        savedChats.current[chatId] = loaded
+        setChats((prev) => ({ ...prev, [chatId]: loaded }))
+        setToolCalls((prev) => ({ ...prev, ...toolCallsFrom(loadedMessages) }))
+      } catch (error) {
+        console.error('Error fetching chat:', error)
+      }
+    }
+
+    loadChat()
+    return () => {
+      cancelled = true
+    }
+  }, [currentSessionId, needsLoad])
+
   const currentChat = chats[currentSessionId]
   const messages = currentChat?.messages || []
 
@@ -307,6 +445,7 @@ export function useChat() {
       return
     }
 
+    delete savedChats.current[currentSessionId]
     setChats((prevChats) => {
       const newChats = { ...prevChats }
       delete newChats[currentSessionId]
@@ -328,6 +467,7 @@ export function useChat() {
     async (inputMessage: string) => {
       if (!inputMessage.trim() || isStreaming) return
       if (authLoading) return
+      if (chats[currentSessionId]?.loaded === false) return
 
       const tokenRefreshed = await refreshToken()
       if (!tokenRefreshed) return
@@ -391,6 +531,8 @@ export function useChat() {
           method: 'POST',
           headers: {
             Accept: 'text/event-stream',
+            // Coalesced frames keep the on_chat_model_stream shape with larger chunks
+            'X-Stream-Framing': 'coalesced',
           },
           body: JSON.stringify({
             input_data: {
@@ -575,6 +717,8 @@ export function useChat() {
     expandedToolCall,
     submittedFeedback,
     isLoadingChats,
+    hasMoreChats: chatsCursor !== null,
+    isLoadingMoreChats,
     authLoading,
     user,
     userScrolled,
@@ -582,6 +726,7 @@ export function useChat() {
     // Actions
     setCurrentSessionId,
     setServiceUrl,
+    loadMoreChats,
     createNewChat,
     deleteCurrentChat,
     sendMessage,
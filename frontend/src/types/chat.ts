@@ -23,12 +23,15 @@ export interface Message {
   tool_calls?: ToolCall[]
   tool_call_id?: string
   name?: string
+  seq?: number
 }
 
 export interface Chat {
   title: string
   messages: Message[]
   update_time?: string
+  // False for chats listed from a summary whose messages are not fetched yet
+  loaded?: boolean
 }
 
 export interface ChatsState {
@@ -46,8 +49,26 @@ export interface ToolCallState {
   output: any
 }
 
-export interface ChatApiResponse {
-  chats: ChatsState
+export interface ChatSummary {
+  id: string
+  title: string
+  updatedAt: string
+  version: number
+  messageCount: number
+}
+
+export interface ChatSummariesResponse {
+  chats: ChatSummary[]
+  nextCursor: string | null
+}
+
+export interface ChatMessagesResponse {
+  id: string
+  title: string
+  version: number
+  lastSeq: number
+  messages: Message[]
+  nextCursor: number | null
 }
 
 export interface ChatTitleResponse {
@@ -14,6 +14,7 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_postgres import PGVector
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from markitdown import MarkItDown
+from sqlalchemy import create_engine, text
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ingest")
@@ -104,6 +105,8 @@ if not DB_NAME:
     logger.error("DB_NAME is not set")
     raise Exception("DB_NAME is not set")
 
+CONNECTION = f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+
 md = MarkItDown() if args.convert_to_markdown else None
 
 
@@ -170,6 +173,20 @@ def fetch_pdfs_from_s3(bucket_name: str, prefix: str = "") -> list[str]:
     return pdf_paths
 
 
+def invalidate_answer_cache(collection_name: str) -> None:
+    """Drop cached answers for a collection whose documents have changed."""
+    engine = create_engine(CONNECTION)
+    with engine.begin() as conn:
+        # The backend creates the table; skip databases it has not migrated
+        if conn.execute(text("""SELECT to_regclass('"SemanticCache"')""")).scalar():
+            result = conn.execute(
+                text("""DELETE FROM "SemanticCache" WHERE collection = :collection"""),
+                {"collection": collection_name},
+            )
+            logger.info(f"Invalidated {result.rowcount} cached answers")
+    engine.dispose()
+
+
 def ingest() -> None:
     """Ingest documents into the vector store."""
     input_directory: str | None = args.input_directory
@@ -188,7 +205,7 @@ def ingest() -> None:
     vector_store = PGVector(
         embeddings=embeddings,
         collection_name=collection_name,
-        connection=f"postgresql+psycopg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}",
+        connection=CONNECTION,
     )
 
     if recreate_collection:
@@ -256,6 +273,8 @@ def ingest() -> None:
 
         logger.info("Non-chunked documents loaded successfully into the vector store")
 
+    invalidate_answer_cache(collection_name)
+
 
 if __name__ == "__main__":
     ingest()